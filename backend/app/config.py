@@ -30,6 +30,46 @@ class Settings(BaseSettings):
     DB_NAME: str = "eldoret_house_hunters"
     DB_USER: str
     DB_PASSWORD: str
+    ASYNC_DATABASE_URL: str = ""  # Defaults to DATABASE_URL with its async driver
+    
+    @property
+    def async_database_url(self) -> str:
+        """Database URL for the async engine (aiomysql / aiosqlite)"""
+        return self.ASYNC_DATABASE_URL or self.to_async_url(self.DATABASE_URL)
+    
+    @staticmethod
+    def to_async_url(url: str) -> str:
+        """Swap a sync driver URL for its async driver (pymysql -> aiomysql, sqlite -> aiosqlite)"""
+        for sync_driver, async_driver in (
+            ("mysql+pymysql://", "mysql+aiomysql://"),
+            ("mysql://", "mysql+aiomysql://"),
+            ("sqlite+pysqlite://", "sqlite+aiosqlite://"),
+            ("sqlite://", "sqlite+aiosqlite://"),
+        ):
+            if url.startswith(sync_driver):
+                return async_driver + url[len(sync_driver):]
+        return url
+    
+    # Connection Pool (per engine; each worker has a sync and an async engine)
+    DB_POOL_MODE: str = "fixed"  # fixed: DB_POOL_SIZE/DB_MAX_OVERFLOW; budget: split DB_CONNECTION_BUDGET
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_CONNECTION_BUDGET: int = 100  # Connections this app may hold on the database server (budget mode)
+    DB_WORKERS: int = 0  # Worker processes; 0 reads WEB_CONCURRENCY
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 3600
+    DB_POOL_PING_INTERVAL_SECONDS: int = 30  # Ping connections idle longer than this on checkout
+    
+    # Read Replicas (public reads; writes stay on DATABASE_URL)
+    DATABASE_REPLICA_URLS: str = ""  # Comma-separated; empty sends every read to the primary
+    REPLICA_HEALTH_CHECK_SECONDS: int = 10
+    REPLICA_HEALTH_TIMEOUT_SECONDS: float = 2.0
+    READ_YOUR_WRITES_SECONDS: int = 10  # Keep an admin on the primary this long after a write
+    
+    @property
+    def replica_urls(self) -> List[str]:
+        """Parse replica URLs from comma-separated string"""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
     
     # Security
     SECRET_KEY: str
@@ -48,6 +88,11 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "uploads/properties"
     MAX_UPLOAD_SIZE: int = 5242880  # 5MB
     ALLOWED_EXTENSIONS: str = ".jpg,.jpeg,.png,.webp"
+    UPLOAD_MAX_FILES: int = 20  # Files per multi-image upload
+    UPLOAD_CHUNK_SIZE: int = 65536  # Bytes read and written per step while streaming an upload
+    UPLOAD_HEADER_BYTES: int = 262144  # Leading bytes sniffed for type and dimensions before the rest is accepted
+    UPLOAD_SESSION_DIR: str = "uploads/sessions"  # Partial and staged uploads (outside the served UPLOAD_DIR)
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # Remove resumable uploads idle this long
     
     @property
     def allowed_extensions_list(self) -> List[str]:
@@ -59,6 +104,66 @@ class Settings(BaseSettings):
     IMAGE_MAX_HEIGHT: int = 1080
     IMAGE_QUALITY: int = 85
     THUMBNAIL_SIZE: int = 400
+    IMAGE_MAX_PIXELS: int = 40000000  # Larger images are rejected from their header, before decoding
+    IMAGE_VARIANT_WIDTHS: str = "400,800,1280"  # Responsive copies narrower than the stored image
+    IMAGE_VARIANT_FORMATS: str = "webp,jpeg"  # Preferred first (srcset); avif where Pillow supports it
+    
+    @property
+    def image_variant_widths(self) -> List[int]:
+        """Parse variant widths"""
+        return [int(width) for width in self.IMAGE_VARIANT_WIDTHS.split(",") if width.strip()]
+    
+    @property
+    def image_variant_formats(self) -> List[str]:
+        """Parse variant formats"""
+        return [fmt.strip().lower() for fmt in self.IMAGE_VARIANT_FORMATS.split(",") if fmt.strip()]
+    
+    IMAGE_WORKERS: int = 2  # Processes resizing uploads (per app worker)
+    IMAGE_MAX_QUEUE: int = 16  # Uploads waiting for a process beyond this get 503
+    IMAGE_WORKER_MAX_TASKS: int = 200  # Replace a process after this many images (0 = never; Python 3.11+)
+    
+    # In-Process Search Index (search_mode=bm25)
+    SEARCH_INDEX_ENABLED: bool = False
+    SEARCH_INDEX_SYNC_SECONDS: int = 30  # Catch up on writes from other workers
+    
+    # Listing Counts
+    COUNT_CACHE_TTL_SECONDS: int = 60
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
+    COUNT_ESTIMATE_THRESHOLD: int = 10000  # estimate_total=true: estimate above this many rows
+    
+    # Public Response Cache (featured, trending, neighborhoods, amenities)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 300  # Bounds staleness across workers
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    
+    # Geo Search
+    GEO_MAX_COVER_CELLS: int = 16  # Geohash prefixes per bbox/radius lookup
+    GEO_MAX_RADIUS_KM: float = 50.0
+    
+    # Event Loop Monitor (opt-in; summary at /health/loop, stacks at /health/loop/stalls for admins)
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_MONITOR_INTERVAL_MS: int = 50
+    LOOP_MONITOR_THRESHOLD_MS: int = 100  # Capture stacks of stalls longer than this
+    LOOP_MONITOR_HISTORY: int = 50  # Recent stalls kept with their stacks
+    
+    # Request Metrics (Prometheus text format at /metrics)
+    METRICS_ENABLED: bool = True
+    
+    # Query Accounting (X-DB-Queries / X-DB-Time headers, slow-query and N+1 warnings)
+    QUERY_STATS_ENABLED: bool = True
+    SLOW_QUERY_MS: int = 200
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 5  # Same statement this often in one request
+    
+    # Admin Profiling (/api/admin/profiling; X-Profile: cprofile header); off unless investigating
+    PROFILING_ENABLED: bool = False
+    PROFILER_MAX_SECONDS: int = 120  # Longest sampling session
+    PROFILER_HISTORY: int = 20  # Recent per-request cProfile results kept
+    PROFILER_CPROFILE_LINES: int = 60  # Functions listed per cProfile result
+    
+    # Memory Profiling (tracemalloc; started by an admin at /api/admin/profiling/memory/start)
+    MEMORY_TRACE_FRAMES: int = 64  # Deep enough to reach the route handler from ORM internals
+    MEMORY_SAMPLE_RATE: float = 0.1  # Share of requests whose peak allocation is recorded
+    MEMORY_MAX_SNAPSHOTS: int = 5
     
     # Logging
     ENABLE_LOGGING: bool = True
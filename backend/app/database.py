@@ -4,24 +4,24 @@ SQLAlchemy setup for MySQL/MariaDB
 """
 
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 import logging
 
 from app.config import settings
+from app.db_pool import instrument, pool_options
 
 logger = logging.getLogger(__name__)
 
-# Database Engine
+# Database Engine (pool sized by DB_POOL_MODE; idle connections pinged on checkout)
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_recycle=3600,   # Recycle connections after 1 hour
-    pool_size=10,        # Connection pool size
-    max_overflow=20,     # Max additional connections
+    **pool_options(),
     echo=settings.DEBUG  # Log SQL queries in debug mode
 )
+instrument(engine, "primary")
 
 # Session Factory
 SessionLocal = sessionmaker(
@@ -30,6 +30,21 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async Engine (public read routes; same pool settings as the sync engine)
+async_engine = create_async_engine(
+    settings.async_database_url,
+    **pool_options(),
+    echo=settings.DEBUG
+)
+instrument(async_engine.sync_engine, "primary_async")
+
+# Async Session Factory
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base Model Class
 Base = declarative_base()
 
@@ -52,6 +67,20 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database session dependency
+    Queries await the database instead of blocking the event loop
+    
+    Usage in FastAPI:
+        @app.get("/endpoint")
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Model))
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     """
     Initialize database tables
@@ -0,0 +1,230 @@
+"""
+Connection Pool Sizing & Telemetry
+Pool parameters per worker, time-based liveness checks and pool event counters
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+# Engines each worker process opens against one database server (sync + async)
+ENGINES_PER_WORKER = 2
+
+
+def worker_count() -> int:
+    """Worker processes sharing the database (DB_WORKERS, else uvicorn's WEB_CONCURRENCY)"""
+    if settings.DB_WORKERS > 0:
+        return settings.DB_WORKERS
+    try:
+        return max(int(os.environ.get("WEB_CONCURRENCY", "1")), 1)
+    except ValueError:
+        return 1
+
+
+def pool_options() -> Dict[str, Any]:
+    """
+    Pool keyword arguments for create_engine / create_async_engine
+
+    DB_POOL_MODE=fixed uses DB_POOL_SIZE and DB_MAX_OVERFLOW as given.
+    DB_POOL_MODE=budget splits DB_CONNECTION_BUDGET (the connections this
+    app may hold on the server) across workers and their engines: half of
+    each engine's share is kept open, the rest is burst overflow.
+
+    Per-checkout pre-ping is off; idle connections are checked on checkout
+    instead (see instrument()).
+    """
+    if settings.DB_POOL_MODE == "budget":
+        per_engine = max(settings.DB_CONNECTION_BUDGET // (worker_count() * ENGINES_PER_WORKER), 1)
+        pool_size = max((per_engine + 1) // 2, 1)
+        max_overflow = per_engine - pool_size
+    else:
+        pool_size = settings.DB_POOL_SIZE
+        max_overflow = settings.DB_MAX_OVERFLOW
+
+    return {
+        "pool_pre_ping": False,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+
+
+class PoolTelemetry:
+    """
+    Counters for one engine's pool, fed by SQLAlchemy pool events
+
+    Checkout wait is the time engine.connect() spends getting a connection
+    from the pool (queueing for a free one, or opening an overflow
+    connection); liveness pings are timed separately so their cost shows
+    on its own.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.ping_seconds = 0.0
+        self.timeouts = 0
+        self.max_checked_out = 0
+        self.max_overflow_used = 0
+        self.waits: Deque[float] = deque(maxlen=2000)
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            pool = self.engine.pool
+            self.max_checked_out = max(self.max_checked_out, pool.checkedout())
+            self.max_overflow_used = max(self.max_overflow_used, max(pool.overflow(), 0))
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.waits.append(seconds)
+            self.max_wait = max(self.max_wait, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool state and counters"""
+        pool = self.engine.pool
+        waits = sorted(self.waits)
+
+        def percentile(fraction: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(int(len(waits) * fraction), len(waits) - 1)] * 1000, 3)
+
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_checked_out": self.max_checked_out,
+            "max_overflow_used": self.max_overflow_used,
+            "checkouts": self.checkouts,
+            "checkout_wait_ms": {
+                "p50": percentile(0.5),
+                "p99": percentile(0.99),
+                "max": round(self.max_wait * 1000, 3),
+            },
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+            "liveness_pings": self.pings,
+            "liveness_ping_failures": self.ping_failures,
+            "liveness_ping_ms_avg": round(self.ping_seconds / self.pings * 1000, 3) if self.pings else 0.0,
+        }
+
+
+# Telemetry per instrumented engine (e.g. "primary", "primary_async", replica URLs)
+pool_telemetry: Dict[str, PoolTelemetry] = {}
+
+# Liveness ping time of the checkout in progress on this thread, kept out of the wait
+_checkout_ping = threading.local()
+
+
+def _ping(dbapi_connection) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    finally:
+        cursor.close()
+
+
+def instrument(engine: Engine, name: str) -> PoolTelemetry:
+    """
+    Attach telemetry and time-based liveness checks to an engine's pool
+
+    A connection idle for longer than DB_POOL_PING_INTERVAL_SECONDS is
+    pinged on checkout; a failed ping discards it and the pool retries
+    with a fresh connection. Recently used connections skip the round trip.
+
+    Args:
+        engine: Sync engine (use `async_engine.sync_engine` for async engines)
+        name: Label in pool_telemetry and /health
+
+    Returns:
+        The engine's PoolTelemetry
+    """
+    telemetry = PoolTelemetry(engine)
+    pool_telemetry[name] = telemetry
+    ping_interval = settings.DB_POOL_PING_INTERVAL_SECONDS
+
+    # Checkout wait: pools have no event before a checkout, so time engine.connect()
+    # (sessions and async engines connect through it), less any liveness ping
+    connect = engine.connect
+
+    def timed_connect():
+        _checkout_ping.seconds = 0.0
+        started = time.perf_counter()
+        try:
+            connection = connect()
+        except exc.TimeoutError:
+            telemetry.timeouts += 1
+            raise
+        telemetry.record_wait(time.perf_counter() - started - _checkout_ping.seconds)
+        return connection
+
+    engine.connect = timed_connect
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        telemetry.record_checkout()
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < ping_interval:
+            return
+
+        started = time.perf_counter()
+        try:
+            _ping(dbapi_connection)
+        except Exception as e:
+            telemetry.ping_failures += 1
+            raise exc.DisconnectionError(f"Liveness check failed: {e}") from e
+        finally:
+            elapsed = time.perf_counter() - started
+            telemetry.pings += 1
+            telemetry.ping_seconds += elapsed
+            _checkout_ping.seconds = getattr(_checkout_ping, "seconds", 0.0) + elapsed
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        telemetry.connects += 1
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        telemetry.invalidations += 1
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        telemetry.soft_invalidations += 1
+
+    return telemetry
+
+
+def pool_summary() -> Dict[str, Any]:
+    """Sizing and telemetry for every instrumented pool"""
+    options = pool_options()
+    return {
+        "mode": settings.DB_POOL_MODE,
+        "workers": worker_count(),
+        "pool_size": options["pool_size"],
+        "max_overflow": options["max_overflow"],
+        "ping_interval_seconds": settings.DB_POOL_PING_INTERVAL_SECONDS,
+        "pools": {name: telemetry.stats() for name, telemetry in pool_telemetry.items()},
+    }
@@ -0,0 +1,350 @@
+"""
+Image Processing Pool
+Bounded process pool for PIL decode/resize/encode and responsive variants, with queue-depth telemetry
+"""
+
+import asyncio
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from app.config import settings
+
+
+class ImagePoolBusy(RuntimeError):
+    """Raised when IMAGE_MAX_QUEUE jobs are already waiting for a worker"""
+
+
+# Variant formats: Pillow format name, file extension and MIME type
+VARIANT_FORMATS: Dict[str, Tuple[str, str, str]] = {
+    "avif": ("AVIF", ".avif", "image/avif"),
+    "webp": ("WEBP", ".webp", "image/webp"),
+    "jpeg": ("JPEG", ".jpg", "image/jpeg"),
+}
+
+
+def variant_formats() -> List[str]:
+    """Configured variant formats this Pillow build can encode (AVIF needs Pillow 11.3+ or a plugin)"""
+    Image.init()
+    return [
+        name for name in settings.image_variant_formats
+        if name in VARIANT_FORMATS and VARIANT_FORMATS[name][0] in Image.SAVE
+    ]
+
+
+def _fit(img: Image.Image) -> Image.Image:
+    """Convert to RGB and downscale to IMAGE_MAX_WIDTH x IMAGE_MAX_HEIGHT"""
+    # JPEG has no alpha or palette modes
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+
+    # Resize if larger than max dimensions
+    if img.width > settings.IMAGE_MAX_WIDTH or img.height > settings.IMAGE_MAX_HEIGHT:
+        img.thumbnail(
+            (settings.IMAGE_MAX_WIDTH, settings.IMAGE_MAX_HEIGHT),
+            Image.Resampling.LANCZOS
+        )
+    return img
+
+
+def _encode(img: Image.Image, path: str, pil_format: str) -> None:
+    """
+    Write an image with the size-oriented settings for its format
+
+    The file is written under a temporary name in the same directory and
+    renamed into place, so readers never see a partial image.
+    """
+    options: Dict[str, Any] = {"quality": settings.IMAGE_QUALITY}
+    if pil_format == "JPEG":
+        options.update(optimize=True, progressive=True)
+    elif pil_format == "WEBP":
+        options["method"] = 4
+    directory, name = os.path.split(path)
+    partial = os.path.join(directory, f".{name}.part")
+    try:
+        img.save(partial, format=pil_format, **options)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.unlink(partial)
+
+
+def optimize_image(contents: bytes, destination: str) -> None:
+    """
+    Decode an image, downscale it to IMAGE_MAX_WIDTH x IMAGE_MAX_HEIGHT
+    and write it to `destination` as an optimized JPEG
+
+    Args:
+        contents: Encoded image bytes
+        destination: Path to write the JPEG to
+    """
+    with Image.open(io.BytesIO(contents)) as img:
+        _encode(_fit(img), destination, "JPEG")
+
+
+def write_variants(img: Image.Image, destination: str, written: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Write the responsive copies of an already fitted image next to `destination`
+
+    Each width is downscaled from the previous (larger) one, so the
+    source is decoded only once. The stored JPEG at `destination` doubles
+    as the full-width JPEG variant; widths at or above the image's own
+    width are skipped rather than upscaled.
+
+    Args:
+        img: Image as stored at `destination` (see _fit)
+        destination: Path of the stored image; variants are <stem>_<width>w.<ext>
+        written: Collects the paths written, for cleanup on failure
+
+    Returns:
+        Variants as {"path", "width", "height", "format"}, widest first
+    """
+    stem = os.path.splitext(destination)[0]
+    formats = variant_formats()
+    widths = [img.width] + sorted({w for w in settings.image_variant_widths if 0 < w < img.width}, reverse=True)
+
+    variants = []
+    current = img
+    for width in widths:
+        if width != current.width:
+            height = max(round(img.height * width / img.width), 1)
+            current = current.resize((width, height), Image.Resampling.LANCZOS)
+        for name in formats:
+            pil_format, extension, mime_type = VARIANT_FORMATS[name]
+            if name == "jpeg" and width == img.width:
+                path = destination
+            else:
+                path = f"{stem}_{width}w{extension}"
+                _encode(current, path, pil_format)
+                if written is not None:
+                    written.append(path)
+            variants.append({"path": path, "width": width, "height": current.height, "format": mime_type})
+    return variants
+
+
+def process_upload(source: str, destination: str) -> Dict[str, Any]:
+    """
+    Optimize an upload into `destination` and write its variants (runs in a pool worker)
+
+    Args:
+        source: Path of the received upload (validated by its header; left in place)
+        destination: Path of the stored JPEG
+
+    Returns:
+        {"error", "width", "height", "variants"}; on error nothing is written
+    """
+    written: List[str] = []
+    try:
+        with Image.open(source) as img:
+            img = _fit(img)
+            _encode(img, destination, "JPEG")
+            written.append(destination)
+            variants = write_variants(img, destination, written)
+            return {"error": None, "width": img.width, "height": img.height, "variants": variants}
+    except Exception as e:
+        for path in written:
+            if os.path.exists(path):
+                os.unlink(path)
+        return {"error": str(e), "width": None, "height": None, "variants": []}
+
+
+def generate_variants(image_path: str) -> List[Dict[str, Any]]:
+    """
+    Write variants for an image already stored by an earlier upload (runs in a pool worker)
+
+    The stored file is decoded but not rewritten.
+
+    Returns:
+        Variants as from write_variants()
+    """
+    written: List[str] = []
+    try:
+        with Image.open(image_path) as img:
+            img.load()
+            return write_variants(_fit(img), image_path, written)
+    except Exception:
+        for path in written:
+            if os.path.exists(path):
+                os.unlink(path)
+        raise
+
+
+class ImageProcessingPool:
+    """
+    Process pool for CPU-bound image work, shared by one app worker
+
+    At most IMAGE_WORKERS jobs run at once (one per process); up to
+    IMAGE_MAX_QUEUE more wait in line and anything beyond that is rejected
+    with ImagePoolBusy. Worker processes are spawned, not forked, so they
+    do not inherit the event loop, DB pools or monitor threads, and are
+    replaced every IMAGE_WORKER_MAX_TASKS jobs to bound PIL memory growth.
+    """
+
+    def __init__(self):
+        self.workers = max(settings.IMAGE_WORKERS, 1)
+        self.max_queue = settings.IMAGE_MAX_QUEUE
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.waits: Deque[float] = deque(maxlen=500)
+        self.durations: Deque[float] = deque(maxlen=500)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                options: Dict[str, Any] = {}
+                # Worker recycling needs Python 3.11; on 3.10 processes live as long as the pool
+                if settings.IMAGE_WORKER_MAX_TASKS and sys.version_info >= (3, 11):
+                    options["max_tasks_per_child"] = settings.IMAGE_WORKER_MAX_TASKS
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    **options
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken executor so the next job starts a fresh one"""
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+                self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run `function(*args)` in a worker process without blocking the event loop
+
+        Cancelling the caller does not stop a job a worker has already
+        started; its slot stays taken until the job finishes.
+
+        Raises:
+            ImagePoolBusy: If the wait queue is full
+            Exception: Whatever `function` raised in the worker
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        if self._slots.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise ImagePoolBusy(f"Image processing queue is full ({self.queued} waiting)")
+
+        queued_at = time.perf_counter()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        started = time.perf_counter()
+        self.waits.append(started - queued_at)
+        self.running += 1
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            future = executor.submit(function, *args)
+        except BaseException as e:
+            self.running -= 1
+            self._slots.release()
+            self.failed += 1
+            if isinstance(e, BrokenProcessPool):
+                self._discard_executor(executor)
+            raise
+
+        # The slot is freed when the worker is done, not when this await
+        # ends: a cancelled caller (e.g. a disconnected client) must not
+        # let another job in while its process is still busy
+        def done(finished: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(self._finish, finished, executor, started)
+            except RuntimeError:
+                pass  # Event loop already closed
+
+        future.add_done_callback(done)
+        return await asyncio.wrap_future(future)
+
+    def _finish(self, future: Future, executor: ProcessPoolExecutor, started: float) -> None:
+        """Release a job's slot and record its outcome (runs on the event loop)"""
+        self.running -= 1
+        self._slots.release()
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        if error is None:
+            self.completed += 1
+            self.durations.append(time.perf_counter() - started)
+            return
+        self.failed += 1
+        if isinstance(error, BrokenProcessPool):
+            self._discard_executor(executor)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (a later job starts them again)"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool sizing, queue depth and job timings"""
+
+        def percentile(values: List[float], fraction: float) -> float:
+            if not values:
+                return 0.0
+            values = sorted(values)
+            return round(values[min(int(len(values) * fraction), len(values) - 1)] * 1000, 1)
+
+        waits = list(self.waits)
+        durations = list(self.durations)
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "started": self._executor is not None,
+            "running": self.running,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "queue_wait_ms": {"p50": percentile(waits, 0.5), "p99": percentile(waits, 0.99)},
+            "processing_ms": {"p50": percentile(durations, 0.5), "p99": percentile(durations, 0.99)},
+        }
+
+    def render(self) -> str:
+        """Queue depth and job counters in the Prometheus text format"""
+        lines = [
+            "# HELP image_pool_queue_depth Image jobs waiting for a worker process",
+            "# TYPE image_pool_queue_depth gauge",
+            f"image_pool_queue_depth {self.queued}",
+            "# HELP image_pool_running Image jobs running in worker processes",
+            "# TYPE image_pool_running gauge",
+            f"image_pool_running {self.running}",
+            "# HELP image_pool_jobs_total Image jobs by outcome",
+            "# TYPE image_pool_jobs_total counter",
+        ]
+        for outcome in ("completed", "failed", "rejected"):
+            lines.append(f'image_pool_jobs_total{{outcome="{outcome}"}} {getattr(self, outcome)}')
+        return "\n".join(lines) + "\n"
+
+
+# Global image processing pool
+image_pool = ImageProcessingPool()
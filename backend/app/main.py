@@ -3,18 +3,33 @@ Eldoret House Hunters - FastAPI Main Application
 Professional Real Estate Management API
 """
 
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import time
 from pathlib import Path
 
 from app.config import settings
-from app.database import init_db, check_db_connection
-from app.routes import properties, admin, amenities, upload
+from app.database import init_db, check_db_connection, SessionLocal
+from app.db_pool import pool_summary
+from app.image_pool import image_pool
+from app.models.admin import Admin
+from app.routes import properties, admin, amenities, upload, profiling
+from app.utils.geo import backfill_geohashes
+from app.utils.auth import get_current_admin
+from app.utils.image import UploadSizeLimitMiddleware
+from app.utils.db_routing import replica_router, run_replica_health_checks, ReadYourWritesMiddleware
+from app.utils import query_stats
+from app.utils.metrics import metrics, MetricsMiddleware
+from app.utils.memory_profiler import MemorySamplingMiddleware
+from app.utils.profiler import ProfilingMiddleware
+from app.utils.loop_monitor import loop_monitor, LoopMonitorMiddleware
+from app.utils.search_index import run_search_index
+from app.utils.single_flight import single_flight
 
 # Configure logging
 logging.basicConfig(
@@ -41,6 +56,18 @@ async def lifespan(app: FastAPI):
                 logger.info("✅ Database initialized successfully")
             except Exception as e:
                 logger.error(f"❌ Database initialization failed: {e}")
+            
+            # Geohash rows written before the column existed
+            try:
+                db = SessionLocal()
+                try:
+                    backfilled = backfill_geohashes(db)
+                finally:
+                    db.close()
+                if backfilled:
+                    logger.info(f"✅ Backfilled geohash for {backfilled} properties")
+            except Exception as e:
+                logger.error(f"❌ Geohash backfill failed: {e}")
         else:
             logger.warning("⚠️  Database connection failed - API will start but database operations may fail")
     except Exception as e:
@@ -51,6 +78,21 @@ async def lifespan(app: FastAPI):
     upload_path.mkdir(parents=True, exist_ok=True)
     logger.info(f"✅ Upload directory ready: {settings.UPLOAD_DIR}")
     
+    # Watch for handlers blocking the event loop
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start(app)
+    
+    # Build the in-process search index in the background
+    search_index_task = None
+    if settings.SEARCH_INDEX_ENABLED:
+        search_index_task = asyncio.create_task(run_search_index())
+    
+    # Probe read replicas and fail over to the primary when they drop
+    replica_health_task = None
+    if replica_router.replicas:
+        replica_health_task = asyncio.create_task(run_replica_health_checks())
+        logger.info(f"✅ Routing public reads to {len(replica_router.replicas)} replica(s)")
+    
     logger.info(f"✅ API running on {settings.HOST}:{settings.PORT}")
     logger.info(f"📝 Documentation available at /docs")
     
@@ -58,6 +100,13 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("👋 Shutting down Eldoret House Hunters API...")
+    if search_index_task:
+        search_index_task.cancel()
+    if replica_health_task:
+        replica_health_task.cancel()
+    if loop_monitor.running:
+        loop_monitor.stop()
+    image_pool.shutdown()
 
 
 # Create FastAPI application
@@ -102,6 +151,25 @@ app.add_middleware(
 )
 
 
+# Upload Size Limit (rejects oversized bodies before they are received)
+app.add_middleware(UploadSizeLimitMiddleware)
+
+
+# Read-Your-Writes (token on responses to writes; reads echoing it use the primary)
+app.add_middleware(ReadYourWritesMiddleware)
+
+
+# Event Loop Monitor (attributes loop stalls to routes)
+if settings.LOOP_MONITOR_ENABLED:
+    app.add_middleware(LoopMonitorMiddleware)
+
+
+# Admin Profiling (sampling sessions, X-Profile: cprofile requests, memory peaks)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(MemorySamplingMiddleware)
+    app.add_middleware(ProfilingMiddleware)
+
+
 # Request Logging Middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -113,19 +181,34 @@ async def log_requests(request: Request, call_next):
     # Log request
     logger.info(f"➡️  {request.method} {request.url.path}")
     
-    # Process request
-    response = await call_next(request)
+    # Process request (counting its SQL queries)
+    stats_token = query_stats.begin(request.scope) if settings.QUERY_STATS_ENABLED else None
+    try:
+        response = await call_next(request)
+    finally:
+        stats = query_stats.finish(stats_token) if stats_token else None
     
     # Calculate processing time
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
     
+    db_summary = ""
+    if stats is not None:
+        response.headers["X-DB-Queries"] = str(stats.count)
+        response.headers["X-DB-Time"] = f"{stats.duration:.6f}"
+        db_summary = f", {stats.count} queries {stats.duration * 1000:.1f}ms"
+    
     # Log response
-    logger.info(f"⬅️  {request.method} {request.url.path} - {response.status_code} ({process_time:.3f}s)")
+    logger.info(f"⬅️  {request.method} {request.url.path} - {response.status_code} ({process_time:.3f}s{db_summary})")
     
     return response
 
 
+# Request Metrics (outermost, so latency covers every middleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
 # ============================================
 # STATIC FILES
 # ============================================
@@ -145,6 +228,8 @@ app.include_router(properties.router, prefix="/api", tags=["Properties"])
 app.include_router(admin.router, prefix="/api", tags=["Admin"])
 app.include_router(amenities.router, prefix="/api", tags=["Amenities"])
 app.include_router(upload.router, prefix="/api", tags=["Upload"])
+if settings.PROFILING_ENABLED:
+    app.include_router(profiling.router, prefix="/api", tags=["Profiling"])
 
 
 # ============================================
@@ -176,10 +261,59 @@ async def health_check():
     return {
         "status": "healthy" if db_status else "unhealthy",
         "database": "connected" if db_status else "disconnected",
-        "api_version": settings.APP_VERSION
+        "api_version": settings.APP_VERSION,
+        "read_replicas": replica_router.status(),
+        "single_flight": single_flight.stats(),
+        "event_loop": loop_monitor.summary() if loop_monitor.running else {"enabled": False}
     }
 
 
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Per-route latency histograms, status code and byte counters and
+    in-flight gauges in Prometheus text format (enable with METRICS_ENABLED)
+    """
+    return PlainTextResponse(metrics.render() + image_pool.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/health/db-pool", tags=["Health"])
+async def db_pool_health():
+    """
+    Connection pool sizing, checkout wait, overflow use, liveness pings
+    and invalidations per engine
+    """
+    return pool_summary()
+
+
+@app.get("/health/image-pool", tags=["Health"])
+async def image_pool_health():
+    """
+    Image processing pool: running and queued uploads, rejections
+    and queue wait / processing times
+    """
+    return image_pool.stats()
+
+
+@app.get("/health/loop", tags=["Health"])
+async def loop_health():
+    """
+    Event loop lag and blocking stalls per route
+    (enable with LOOP_MONITOR_ENABLED)
+    """
+    return loop_monitor.summary()
+
+
+@app.get("/health/loop/stalls", tags=["Health"])
+async def loop_stalls(
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Loop lag summary plus recent stalls with their captured stacks (Admin only)
+    """
+    return loop_monitor.summary(include_stacks=True)
+
+
 @app.get("/api/info", tags=["Info"])
 async def api_info():
     """
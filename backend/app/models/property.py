@@ -3,8 +3,8 @@ Property Models
 Database models for property listings and related entities
 """
 
-from sqlalchemy import Column, Integer, String, Text, DECIMAL, Boolean, DateTime, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DECIMAL, Boolean, DateTime, ForeignKey, Enum as SQLEnum, Index, JSON, select
+from sqlalchemy.orm import relationship, column_property
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
@@ -41,6 +41,20 @@ class Property(Base):
     Stores all property information
     """
     __tablename__ = "properties"
+    __table_args__ = (
+        # Full-text search over title + description (MATCH ... AGAINST)
+        Index("idx_search", "title", "description", mysql_prefix="FULLTEXT").ddl_if(dialect=("mysql", "mariadb")),
+        
+        # Composite indexes matched to the listing queries in routes/properties.py
+        # (InnoDB appends the primary key, so each also serves the `id` tiebreak)
+        Index("idx_featured_availability_created", "featured", "availability", "created_at"),  # featured list
+        Index("idx_availability_created", "availability", "created_at"),                      # trending, available-only browse
+        Index("idx_created_at", "created_at"),                                                # unfiltered newest-first browse
+        Index("idx_listing_created", "listing_type", "created_at"),                           # rent/buy pages, newest first
+        Index("idx_listing_price", "listing_type", "price"),                                  # rent/buy pages, price sort
+        Index("idx_listing_type_price", "listing_type", "property_type", "price"),            # type + price range filters
+        Index("idx_geohash", "geohash"),                                                      # near/bbox prefix ranges
+    )
     
     # Primary Key
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -49,7 +63,7 @@ class Property(Base):
     title = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=False)
     property_type = Column(SQLEnum(PropertyType), nullable=False, index=True)
-    listing_type = Column(SQLEnum(ListingType), nullable=False, index=True)
+    listing_type = Column(SQLEnum(ListingType), nullable=False)
     
     # Pricing
     price = Column(DECIMAL(10, 2), nullable=False, index=True)
@@ -58,6 +72,7 @@ class Property(Base):
     location = Column(String(255), nullable=False, index=True)
     latitude = Column(DECIMAL(10, 8), nullable=True)
     longitude = Column(DECIMAL(11, 8), nullable=True)
+    geohash = Column(String(12), nullable=True)  # Maintained from latitude/longitude (utils/geo.py)
     
     # Property Details
     bedrooms = Column(Integer, nullable=False, default=1)
@@ -68,10 +83,9 @@ class Property(Base):
     availability = Column(
         SQLEnum(AvailabilityStatus),
         nullable=False,
-        default=AvailabilityStatus.AVAILABLE,
-        index=True
+        default=AvailabilityStatus.AVAILABLE
     )
-    featured = Column(Boolean, default=False, index=True)
+    featured = Column(Boolean, default=False)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -99,10 +113,15 @@ class PropertyImage(Base):
     Stores multiple images per property
     """
     __tablename__ = "property_images"
+    __table_args__ = (
+        # Primary image lookup (Property.primary_image_url) and ordered gallery loads
+        Index("idx_property_primary_order", "property_id", "is_primary", "display_order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
     image_url = Column(String(500), nullable=False)
+    variants = Column(JSON, nullable=True)  # [{"url", "width", "height", "format"}], see app/image_pool.py
     is_primary = Column(Boolean, default=False)
     display_order = Column(Integer, default=0)
     
@@ -131,3 +150,24 @@ class PropertyAmenity(Base):
     def __repr__(self):
         return f"<PropertyAmenity(property_id={self.property_id}, amenity_id={self.amenity_id})>"
 
+
+def _primary_image_column(column):
+    """Correlated subquery for a column of the primary image (same rule as Property.primary_image)"""
+    return (
+        select(column)
+        .where(PropertyImage.property_id == Property.id)
+        .order_by(
+            PropertyImage.is_primary.desc(),
+            PropertyImage.display_order.asc(),
+            PropertyImage.id.asc()
+        )
+        .limit(1)
+        .correlate_except(PropertyImage)
+        .scalar_subquery()
+    )
+
+
+# Primary image URL and variants resolved in SQL.
+# Deferred, so they are only selected when a query undefers them (card listings).
+Property.primary_image_url = column_property(_primary_image_column(PropertyImage.image_url), deferred=True)
+Property.primary_image_variants = column_property(_primary_image_column(PropertyImage.variants), deferred=True)
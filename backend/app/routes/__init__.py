@@ -3,7 +3,7 @@ API Routes
 FastAPI route handlers
 """
 
-from app.routes import properties, admin, amenities, upload
+from app.routes import properties, admin, amenities, upload, profiling
 
-__all__ = ["properties", "admin", "amenities", "upload"]
+__all__ = ["properties", "admin", "amenities", "upload", "profiling"]
 
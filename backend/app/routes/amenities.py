@@ -4,6 +4,7 @@ Endpoints for managing property amenities
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -12,19 +13,26 @@ from app.models.amenity import Amenity
 from app.models.admin import Admin
 from app.schemas.amenity import AmenityCreate, AmenityUpdate, AmenityResponse
 from app.utils.auth import get_current_admin
+from app.utils.db_routing import get_async_read_db
+from app.utils.response_cache import response_cache, cached_json, make_key
 
 router = APIRouter()
 
 
 @router.get("/amenities", response_model=List[AmenityResponse], tags=["Public"])
 async def get_amenities(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get all available amenities (Public)
     """
-    amenities = db.query(Amenity).order_by(Amenity.name).all()
-    return amenities
+    return await cached_json(
+        make_key("amenities"),
+        db,
+        lambda session: session.query(Amenity).order_by(Amenity.name).all(),
+        List[AmenityResponse],
+        lambda result: ["amenity:*"]
+    )
 
 
 @router.post("/admin/amenities", response_model=AmenityResponse, tags=["Admin"], status_code=status.HTTP_201_CREATED)
@@ -53,6 +61,8 @@ async def create_amenity(
     db.commit()
     db.refresh(new_amenity)
     
+    response_cache.invalidate(f"amenity:{new_amenity.id}")
+    
     return new_amenity
 
 
@@ -82,6 +92,8 @@ async def update_amenity(
     db.commit()
     db.refresh(amenity)
     
+    response_cache.invalidate(f"amenity:{amenity_id}")
+    
     return amenity
 
 
@@ -105,5 +117,7 @@ async def delete_amenity(
     db.delete(amenity)
     db.commit()
     
+    response_cache.invalidate(f"amenity:{amenity_id}")
+    
     return None
 
@@ -0,0 +1,200 @@
+"""
+Profiling Routes
+Admin-only sampling profiler and per-request cProfile results for live workers
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import PlainTextResponse
+from typing import Literal, Optional
+
+from app.config import settings
+from app.models.admin import Admin
+from app.utils.auth import get_current_admin
+from app.utils.memory_profiler import memory_profiler
+from app.utils.profiler import profiler
+
+router = APIRouter()
+
+
+# ============================================
+# CPU PROFILING
+# ============================================
+
+@router.post("/admin/profiling/sample", response_class=PlainTextResponse, tags=["Admin"])
+async def sample_requests(
+    route: Optional[str] = Query(None, description="Route template to profile, e.g. /api/properties/{property_id} (default: all)"),
+    method: Optional[str] = Query(None, description="HTTP method to profile (default: all)"),
+    requests: Optional[int] = Query(None, ge=1, le=10000, description="Stop after this many matching requests"),
+    duration: float = Query(10.0, gt=0, description="Sampling window in seconds (upper bound when `requests` is set)"),
+    interval_ms: int = Query(5, ge=1, le=1000, description="Sampling interval in milliseconds"),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Sample the stacks of live requests (Admin only)
+
+    Profiles the next `requests` requests matching `route`/`method`, or every
+    matching request for `duration` seconds, by reading the event loop's
+    stack every `interval_ms`. Returns collapsed stacks (one
+    `route;frame;...;frame count` line per stack) for flamegraph.pl,
+    speedscope or inferno. This worker only; repeat per worker process.
+    """
+    if duration > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"duration cannot exceed {settings.PROFILER_MAX_SECONDS} seconds"
+        )
+
+    try:
+        session = await profiler.sample(route, method, requests, duration, interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    return PlainTextResponse(
+        session.collapsed(),
+        headers={
+            "X-Profile-Samples": str(session.samples),
+            "X-Profile-Requests": str(session.requests),
+        }
+    )
+
+
+@router.get("/admin/profiling/requests", tags=["Admin"])
+async def list_request_profiles(
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    List recent per-request cProfile results (Admin only)
+
+    Send `X-Profile: cprofile` with an admin bearer token on any request to
+    profile it; the response's `X-Profile-Id` header names the result.
+    """
+    return profiler.list_profiles()
+
+
+@router.get("/admin/profiling/requests/{profile_id}", response_class=PlainTextResponse, tags=["Admin"])
+async def get_request_profile(
+    profile_id: int,
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Get one request's cProfile statistics, sorted by cumulative time (Admin only)
+    """
+    profile = profiler.get_profile(profile_id)
+
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+
+    return PlainTextResponse(profile["stats"])
+
+
+# ============================================
+# MEMORY PROFILING
+# ============================================
+
+@router.post("/admin/profiling/memory/start", tags=["Admin"])
+async def start_memory_tracing(
+    frames: int = Query(settings.MEMORY_TRACE_FRAMES, ge=1, le=256, description="Frames kept per allocation traceback"),
+    sample_rate: float = Query(settings.MEMORY_SAMPLE_RATE, ge=0, le=1, description="Share of requests whose peak allocation is recorded"),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Start tracemalloc on this worker and take a baseline snapshot (Admin only)
+
+    Tracing slows allocation-heavy code; stop it when done.
+    """
+    memory_profiler.start(frames, sample_rate)
+    baseline = memory_profiler.take_snapshot("baseline")
+    return {
+        "tracing": True,
+        "frames": frames,
+        "sample_rate": sample_rate,
+        "baseline_snapshot_id": baseline["id"]
+    }
+
+
+@router.post("/admin/profiling/memory/stop", status_code=status.HTTP_204_NO_CONTENT, tags=["Admin"])
+async def stop_memory_tracing(
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Stop tracemalloc and drop snapshots and request statistics (Admin only)
+    """
+    memory_profiler.stop()
+    return None
+
+
+@router.post("/admin/profiling/memory/snapshots", tags=["Admin"])
+async def take_memory_snapshot(
+    label: Optional[str] = Query(None, max_length=100, description="Label shown in the snapshot list"),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Capture current allocations for later diffs (Admin only)
+    """
+    try:
+        snapshot = memory_profiler.take_snapshot(label)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    return {key: value for key, value in snapshot.items() if key != "snapshot"}
+
+
+@router.get("/admin/profiling/memory/snapshots", tags=["Admin"])
+async def list_memory_snapshots(
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    List kept snapshots (Admin only)
+    """
+    return memory_profiler.list_snapshots()
+
+
+@router.get("/admin/profiling/memory/diff", tags=["Admin"])
+async def diff_memory_snapshots(
+    request: Request,
+    base: int = Query(..., description="Earlier snapshot ID"),
+    current: Optional[int] = Query(None, description="Later snapshot ID (default: take one now)"),
+    group_by: Literal["route", "lineno", "filename"] = Query("route", description="Group allocation growth by route, source line or file"),
+    limit: int = Query(25, ge=1, le=200),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Allocation growth between two snapshots (Admin only)
+
+    `group_by=route` attributes each allocation to the route whose handler
+    is on its traceback and lists the top source lines per route;
+    allocations made outside any handler are reported as "(no route)".
+    """
+    try:
+        if current is None:
+            current = memory_profiler.take_snapshot()["id"]
+        return {
+            "base": base,
+            "current": current,
+            "group_by": group_by,
+            "entries": memory_profiler.diff(request.app, base, current, group_by, limit)
+        }
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Snapshot not found"
+        )
+
+
+@router.get("/admin/profiling/memory/requests", tags=["Admin"])
+async def memory_by_request(
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Peak and retained allocation of sampled requests per route (Admin only)
+    """
+    return {
+        "tracing": memory_profiler.tracing,
+        "sample_rate": memory_profiler.sample_rate,
+        "routes": memory_profiler.request_summary()
+    }
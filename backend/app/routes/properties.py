@@ -4,10 +4,9 @@ Public and admin endpoints for property management
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Optional
-import math
+from typing import Any, Dict, List, Optional
 
 from app.database import get_db
 from app.models.property import Property, PropertyImage, PropertyAmenity, PropertyType, ListingType, AvailabilityStatus
@@ -18,9 +17,29 @@ from app.schemas.property import (
     PropertyUpdate,
     PropertyResponse,
     PropertyListResponse,
-    PropertyImageSchema
+    PropertyImageSchema,
+    PropertySort,
+    PropertyCardResponse,
+    PropertyCardListResponse,
+    PropertyFacetsResponse,
+    PropertyClustersResponse
 )
 from app.utils.auth import get_current_admin
+from app.utils.db_routing import get_async_read_db, get_read_db
+from app.utils.count_cache import count_cache
+from app.utils.facets import compute_facets
+from app.utils.filters import PropertyFilters
+from app.utils.geo import compute_clusters, MAX_ZOOM
+from app.utils.pagination import paginate
+from app.utils.query_shapes import PropertyShape, property_query
+from app.utils.single_flight import coalesced_json
+from app.utils.response_cache import (
+    response_cache,
+    cached_json,
+    make_key,
+    property_list_tags,
+    property_write_tags
+)
 
 router = APIRouter()
 
@@ -33,156 +52,265 @@ router = APIRouter()
 async def get_properties(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(12, ge=1, le=100, description="Items per page"),
-    location: Optional[str] = Query(None, description="Filter by location"),
-    property_type: Optional[PropertyType] = Query(None, description="Filter by property type"),
-    listing_type: Optional[ListingType] = Query(None, description="Filter by listing type"),
-    min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
-    max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
-    bedrooms: Optional[int] = Query(None, ge=0, description="Number of bedrooms"),
-    bathrooms: Optional[int] = Query(None, ge=0, description="Number of bathrooms"),
-    featured: Optional[bool] = Query(None, description="Featured properties only"),
-    availability: Optional[AvailabilityStatus] = Query(None, description="Availability status"),
-    search: Optional[str] = Query(None, description="Search in title and description"),
-    db: Session = Depends(get_db)
+    sort: Optional[PropertySort] = Query(None, description="Sort order (default: distance with `near`, otherwise newest)"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response (keyset pagination)"),
+    estimate_total: bool = Query(False, description="Allow an estimated total for very large result sets"),
+    filters: PropertyFilters = Depends(),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get paginated list of properties with filters
-    """
-    # Build query
-    query = db.query(Property)
-    
-    # Apply filters
-    filters = []
-    
-    if location:
-        filters.append(Property.location.ilike(f"%{location}%"))
-    
-    if property_type:
-        filters.append(Property.property_type == property_type)
-    
-    if listing_type:
-        filters.append(Property.listing_type == listing_type)
-    
-    if min_price is not None:
-        filters.append(Property.price >= min_price)
-    
-    if max_price is not None:
-        filters.append(Property.price <= max_price)
-    
-    if bedrooms is not None:
-        filters.append(Property.bedrooms >= bedrooms)
-    
-    if bathrooms is not None:
-        filters.append(Property.bathrooms >= bathrooms)
     
-    if featured is not None:
-        filters.append(Property.featured == featured)
+    Two pagination modes are supported:
+    - page/page_size: classic offset pagination with total counts
+    - cursor: keyset pagination using `next_cursor` from a previous response;
+      skips the total count and seeks directly to the next rows
     
-    if availability:
-        filters.append(Property.availability == availability)
+    Geo filters (`near` + `radius_km`, `bbox`) use the geohash index and
+    return only rows inside the area; with `near`, results are nearest first
+    and carry `distance_km`.
+    """
+    sort = sort or filters.default_sort()
     
-    if search:
-        search_filter = or_(
-            Property.title.ilike(f"%{search}%"),
-            Property.description.ilike(f"%{search}%")
+    def build(session: Session):
+        query = property_query(session, PropertyShape.LIST).filter(*filters.clauses())
+        
+        result = paginate(
+            query, page, page_size, sort, cursor, filters.relevance(),
+            count_key=filters.cache_key(),
+            estimate_total=estimate_total,
+            distance=filters.distance(),
+            matches=filters.search_matches(),
+            scores=filters.search_scores
         )
-        filters.append(search_filter)
+        filters.annotate(result["properties"])
+        return result
     
-    # Apply all filters
-    if filters:
-        query = query.filter(and_(*filters))
+    # Identical concurrent requests share one query execution
+    key = ("properties", filters.cache_key(), sort.value, page_size, cursor or page, estimate_total)
+    return await coalesced_json(key, db, build, PropertyListResponse)
+
+
+@router.get("/properties/cards", response_model=PropertyCardListResponse, tags=["Public"])
+async def get_property_cards(
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(12, ge=1, le=100, description="Items per page"),
+    sort: Optional[PropertySort] = Query(None, description="Sort order (default: distance with `near`, otherwise newest)"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response (keyset pagination)"),
+    estimate_total: bool = Query(False, description="Allow an estimated total for very large result sets"),
+    filters: PropertyFilters = Depends(),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Get paginated property cards for listing grids
+    Same filters and pagination as /properties, compact payload
+    """
+    def build(session: Session):
+        query = property_query(session, PropertyShape.CARD).filter(*filters.clauses())
+        
+        result = paginate(
+            query, page, page_size, sort or filters.default_sort(), cursor, filters.relevance(),
+            count_key=filters.cache_key(),
+            estimate_total=estimate_total,
+            distance=filters.distance(),
+            matches=filters.search_matches(),
+            scores=filters.search_scores
+        )
+        filters.annotate(result["properties"])
+        
+        return PropertyCardListResponse(**result)
     
-    # Get total count
-    total = query.count()
+    return await db.run_sync(build)
+
+
+@router.get("/properties/facets", response_model=PropertyFacetsResponse, tags=["Public"])
+async def get_property_facets(
+    filters: PropertyFilters = Depends(),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Get per-facet counts (type, listing type, availability, bedrooms, price band)
+    for the current filter set, computed in one grouped query
+    """
+    return await db.run_sync(compute_facets, filters)
+
+
+@router.get("/properties/clusters", response_model=PropertyClustersResponse, tags=["Public"])
+async def get_property_clusters(
+    zoom: int = Query(..., ge=0, le=MAX_ZOOM, description="Map zoom level"),
+    filters: PropertyFilters = Depends(),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Get map clusters for the visible area (`bbox` is required)
     
-    # Calculate pagination
-    total_pages = math.ceil(total / page_size)
-    offset = (page - 1) * page_size
+    Matching properties are grouped by geohash cell, coarser at lower
+    zoom levels. Each cell returns its count, centroid and price range.
+    Accepts the same filters as /properties.
+    """
+    if not filters.bbox:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox is required for clusters"
+        )
     
-    # Get paginated results
-    properties = query.order_by(Property.created_at.desc()).offset(offset).limit(page_size).all()
+    precision, clusters = await db.run_sync(compute_clusters, filters.clauses(), zoom, filters.search_matches())
     
-    return PropertyListResponse(
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages,
-        properties=properties
+    return PropertyClustersResponse(
+        zoom=zoom,
+        precision=precision,
+        total=sum(cluster["count"] for cluster in clusters),
+        clusters=clusters
     )
 
 
 @router.get("/properties/{property_id}", response_model=PropertyResponse, tags=["Public"])
 async def get_property(
     property_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get single property by ID
     """
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
-    
-    if not property_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Property not found"
-        )
+    def build(session: Session):
+        property_obj = property_query(session, PropertyShape.DETAIL).filter(Property.id == property_id).first()
+        
+        if not property_obj:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Property not found"
+            )
+        
+        return property_obj
     
-    return property_obj
+    return await coalesced_json(("properties.detail", property_id), db, build, PropertyResponse)
 
 
 @router.get("/properties/featured/list", response_model=List[PropertyResponse], tags=["Public"])
 async def get_featured_properties(
     limit: int = Query(6, ge=1, le=20, description="Number of featured properties"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get featured properties
     """
-    properties = db.query(Property)\
-        .filter(Property.featured == True)\
-        .filter(Property.availability == AvailabilityStatus.AVAILABLE)\
-        .order_by(Property.created_at.desc())\
-        .limit(limit)\
-        .all()
-    
-    return properties
+    def build(session: Session):
+        return property_query(session, PropertyShape.LIST)\
+            .filter(Property.featured == True)\
+            .filter(Property.availability == AvailabilityStatus.AVAILABLE)\
+            .order_by(Property.created_at.desc())\
+            .limit(limit)\
+            .all()
+    
+    return await cached_json(
+        make_key("properties.featured.list", limit=limit),
+        db,
+        build,
+        List[PropertyResponse],
+        property_list_tags("featured")
+    )
 
 
 @router.get("/properties/trending/list", response_model=List[PropertyResponse], tags=["Public"])
 async def get_trending_properties(
     limit: int = Query(6, ge=1, le=20, description="Number of trending properties"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get recently added properties (trending)
     """
-    properties = db.query(Property)\
-        .filter(Property.availability == AvailabilityStatus.AVAILABLE)\
-        .order_by(Property.created_at.desc())\
-        .limit(limit)\
-        .all()
-    
-    return properties
+    def build(session: Session):
+        return property_query(session, PropertyShape.LIST)\
+            .filter(Property.availability == AvailabilityStatus.AVAILABLE)\
+            .order_by(Property.created_at.desc())\
+            .limit(limit)\
+            .all()
+    
+    return await cached_json(
+        make_key("properties.trending.list", limit=limit),
+        db,
+        build,
+        List[PropertyResponse],
+        property_list_tags("trending")
+    )
+
+
+@router.get("/properties/featured/cards", response_model=List[PropertyCardResponse], tags=["Public"])
+async def get_featured_property_cards(
+    limit: int = Query(6, ge=1, le=20, description="Number of featured properties"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Get featured properties as compact cards
+    """
+    def build(session: Session):
+        return property_query(session, PropertyShape.CARD)\
+            .filter(Property.featured == True)\
+            .filter(Property.availability == AvailabilityStatus.AVAILABLE)\
+            .order_by(Property.created_at.desc())\
+            .limit(limit)\
+            .all()
+    
+    return await cached_json(
+        make_key("properties.featured.cards", limit=limit),
+        db,
+        build,
+        List[PropertyCardResponse],
+        property_list_tags("featured")
+    )
+
+
+@router.get("/properties/trending/cards", response_model=List[PropertyCardResponse], tags=["Public"])
+async def get_trending_property_cards(
+    limit: int = Query(6, ge=1, le=20, description="Number of trending properties"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Get recently added properties (trending) as compact cards
+    """
+    def build(session: Session):
+        return property_query(session, PropertyShape.CARD)\
+            .filter(Property.availability == AvailabilityStatus.AVAILABLE)\
+            .order_by(Property.created_at.desc())\
+            .limit(limit)\
+            .all()
+    
+    return await cached_json(
+        make_key("properties.trending.cards", limit=limit),
+        db,
+        build,
+        List[PropertyCardResponse],
+        property_list_tags("trending")
+    )
 
 
 @router.get("/neighborhoods", tags=["Public"])
-async def get_neighborhoods(db: Session = Depends(get_db)):
+async def get_neighborhoods(db: AsyncSession = Depends(get_async_read_db)):
     """
     Get unique neighborhoods with property counts
     """
     from sqlalchemy import func
     
-    neighborhoods = db.query(
-        Property.location,
-        func.count(Property.id).label('count')
-    ).group_by(Property.location)\
-     .order_by(func.count(Property.id).desc())\
-     .all()
+    def build(session: Session):
+        neighborhoods = session.query(
+            Property.location,
+            func.count(Property.id).label('count')
+        ).group_by(Property.location)\
+         .order_by(func.count(Property.id).desc())\
+         .all()
+        
+        return [
+            {"name": location, "property_count": count}
+            for location, count in neighborhoods
+        ]
     
-    return [
-        {"name": location, "property_count": count}
-        for location, count in neighborhoods
-    ]
+    return await cached_json(
+        make_key("neighborhoods"),
+        db,
+        build,
+        List[Dict[str, Any]],
+        lambda result: ["location:*"]
+    )
 
 
 # ============================================
@@ -233,6 +361,9 @@ async def create_property(
         db.commit()
         db.refresh(new_property)
     
+    count_cache.invalidate()
+    response_cache.invalidate(*property_write_tags(new_property, created=True))
+    
     return new_property
 
 
@@ -256,6 +387,7 @@ async def update_property(
     
     # Update fields that are provided
     update_data = property_data.model_dump(exclude_unset=True, exclude={'amenity_ids'})
+    cache_tags = property_write_tags(property_obj, changed=update_data)
     for field, value in update_data.items():
         setattr(property_obj, field, value)
     
@@ -275,6 +407,9 @@ async def update_property(
     db.commit()
     db.refresh(property_obj)
     
+    count_cache.invalidate()
+    response_cache.invalidate(*cache_tags, *property_write_tags(property_obj, changed=update_data))
+    
     return property_obj
 
 
@@ -296,20 +431,24 @@ async def delete_property(
         )
     
     # Delete associated images from disk
-    from app.utils.image import delete_file
+    from app.utils.image import delete_image_files
     for image in property_obj.images:
-        delete_file(image.image_url)
+        delete_image_files(image.image_url, image.variants)
     
     # Delete property (cascade will delete images and amenities)
+    cache_tags = property_write_tags(property_obj, deleted=True)
     db.delete(property_obj)
     db.commit()
     
+    count_cache.invalidate()
+    response_cache.invalidate(*cache_tags)
+    
     return None
 
 
 @router.get("/admin/dashboard/stats", tags=["Admin"])
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: Admin = Depends(get_current_admin)
 ):
     """
@@ -1,17 +1,33 @@
 """
 File Upload Routes
-Image upload endpoints for property images
+Image upload endpoints for property images, including resumable chunked uploads
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from typing import List
 
+from app.config import settings
 from app.database import get_db
 from app.models.property import Property, PropertyImage
 from app.models.admin import Admin
 from app.utils.auth import get_current_admin
-from app.utils.image import save_uploaded_file, delete_file
+from app.schemas.upload import UploadSessionCreate, UploadSessionResponse
+from app.utils.image import (
+    save_uploaded_image,
+    store_image,
+    allocate_upload_path,
+    validate_image_name,
+    delete_image_files
+)
+from app.utils.response_cache import response_cache
+from app.utils.upload_sessions import upload_sessions, parse_chunk_start
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -37,13 +53,36 @@ async def upload_property_image(
     
     # Save uploaded file
     try:
-        file_path = await save_uploaded_file(file, subfolder=str(property_id))
+        saved = await save_uploaded_image(file, subfolder=str(property_id))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error uploading file: {str(e)}"
         )
     
+    property_image = add_property_image(db, property_id, saved, is_primary)
+    
+    return {
+        "message": "Image uploaded successfully",
+        "image": image_summary(property_image)
+    }
+
+
+def add_property_image(db: Session, property_id: int, saved: dict, is_primary: bool) -> PropertyImage:
+    """
+    Record a stored upload as the property's last image
+    
+    Args:
+        db: Database session
+        property_id: Property the image belongs to
+        saved: Result of save_uploaded_image / store_image
+        is_primary: Make it the primary image (unsets the current one)
+        
+    Returns:
+        The committed PropertyImage
+    """
     # If setting as primary, unset other primary images
     if is_primary:
         db.query(PropertyImage)\
@@ -58,7 +97,8 @@ async def upload_property_image(
     # Create property image record
     property_image = PropertyImage(
         property_id=property_id,
-        image_url=file_path,
+        image_url=saved["url"],
+        variants=saved["variants"],
         is_primary=is_primary,
         display_order=max_order
     )
@@ -67,14 +107,67 @@ async def upload_property_image(
     db.commit()
     db.refresh(property_image)
     
+    response_cache.invalidate(f"property:{property_id}")
+    return property_image
+
+
+def image_summary(property_image: PropertyImage) -> dict:
+    """Upload response fields of an image"""
     return {
-        "message": "Image uploaded successfully",
-        "image": {
-            "id": property_image.id,
-            "url": property_image.image_url,
-            "is_primary": property_image.is_primary
+        "id": property_image.id,
+        "url": property_image.image_url,
+        "variants": property_image.variants,
+        "is_primary": property_image.is_primary
+    }
+
+
+def insert_property_images(db: Session, property_id: int, saved_images: List[dict]) -> List[dict]:
+    """
+    Record stored uploads as the property's last images in one transaction
+    
+    The rows go in as a single multi-row INSERT (the driver batches the
+    executemany) and are read back once for their IDs, as MySQL has no
+    RETURNING. The first image becomes primary if the property has none.
+    
+    Args:
+        db: Database session
+        property_id: Property the images belong to
+        saved_images: Results of save_uploaded_image, in display order
+        
+    Returns:
+        image_summary() of each inserted image, in the same order
+    """
+    # Check if property has primary image
+    has_primary = db.query(PropertyImage.id)\
+        .filter(PropertyImage.property_id == property_id)\
+        .filter(PropertyImage.is_primary == True)\
+        .first() is not None
+    
+    # Get current max order
+    max_order = db.query(PropertyImage)\
+        .filter(PropertyImage.property_id == property_id)\
+        .count()
+    
+    db.execute(insert(PropertyImage), [
+        {
+            "property_id": property_id,
+            "image_url": saved["url"],
+            "variants": saved["variants"],
+            "is_primary": not has_primary and index == 0,
+            "display_order": max_order + index,
         }
+        for index, saved in enumerate(saved_images)
+    ])
+    
+    urls = [saved["url"] for saved in saved_images]
+    inserted = {
+        image.image_url: image_summary(image)
+        for image in db.query(PropertyImage)
+            .filter(PropertyImage.property_id == property_id)
+            .filter(PropertyImage.image_url.in_(urls))
     }
+    db.commit()
+    return [inserted[url] for url in urls]
 
 
 @router.post("/admin/upload/property-images/{property_id}", tags=["Admin"])
@@ -86,7 +179,11 @@ async def upload_multiple_property_images(
 ):
     """
     Upload multiple images for a property (Admin only)
-    First image is set as primary if no primary exists
+    
+    Files are processed concurrently (IMAGE_WORKERS at a time) and the
+    stored ones are recorded in one transaction. `results` reports each
+    file in upload order; failed files leave nothing behind. The first
+    stored image is set as primary if no primary exists.
     """
     # Check if property exists
     property_obj = db.query(Property).filter(Property.id == property_id).first()
@@ -96,59 +193,65 @@ async def upload_multiple_property_images(
             detail="Property not found"
         )
     
-    # Check if property has primary image
-    has_primary = db.query(PropertyImage)\
-        .filter(PropertyImage.property_id == property_id)\
-        .filter(PropertyImage.is_primary == True)\
-        .first() is not None
+    if len(files) > settings.UPLOAD_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many files. Maximum: {settings.UPLOAD_MAX_FILES}"
+        )
     
-    # Get current max order
-    max_order = db.query(PropertyImage)\
-        .filter(PropertyImage.property_id == property_id)\
-        .count()
+    # Release the connection while the images are processed
+    db.rollback()
+    
+    results: List[dict] = [{"filename": file.filename} for file in files]
+    slots = asyncio.Semaphore(max(settings.IMAGE_WORKERS, 1))
+    
+    async def save(index: int, file: UploadFile) -> None:
+        async with slots:
+            try:
+                results[index]["saved"] = await save_uploaded_image(file, subfolder=str(property_id))
+            except HTTPException as e:
+                results[index].update(status_code=e.status_code, error=e.detail)
+            except Exception as e:
+                logger.error(f"❌ Error uploading file {file.filename}: {e}")
+                results[index].update(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, error=str(e))
+    
+    images: List[dict] = []
+    saves = [asyncio.ensure_future(save(index, file)) for index, file in enumerate(files)]
+    try:
+        await asyncio.gather(*saves)
+        stored = [result for result in results if "saved" in result]
+        if stored:
+            images = insert_property_images(db, property_id, [result["saved"] for result in stored])
+    except BaseException:
+        # Database failure or cancelled request: stop the other saves and
+        # wait for them to end, then remove every file the batch stored
+        # (saves cancelled mid-job are cleaned up by store_image)
+        for task in saves:
+            task.cancel()
+        await asyncio.gather(*saves, return_exceptions=True)
+        db.rollback()
+        for result in results:
+            if "saved" in result:
+                delete_image_files(result["saved"]["url"], result["saved"]["variants"])
+        raise
     
-    uploaded_images = []
-    
-    for index, file in enumerate(files):
-        try:
-            # Save file
-            file_path = await save_uploaded_file(file, subfolder=str(property_id))
-            
-            # First image is primary if none exists
-            is_primary = (not has_primary and index == 0)
-            
-            # Create image record
-            property_image = PropertyImage(
-                property_id=property_id,
-                image_url=file_path,
-                is_primary=is_primary,
-                display_order=max_order + index
-            )
-            
-            db.add(property_image)
-            db.commit()
-            db.refresh(property_image)
-            
-            uploaded_images.append({
-                "id": property_image.id,
-                "url": property_image.image_url,
-                "is_primary": property_image.is_primary
-            })
-            
-        except Exception as e:
-            # Continue with other files if one fails
-            print(f"Error uploading file {file.filename}: {e}")
-            continue
-    
-    if not uploaded_images:
+    for result, image in zip(stored, images):
+        del result["saved"]
+        result.update(status_code=status.HTTP_201_CREATED, image=image)
+    
+    if not stored:
+        client_errors = all(result["status_code"] < 500 for result in results)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to upload any images"
+            status_code=status.HTTP_400_BAD_REQUEST if client_errors else status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": "Failed to upload any images", "results": results}
         )
     
+    response_cache.invalidate(f"property:{property_id}")
+    
     return {
-        "message": f"Uploaded {len(uploaded_images)} images successfully",
-        "images": uploaded_images
+        "message": f"Uploaded {len(stored)} of {len(files)} images successfully",
+        "images": [result["image"] for result in stored],
+        "results": results
     }
 
 
@@ -170,12 +273,15 @@ async def delete_property_image(
         )
     
     # Delete file from disk
-    delete_file(image.image_url)
+    delete_image_files(image.image_url, image.variants)
     
     # Delete database record
+    property_id = image.property_id
     db.delete(image)
     db.commit()
     
+    response_cache.invalidate(f"property:{property_id}")
+    
     return None
 
 
@@ -206,8 +312,142 @@ async def set_primary_image(
     image.is_primary = True
     db.commit()
     
+    response_cache.invalidate(f"property:{image.property_id}")
+    
     return {
         "message": "Primary image updated successfully",
         "image_id": image_id
     }
 
+
+
+# ============================================
+# RESUMABLE UPLOADS
+# ============================================
+# One session per file: create it, then PATCH the bytes in chunks with
+# `Content-Range: bytes start-end/total` (or tus-style `Upload-Offset`).
+# After a dropped connection, GET the session and resume from `offset`.
+# The last chunk stores the image like a regular upload.
+
+@router.post(
+    "/admin/upload/property-image/{property_id}/sessions",
+    response_model=UploadSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["Admin"]
+)
+async def create_upload_session(
+    property_id: int,
+    upload: UploadSessionCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Start a resumable image upload for a property (Admin only)
+    """
+    property_obj = db.query(Property).filter(Property.id == property_id).first()
+    if not property_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    
+    validate_image_name(upload.filename)
+    session = upload_sessions.create(property_id, current_admin.id, upload.filename, upload.size, upload.is_primary)
+    
+    response.headers["Location"] = f"/api/admin/upload/sessions/{session['session_id']}"
+    response.headers["Upload-Offset"] = "0"
+    return session
+
+
+@router.get("/admin/upload/sessions/{session_id}", response_model=UploadSessionResponse, tags=["Admin"])
+async def get_upload_session(
+    session_id: str,
+    response: Response,
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Get the received offset of a resumable upload (Admin only)
+    """
+    session = upload_sessions.get(session_id, current_admin.id)
+    response.headers["Upload-Offset"] = str(session["offset"])
+    return session
+
+
+@router.patch("/admin/upload/sessions/{session_id}", response_model=UploadSessionResponse, tags=["Admin"])
+async def upload_session_chunk(
+    session_id: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Append a chunk to a resumable upload (Admin only)
+    
+    The request body is the raw chunk. The chunk must start at the
+    session's offset (409 otherwise, with the offset to resume from).
+    When the last byte arrives the image is processed and recorded, and
+    `image` is returned; if that fails with 503, resend an empty chunk
+    at the final offset to retry.
+    """
+    async with upload_sessions.locked(session_id):
+        session = upload_sessions.get(session_id, current_admin.id)
+        start, length = parse_chunk_start(
+            request.headers.get("content-range"),
+            request.headers.get("upload-offset"),
+            session["size"]
+        )
+        session = await upload_sessions.append(session, start, length, request.stream())
+        response.headers["Upload-Offset"] = str(session["offset"])
+        
+        if session["complete"]:
+            session["image"] = image_summary(await finish_upload_session(db, session))
+    
+    return session
+
+
+@router.delete("/admin/upload/sessions/{session_id}", tags=["Admin"], status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_upload_session(
+    session_id: str,
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Cancel a resumable upload and discard its received bytes (Admin only)
+    
+    Takes the chunk lock first, so a chunk being appended or a finishing
+    upload is not pulled out from under its request (409 while one is).
+    """
+    async with upload_sessions.locked(session_id):
+        upload_sessions.get(session_id, current_admin.id)
+        upload_sessions.delete(session_id)
+    return None
+
+
+async def finish_upload_session(db: Session, session: dict) -> PropertyImage:
+    """
+    Store a completely received upload and record it on its property
+    
+    The session is removed unless the image pool was saturated (503),
+    in which case the client may retry.
+    """
+    property_id = session["property_id"]
+    property_obj = db.query(Property).filter(Property.id == property_id).first()
+    if not property_obj:
+        upload_sessions.delete(session["session_id"])
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    
+    file_path = allocate_upload_path(session["filename"], subfolder=str(property_id))
+    try:
+        saved = await store_image(upload_sessions.data_path(session["session_id"]), file_path, subfolder=str(property_id))
+    except HTTPException as e:
+        if e.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+            upload_sessions.delete(session["session_id"])
+        raise
+    
+    property_image = add_property_image(db, property_id, saved, session["is_primary"])
+    upload_sessions.delete(session["session_id"])
+    return property_image
@@ -21,6 +21,10 @@ from app.schemas.amenity import (
     AmenityCreate,
     AmenityResponse
 )
+from app.schemas.upload import (
+    UploadSessionCreate,
+    UploadSessionResponse
+)
 
 __all__ = [
     "PropertyBase",
@@ -34,6 +38,8 @@ __all__ = [
     "TokenResponse",
     "AmenityBase",
     "AmenityCreate",
-    "AmenityResponse"
+    "AmenityResponse",
+    "UploadSessionCreate",
+    "UploadSessionResponse"
 ]
 
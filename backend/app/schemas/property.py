@@ -3,21 +3,77 @@ Property Schemas
 Pydantic models for property API requests/responses
 """
 
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, computed_field, field_validator, model_validator
+from typing import Optional, List, Dict
 from datetime import datetime
 from decimal import Decimal
+import enum
 
+from app.config import settings
 from app.models.property import PropertyType, ListingType, AvailabilityStatus
 
 
+class PropertySort(str, enum.Enum):
+    """Sort order for property listings"""
+    NEWEST = "newest"
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+    RELEVANCE = "relevance"
+    DISTANCE = "distance"
+
+
+class SearchMode(str, enum.Enum):
+    """Search strategy for the `search` parameter"""
+    LIKE = "like"          # Substring scan on title and description
+    NATURAL = "natural"    # FULLTEXT natural-language mode
+    BOOLEAN = "boolean"    # FULLTEXT boolean mode, every word required as a prefix
+    BM25 = "bm25"          # In-process BM25 index over title, description and location
+
+
+class ImageVariantSchema(BaseModel):
+    """One resized/re-encoded copy of a property image"""
+    url: str
+    width: int
+    height: int
+    format: str  # MIME type, e.g. image/webp
+
+
+def build_srcset(variants: Optional[List[ImageVariantSchema]]) -> Optional[str]:
+    """
+    `srcset` value over the variants in the preferred format
+    (first of IMAGE_VARIANT_FORMATS the image has), narrowest first
+    """
+    if not variants:
+        return None
+    for name in settings.image_variant_formats:
+        candidates = [variant for variant in variants if variant.format == f"image/{name}"]
+        if candidates:
+            return ", ".join(f"{variant.url} {variant.width}w" for variant in sorted(candidates, key=lambda v: v.width))
+    return None
+
+
 class PropertyImageSchema(BaseModel):
-    """Property image schema"""
+    """
+    Property image schema
+    `variants` lists every size and format (for <picture> sources);
+    `srcset` covers the preferred format for a plain <img srcset>
+    """
     id: Optional[int] = None
     image_url: str
+    variants: List[ImageVariantSchema] = []
     is_primary: bool = False
     display_order: int = 0
     
+    @field_validator('variants', mode='before')
+    def default_variants(cls, value):
+        """Images uploaded before variants existed have none"""
+        return value or []
+    
+    @computed_field
+    @property
+    def srcset(self) -> Optional[str]:
+        return build_srcset(self.variants)
+    
     class Config:
         from_attributes = True
 
@@ -28,6 +84,11 @@ class AmenitySchema(BaseModel):
     name: str
     icon: Optional[str] = None
     
+    @model_validator(mode='before')
+    def unwrap_property_amenity(cls, data):
+        """Read through PropertyAmenity link rows to the linked amenity"""
+        return getattr(data, 'amenity', data)
+    
     class Config:
         from_attributes = True
 
@@ -79,20 +140,98 @@ class PropertyResponse(PropertyBase):
     amenities: List[AmenitySchema] = []
     created_at: datetime
     updated_at: Optional[datetime] = None
+    distance_km: Optional[float] = None  # Set when filtering with `near`
     
     class Config:
         from_attributes = True
 
 
 class PropertyListResponse(BaseModel):
-    """Schema for paginated property list response"""
-    total: int
-    page: int
+    """
+    Schema for paginated property list response
+    In cursor mode the expensive total count is skipped, so total,
+    page and total_pages are null
+    """
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
     properties: List[PropertyResponse]
 
 
+class PropertyCardResponse(BaseModel):
+    """Compact property schema for listing grids (no description, images or amenities)"""
+    id: int
+    title: str
+    property_type: PropertyType
+    listing_type: ListingType
+    price: Decimal
+    location: str
+    bedrooms: int
+    bathrooms: int
+    availability: AvailabilityStatus
+    featured: bool = False
+    primary_image_url: Optional[str] = None
+    primary_image_variants: Optional[List[ImageVariantSchema]] = Field(None, exclude=True)
+    created_at: datetime
+    distance_km: Optional[float] = None  # Set when filtering with `near`
+    
+    @computed_field
+    @property
+    def primary_image_srcset(self) -> Optional[str]:
+        return build_srcset(self.primary_image_variants)
+    
+    class Config:
+        from_attributes = True
+
+
+class PropertyCardListResponse(BaseModel):
+    """Schema for paginated property card list response"""
+    total: Optional[int] = None
+    page: Optional[int] = None
+    page_size: int
+    total_pages: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+    properties: List[PropertyCardResponse]
+
+
+class FacetCount(BaseModel):
+    """Count of matching properties for one facet value"""
+    value: str
+    count: int
+
+
+class PropertyFacetsResponse(BaseModel):
+    """
+    Schema for facet counts
+    Each facet ignores its own filter so alternative choices keep their counts
+    """
+    total: int
+    facets: Dict[str, List[FacetCount]]
+
+
+class PropertyCluster(BaseModel):
+    """Map cluster: matching properties aggregated into one geohash cell"""
+    cell: str
+    count: int
+    latitude: float   # Centroid of the cell's properties
+    longitude: float
+    min_price: Decimal
+    max_price: Decimal
+    property_id: Optional[int] = None  # Set for single-property cells (render as a pin)
+
+
+class PropertyClustersResponse(BaseModel):
+    """Schema for map clusters at a zoom level"""
+    zoom: int
+    precision: int
+    total: int
+    clusters: List[PropertyCluster]
+
+
 class PropertyFilterParams(BaseModel):
     """Schema for property filtering parameters"""
     location: Optional[str] = None
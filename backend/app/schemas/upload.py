@@ -0,0 +1,27 @@
+"""
+Upload Schemas
+Pydantic models for resumable image upload sessions
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class UploadSessionCreate(BaseModel):
+    """Schema for starting a resumable image upload"""
+    filename: str = Field(..., min_length=1, max_length=255, description="Original file name (extension is validated)")
+    size: int = Field(..., gt=0, description="Total file size in bytes")
+    is_primary: bool = Field(False, description="Set as primary image once complete")
+
+
+class UploadSessionResponse(BaseModel):
+    """Upload session state; `offset` is where the next chunk starts"""
+    session_id: str
+    property_id: int
+    filename: str
+    size: int
+    offset: int
+    complete: bool = False
+    expires_at: datetime
+    image: Optional[dict] = None  # The stored image, once the last chunk is received
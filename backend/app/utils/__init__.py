@@ -11,8 +11,10 @@ from app.utils.auth import (
 )
 from app.utils.image import (
     save_uploaded_file,
+    save_uploaded_image,
     resize_image,
-    delete_file
+    delete_file,
+    delete_image_files
 )
 
 __all__ = [
@@ -21,7 +23,9 @@ __all__ = [
     "create_access_token",
     "get_current_admin",
     "save_uploaded_file",
+    "save_uploaded_image",
     "resize_image",
-    "delete_file"
+    "delete_file",
+    "delete_image_files"
 ]
 
@@ -106,6 +106,23 @@ def decode_token(token: str) -> TokenData:
         raise credentials_exception
 
 
+def get_active_admin(db: Session, admin_id: int) -> Optional[Admin]:
+    """
+    Look up the admin a token belongs to
+    
+    Args:
+        db: Database session
+        admin_id: Admin ID from a verified token
+        
+    Returns:
+        Admin object, or None if the account was deleted or deactivated
+    """
+    admin = db.query(Admin).filter(Admin.id == admin_id).first()
+    if admin is None or not admin.is_active:
+        return None
+    return admin
+
+
 async def get_current_admin(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -126,12 +143,12 @@ async def get_current_admin(
     token = credentials.credentials
     token_data = decode_token(token)
     
-    admin = db.query(Admin).filter(Admin.id == token_data.admin_id).first()
+    admin = get_active_admin(db, token_data.admin_id)
     
     if admin is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Admin user not found",
+            detail="Admin user not found or inactive",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
@@ -139,6 +156,9 @@ async def get_current_admin(
     admin.last_login = datetime.utcnow()
     db.commit()
     
+    # Later commits on this session are the admin's writes (read-your-writes routing)
+    db.info["admin_id"] = admin.id
+    
     return admin
 
 
@@ -0,0 +1,133 @@
+"""
+Listing Count Utilities
+Cached exact counts and statistics-based estimates for paginated listings
+"""
+
+import threading
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.config import settings
+
+
+class CountCache:
+    """
+    Bounded TTL cache of listing totals keyed by normalized filter set
+
+    Admin writes call invalidate(); the TTL bounds staleness for writes
+    handled by other worker processes.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        """Get a cached count, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, total = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return total
+
+    def set(self, key: Hashable, total: int) -> None:
+        """Store a count"""
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # Drop the entry closest to expiry
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, total)
+
+    def invalidate(self) -> None:
+        """Drop every cached count (called after property writes)"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global count cache instance
+count_cache = CountCache(
+    ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+    max_entries=settings.COUNT_CACHE_MAX_ENTRIES
+)
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN for a SELECT, compiled with the SELECT's bound parameters"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN " + compiler.process(element.statement, **kw)
+
+
+def estimate_count(db: Session, query: Query) -> Optional[int]:
+    """
+    Estimate a query's row count from optimizer statistics (MySQL EXPLAIN)
+
+    Args:
+        db: Database session
+        query: Filtered property query
+
+    Returns:
+        Estimated row count, or None when the database has no estimate
+    """
+    bind = db.get_bind()
+    if bind.dialect.name not in ("mysql", "mariadb"):
+        return None
+
+    # Search and location text stay bound parameters, never inlined SQL
+    row = db.execute(Explain(query.order_by(None).statement)).mappings().first()
+    if row is None or row.get("rows") is None:
+        return None
+
+    filtered = row.get("filtered") or 100
+    return int(row["rows"] * float(filtered) / 100)
+
+
+def get_total(db: Session, query: Query, key: Optional[Hashable] = None, estimate: bool = False) -> Tuple[int, bool]:
+    """
+    Count the rows of a listing query
+
+    Exact counts are served from the cache when a key is given. In
+    estimated mode, result sets larger than COUNT_ESTIMATE_THRESHOLD
+    return the optimizer's estimate instead of running COUNT(*).
+
+    Args:
+        db: Database session
+        query: Filtered property query
+        key: Normalized filter key for the count cache
+        estimate: Allow a statistics-based estimate
+
+    Returns:
+        Tuple of (total, total_is_estimate)
+    """
+    if key is not None:
+        cached = count_cache.get(key)
+        if cached is not None:
+            return cached, False
+
+    if estimate:
+        estimated = estimate_count(db, query)
+        if estimated is not None and estimated >= settings.COUNT_ESTIMATE_THRESHOLD:
+            return estimated, True
+
+    total = query.order_by(None).count()
+    if key is not None:
+        count_cache.set(key, total)
+    return total, False
@@ -0,0 +1,294 @@
+"""
+Read-Replica Routing
+Sends read-only traffic to healthy replicas, keeping writes and read-your-writes reads on the primary
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import hmac
+import itertools
+import logging
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import engine, async_engine
+from app.db_pool import instrument, pool_options
+from app.utils.auth import decode_token
+
+logger = logging.getLogger(__name__)
+
+# Header carrying the read-your-writes token (issued after a write, echoed by the client)
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica and writes to the primary
+
+    The engines are given per session in `info` ("primary", and "replica"
+    when one was picked). SELECTs use the replica; flushes and any other
+    statement go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica = self.info.get("replica")
+        if replica is None or self._flushing or (clause is not None and not getattr(clause, "is_select", False)):
+            return self.info["primary"]
+        return replica
+
+
+class Replica:
+    """A replica's sync and async engines and its health state"""
+
+    def __init__(self, url: str, async_url: str):
+        self.url = url
+        self.engine = create_engine(url, **pool_options())
+        self.async_engine = create_async_engine(async_url, **pool_options())
+        self.healthy = True
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_checked: Optional[float] = None
+
+        # Fail over as soon as a request sees the replica drop
+        for target in (self.engine, self.async_engine.sync_engine):
+            event.listen(target, "handle_error", self._on_error)
+        instrument(self.engine, f"replica:{self.name}")
+        instrument(self.async_engine.sync_engine, f"replica_async:{self.name}")
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect:
+            self.mark_down(str(context.original_exception))
+
+    def mark_down(self, error: str) -> None:
+        if self.healthy:
+            logger.warning(f"⚠️  Replica {self.name} marked unhealthy: {error}")
+        self.healthy = False
+        self.failures += 1
+        self.last_error = error
+
+    @property
+    def name(self) -> str:
+        """Replica URL without credentials"""
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaRouter:
+    """
+    Picks a healthy replica per read session (round robin)
+
+    Reads that carry a valid read-your-writes token (see
+    issue_read_your_writes_token) stay on the primary.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url, settings.to_async_url(url)) for url in urls]
+        self._cycle = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._lock = threading.Lock()
+        self.reads_routed = 0
+        self.reads_on_primary = 0
+
+    def pick(self) -> Optional[Replica]:
+        """Next healthy replica, or None to use the primary"""
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[next(self._cycle)]
+                if replica.healthy:
+                    self.reads_routed += 1
+                    return replica
+            self.reads_on_primary += 1
+            return None
+
+    @staticmethod
+    async def _probe(replica: Replica) -> None:
+        async with replica.async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def check_health(self) -> None:
+        """Probe every replica with SELECT 1 and update its health"""
+        for replica in self.replicas:
+            try:
+                # The timeout covers connecting too: a replica can hang in the handshake
+                await asyncio.wait_for(self._probe(replica), timeout=settings.REPLICA_HEALTH_TIMEOUT_SECONDS)
+                if not replica.healthy:
+                    logger.info(f"✅ Replica {replica.name} is healthy again")
+                replica.healthy = True
+                replica.last_error = None
+            except Exception as e:
+                replica.mark_down(str(e) or type(e).__name__)
+            replica.last_checked = time.time()
+
+    def status(self) -> Dict[str, Any]:
+        """Replica health and routing counters"""
+        return {
+            "replicas": [
+                {
+                    "url": replica.name,
+                    "healthy": replica.healthy,
+                    "failures": replica.failures,
+                    "last_error": replica.last_error,
+                }
+                for replica in self.replicas
+            ],
+            "reads_routed": self.reads_routed,
+            "reads_on_primary": self.reads_on_primary,
+        }
+
+
+# Global replica router (no replicas configured: every read uses the primary)
+replica_router = ReplicaRouter(settings.replica_urls)
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+
+async def run_replica_health_checks() -> None:
+    """Background task: probe replicas every REPLICA_HEALTH_CHECK_SECONDS"""
+    while True:
+        try:
+            await replica_router.check_health()
+        except Exception as e:
+            logger.error(f"❌ Replica health check failed: {e}")
+        await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+
+def request_admin_id(request: Request) -> Optional[int]:
+    """Admin ID from the request's bearer token, if any (no database lookup)"""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return int(decode_token(token).admin_id)
+    except Exception:
+        return None
+
+
+def _use_primary(request: Request) -> bool:
+    if request.method != "GET":
+        return True
+    token = request.headers.get(READ_YOUR_WRITES_HEADER)
+    return token is not None and read_your_writes_active(token, request_admin_id(request))
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Read-mostly session dependency (sync)
+    SELECTs go to a healthy replica unless the requesting admin wrote recently
+    """
+    pinned = _use_primary(request)
+    replica = None if pinned else replica_router.pick()
+    db = ReadSessionLocal(info={
+        "primary": engine,
+        "replica": replica.engine if replica else None,
+        "read_your_writes": pinned,
+    })
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-mostly session dependency (async) for the public GET routes
+    SELECTs go to a healthy replica unless the requesting admin wrote recently
+    """
+    pinned = _use_primary(request)
+    replica = None if pinned else replica_router.pick()
+    info = {
+        "primary": async_engine.sync_engine,
+        "replica": replica.async_engine.sync_engine if replica else None,
+        # Shared results (response cache, single-flight) may predate the write
+        "read_your_writes": pinned,
+    }
+    async with AsyncSession(sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False, info=info) as db:
+        yield db
+
+
+# ============================================
+# READ-YOUR-WRITES TRACKING
+# ============================================
+# The "stay on the primary until" time travels with the client rather than
+# living in one worker's memory: a request that commits a write gets a
+# signed token in the X-Read-Your-Writes response header, and reads that
+# echo it back go to the primary on whichever worker serves them.
+
+# Token to send with the current request's response (set by ReadYourWritesMiddleware)
+_issued: contextvars.ContextVar[Optional[Dict[str, str]]] = contextvars.ContextVar("read_your_writes", default=None)
+
+
+def _sign(message: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"read-your-writes:{message}".encode(), hashlib.sha256).hexdigest()
+
+
+def issue_read_your_writes_token(admin_id: int) -> str:
+    """Token keeping an admin's reads on the primary for READ_YOUR_WRITES_SECONDS"""
+    message = f"{admin_id}.{int(time.time()) + settings.READ_YOUR_WRITES_SECONDS}"
+    return f"{message}.{_sign(message)}"
+
+
+def read_your_writes_active(token: str, admin_id: Optional[int]) -> bool:
+    """Whether a token was issued to this admin and has not expired"""
+    if admin_id is None:
+        return False
+    message, _, signature = token.rpartition(".")
+    token_admin, _, until = message.partition(".")
+    if not until.isdigit() or not hmac.compare_digest(signature, _sign(message)):
+        return False
+    return token_admin == str(admin_id) and time.time() <= int(until)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware adding the read-your-writes token to responses
+    of requests that committed a write (only when replicas are configured)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_router.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        issued: Dict[str, str] = {}
+        token = _issued.set(issued)
+
+        async def send_with_token(message):
+            if message["type"] == "http.response.start" and "token" in issued:
+                headers = list(message.get("headers", []))
+                headers.append((READ_YOUR_WRITES_HEADER.lower().encode(), issued["token"].encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_token)
+        finally:
+            _issued.reset(token)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _note_commit(session):
+    # get_current_admin sets admin_id on the request's session after its own last_login update
+    if session.info.pop("wrote", False) and session.info.get("admin_id") is not None:
+        issued = _issued.get()
+        if issued is not None:
+            issued["token"] = issue_read_your_writes_token(session.info["admin_id"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_flush(session):
+    session.info.pop("wrote", None)
@@ -0,0 +1,146 @@
+"""
+Facet Count Utilities
+Per-facet property counts for the listing filter bar
+"""
+
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models.property import Property, PropertyType, ListingType, AvailabilityStatus
+from app.utils.filters import PropertyFilters
+
+# Bedroom buckets: (label, min bedrooms, max bedrooms or None)
+BEDROOM_BUCKETS: List[Tuple[str, int, int]] = [
+    ("0", 0, 0),
+    ("1", 1, 1),
+    ("2", 2, 2),
+    ("3", 3, 3),
+    ("4", 4, 4),
+    ("5+", 5, None),
+]
+
+# Price band lower bounds in KES (covers monthly rents and sale prices)
+PRICE_BAND_EDGES: List[int] = [0, 10000, 20000, 50000, 100000, 1000000, 5000000, 10000000]
+
+# Each facet and the filter parameters it ignores ("exclude own filter")
+FACET_FILTERS: Dict[str, Tuple[str, ...]] = {
+    "property_type": ("property_type",),
+    "listing_type": ("listing_type",),
+    "availability": ("availability",),
+    "bedrooms": ("bedrooms",),
+    "price": ("min_price", "max_price"),
+}
+
+
+def _price_band_labels() -> List[str]:
+    labels = []
+    for index, lower in enumerate(PRICE_BAND_EDGES):
+        if index + 1 < len(PRICE_BAND_EDGES):
+            labels.append(f"{lower}-{PRICE_BAND_EDGES[index + 1]}")
+        else:
+            labels.append(f"{lower}+")
+    return labels
+
+
+def _bedroom_bucket_expr():
+    """SQL expression mapping bedrooms to its bucket label"""
+    return case(
+        *[
+            (Property.bedrooms >= low if high is None else Property.bedrooms.between(low, high), label)
+            for label, low, high in BEDROOM_BUCKETS
+        ],
+        else_=None
+    )
+
+
+def _price_band_expr():
+    """SQL expression mapping price to its band label"""
+    labels = _price_band_labels()
+    return case(
+        *[
+            (Property.price >= lower, labels[index])
+            for index, lower in reversed(list(enumerate(PRICE_BAND_EDGES)))
+        ],
+        else_=None
+    )
+
+
+def compute_facets(db: Session, filters: PropertyFilters) -> Dict:
+    """
+    Count properties per facet value in a single grouped query
+
+    Filters that no facet ignores go in the WHERE clause. Every faceted
+    filter is selected as a 0/1 flag and grouped alongside the facet
+    columns, so each facet can then be totalled from the (small) grouped
+    result while skipping its own filter.
+
+    Args:
+        db: Database session
+        filters: Active listing filters
+
+    Returns:
+        Dictionary with the matching total and per-facet value counts
+    """
+    clause_map = filters.clause_map()
+    faceted = {name for names in FACET_FILTERS.values() for name in names}
+    flag_names = [name for name in clause_map if name in faceted]
+
+    dimensions = {
+        "property_type": Property.property_type,
+        "listing_type": Property.listing_type,
+        "availability": Property.availability,
+        "bedrooms": _bedroom_bucket_expr(),
+        "price": _price_band_expr(),
+    }
+    flags = [case((clause_map[name], 1), else_=0) for name in flag_names]
+    group_by = list(dimensions.values()) + flags
+
+    matches = filters.search_matches()
+    if matches is None:
+        rows = db.query(*group_by, func.count(Property.id))\
+            .filter(*filters.clauses(exclude=faceted))\
+            .group_by(*group_by)\
+            .all()
+    else:
+        # BM25 search: group in-process, keeping only the rows the index matched
+        grouped: Counter = Counter()
+        for row in db.query(Property.id, *group_by).filter(*filters.clauses(exclude=faceted)).yield_per(1000):
+            if row[0] in matches:
+                grouped[tuple(row[1:])] += 1
+        rows = [(*key, count) for key, count in grouped.items()]
+
+    counts: Dict[str, Dict[str, int]] = {
+        "property_type": {value.value: 0 for value in PropertyType},
+        "listing_type": {value.value: 0 for value in ListingType},
+        "availability": {value.value: 0 for value in AvailabilityStatus},
+        "bedrooms": {label: 0 for label, _, _ in BEDROOM_BUCKETS},
+        "price": {label: 0 for label in _price_band_labels()},
+    }
+    total = 0
+
+    dimension_names = list(dimensions)
+    for row in rows:
+        values = dict(zip(dimension_names, row[:len(dimension_names)]))
+        passed = {name for name, flag in zip(flag_names, row[len(dimension_names):-1]) if flag}
+        count = row[-1]
+
+        if len(passed) == len(flag_names):
+            total += count
+
+        for facet, own_filters in FACET_FILTERS.items():
+            if all(name in passed or name in own_filters for name in flag_names):
+                value = values[facet]
+                key = value.value if hasattr(value, "value") else value
+                if key is not None:
+                    counts[facet][key] = counts[facet].get(key, 0) + count
+
+    return {
+        "total": total,
+        "facets": {
+            facet: [{"value": value, "count": count} for value, count in values.items()]
+            for facet, values in counts.items()
+        }
+    }
@@ -0,0 +1,182 @@
+"""
+Property Filter Utilities
+Shared query-parameter filters for property listing endpoints
+"""
+
+from typing import Any, Dict, List, Optional, Iterable, Set, Tuple
+
+from fastapi import HTTPException, Query, status
+
+from app.config import settings
+from app.models.property import Property, PropertyType, ListingType, AvailabilityStatus
+from app.schemas.property import PropertySort, SearchMode
+from app.utils.geo import parse_point, parse_bbox, near_clause, bbox_clause, distance_sq_expr, annotate_distances
+from app.utils.search import search_clause, relevance_score, index_scores, index_matches
+
+
+class PropertyFilters:
+    """
+    Filter parameters shared by property listing endpoints
+
+    Usage in FastAPI:
+        @router.get("/endpoint")
+        async def endpoint(filters: PropertyFilters = Depends()):
+            query = query.filter(*filters.clauses())
+    """
+
+    def __init__(
+        self,
+        location: Optional[str] = Query(None, description="Filter by location"),
+        property_type: Optional[PropertyType] = Query(None, description="Filter by property type"),
+        listing_type: Optional[ListingType] = Query(None, description="Filter by listing type"),
+        min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
+        max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
+        bedrooms: Optional[int] = Query(None, ge=0, description="Number of bedrooms"),
+        bathrooms: Optional[int] = Query(None, ge=0, description="Number of bathrooms"),
+        featured: Optional[bool] = Query(None, description="Featured properties only"),
+        availability: Optional[AvailabilityStatus] = Query(None, description="Availability status"),
+        search: Optional[str] = Query(None, description="Search in title and description"),
+        search_mode: SearchMode = Query(SearchMode.LIKE, description="Search strategy (FULLTEXT modes fall back to like where unsupported)"),
+        near: Optional[str] = Query(None, description="Only properties near a point: lat,lng"),
+        radius_km: float = Query(5.0, gt=0, description="Radius around `near` in kilometres"),
+        bbox: Optional[str] = Query(None, description="Only properties inside a box: min_lng,min_lat,max_lng,max_lat"),
+    ):
+        self.location = location
+        self.property_type = property_type
+        self.listing_type = listing_type
+        self.min_price = min_price
+        self.max_price = max_price
+        self.bedrooms = bedrooms
+        self.bathrooms = bathrooms
+        self.featured = featured
+        self.availability = availability
+        self.search = search
+        self.search_mode = search_mode
+        self.near = parse_point(near) if near else None
+        self.radius_km = radius_km
+        self.bbox = parse_bbox(bbox) if bbox else None
+        self._matches = None
+        
+        if self.near and radius_km > settings.GEO_MAX_RADIUS_KM:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"radius_km cannot exceed {settings.GEO_MAX_RADIUS_KM:g}"
+            )
+
+    def clause_map(self) -> Dict[str, Any]:
+        """
+        Build SQLAlchemy filter clauses for the active parameters
+
+        Returns:
+            Dictionary of parameter name to filter clause
+        """
+        filters = {}
+
+        if self.location:
+            filters["location"] = Property.location.ilike(f"%{self.location}%")
+
+        if self.property_type:
+            filters["property_type"] = Property.property_type == self.property_type
+
+        if self.listing_type:
+            filters["listing_type"] = Property.listing_type == self.listing_type
+
+        if self.min_price is not None:
+            filters["min_price"] = Property.price >= self.min_price
+
+        if self.max_price is not None:
+            filters["max_price"] = Property.price <= self.max_price
+
+        if self.bedrooms is not None:
+            filters["bedrooms"] = Property.bedrooms >= self.bedrooms
+
+        if self.bathrooms is not None:
+            filters["bathrooms"] = Property.bathrooms >= self.bathrooms
+
+        if self.featured is not None:
+            filters["featured"] = Property.featured == self.featured
+
+        if self.availability:
+            filters["availability"] = Property.availability == self.availability
+
+        if self.search and self.search_matches() is None:
+            filters["search"] = search_clause(self.search, self.search_mode)
+
+        if self.near:
+            filters["near"] = near_clause(*self.near, self.radius_km)
+
+        if self.bbox:
+            filters["bbox"] = bbox_clause(self.bbox)
+
+        return filters
+
+    def clauses(self, exclude: Iterable[str] = ()) -> List:
+        """
+        Build the list of filter clauses for a query
+
+        Args:
+            exclude: Parameter names to leave out (e.g. for facet counts)
+
+        Returns:
+            List of filter clauses
+        """
+        exclude = set(exclude)
+        return [clause for name, clause in self.clause_map().items() if name not in exclude]
+
+    def cache_key(self) -> Tuple:
+        """
+        Normalized, hashable form of the active filters
+        Equivalent filter sets (e.g. differing only in search case or
+        whitespace) produce the same key
+        """
+        values = {
+            "location": self.location.strip().lower() if self.location else None,
+            "property_type": self.property_type.value if self.property_type else None,
+            "listing_type": self.listing_type.value if self.listing_type else None,
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+            "bedrooms": self.bedrooms,
+            "bathrooms": self.bathrooms,
+            "featured": self.featured,
+            "availability": self.availability.value if self.availability else None,
+            "search": " ".join(self.search.lower().split()) if self.search else None,
+            "near": self.near,
+            "radius_km": self.radius_km if self.near else None,
+            "bbox": self.bbox,
+        }
+        if values["search"]:
+            values["search_mode"] = self.search_mode.value
+        return tuple(sorted((name, value) for name, value in values.items() if value is not None))
+
+    def search_matches(self) -> Optional[Set[int]]:
+        """
+        IDs the BM25 index matches for the search term (computed once per request)
+
+        None when the search runs in SQL instead. The set is not part of
+        clauses(): callers run the SQL filters and keep only these IDs,
+        so the database never receives a list of every match.
+        """
+        if self._matches is None and self.search:
+            self._matches = index_matches(self.search, self.search_mode)
+        return self._matches
+
+    def search_scores(self, candidates: Set[int]) -> Dict[int, float]:
+        """BM25 scores of the candidates of a search_matches() search"""
+        return index_scores(self.search, candidates)
+
+    def relevance(self):
+        """Relevance expression for sort=relevance, or None when unavailable"""
+        return relevance_score(self.search, self.search_mode)
+
+    def distance(self):
+        """Distance expression for sort=distance, or None without `near`"""
+        return distance_sq_expr(*self.near) if self.near else None
+
+    def default_sort(self) -> PropertySort:
+        """Sort used when the request gives none: nearest first with `near`, else newest"""
+        return PropertySort.DISTANCE if self.near else PropertySort.NEWEST
+
+    def annotate(self, properties: List) -> None:
+        """Attach distance_km to a result page when filtering by `near`"""
+        if self.near:
+            annotate_distances(properties, *self.near)
@@ -0,0 +1,373 @@
+"""
+Geo Search Utilities
+Geohash-backed radius and bounding-box filters for property coordinates
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, event, func, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.property import Property
+
+# Geohash alphabet and stored precision (9 chars is a cell of roughly 5m x 5m)
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+
+# Kilometres per degree of latitude (mean Earth radius 6371 km)
+KM_PER_DEGREE = 6371.0 * math.pi / 180
+
+# (min_lat, min_lng, max_lat, max_lng)
+BBox = Tuple[float, float, float, float]
+
+
+# ============================================
+# GEOHASH
+# ============================================
+
+def encode_geohash(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    """
+    Encode a coordinate as a geohash
+
+    Args:
+        lat: Latitude in degrees
+        lng: Longitude in degrees
+        precision: Number of geohash characters
+
+    Returns:
+        Geohash string
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Height and width in degrees of a geohash cell at the given precision"""
+    total_bits = 5 * precision
+    lat_bits = total_bits // 2
+    lng_bits = total_bits - lat_bits
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def _cell_span(low: float, high: float, origin: float, size: float, limit: float) -> range:
+    """Indices of the grid cells a [low, high] interval touches"""
+    last = int((limit - origin) / size) - 1
+    first = min(int((low - origin) / size), last)
+    return range(first, min(int((high - origin) / size), last) + 1)
+
+
+def cover_bbox(bbox: BBox, max_cells: int) -> Optional[List[str]]:
+    """
+    Geohash prefixes covering a bounding box
+
+    Picks the longest prefix length whose cells still cover the box in at
+    most `max_cells` cells, so each prefix is one index range scan.
+
+    Args:
+        bbox: Bounding box as (min_lat, min_lng, max_lat, max_lng)
+        max_cells: Upper bound on the number of prefixes
+
+    Returns:
+        List of geohash prefixes, or None when even single-character
+        cells exceed the budget (the caller falls back to coordinate bounds)
+    """
+    min_lat, min_lng, max_lat, max_lng = bbox
+    best = None
+
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size(precision)
+        rows = _cell_span(min_lat, max_lat, -90.0, height, 90.0)
+        cols = _cell_span(min_lng, max_lng, -180.0, width, 180.0)
+        if len(rows) * len(cols) > max_cells:
+            break
+        best = [
+            encode_geohash(-90.0 + (row + 0.5) * height, -180.0 + (col + 0.5) * width, precision)
+            for row in rows
+            for col in cols
+        ]
+
+    return best
+
+
+# ============================================
+# PARAMETER PARSING
+# ============================================
+
+def _parse_floats(value: str, count: int, name: str) -> List[float]:
+    try:
+        numbers = [float(part) for part in value.split(",")]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count or not all(math.isfinite(number) for number in numbers):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} must be {count} comma-separated numbers"
+        )
+    return numbers
+
+
+def _check_coordinate(lat: float, lng: float, name: str) -> None:
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} is outside valid latitude/longitude ranges"
+        )
+
+
+def parse_point(near: str) -> Tuple[float, float]:
+    """
+    Parse a `lat,lng` parameter
+
+    Raises:
+        HTTPException: If the value is malformed or out of range
+    """
+    lat, lng = _parse_floats(near, 2, "near")
+    _check_coordinate(lat, lng, "near")
+    return lat, lng
+
+
+def parse_bbox(bbox: str) -> BBox:
+    """
+    Parse a `min_lng,min_lat,max_lng,max_lat` parameter (GeoJSON order)
+
+    Raises:
+        HTTPException: If the value is malformed, out of range or inverted
+    """
+    min_lng, min_lat, max_lng, max_lat = _parse_floats(bbox, 4, "bbox")
+    _check_coordinate(min_lat, min_lng, "bbox")
+    _check_coordinate(max_lat, max_lng, "bbox")
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox must be min_lng,min_lat,max_lng,max_lat"
+        )
+    return min_lat, min_lng, max_lat, max_lng
+
+
+# ============================================
+# QUERY CLAUSES
+# ============================================
+
+def radius_bbox(lat: float, lng: float, radius_km: float) -> BBox:
+    """Bounding box enclosing a circle around a point"""
+    dlat = radius_km / KM_PER_DEGREE
+    dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return (
+        max(lat - dlat, -90.0),
+        max(lng - dlng, -180.0),
+        min(lat + dlat, 90.0),
+        min(lng + dlng, 180.0),
+    )
+
+
+def bbox_clause(bbox: BBox):
+    """
+    Filter clause for properties inside a bounding box
+
+    The geohash prefixes narrow the lookup to a few index ranges; the
+    coordinate bounds then trim the cell edges exactly. A box too large
+    to cover in GEO_MAX_COVER_CELLS cells (continent-sized and up, where
+    an index would still read most of the table) is filtered by the
+    coordinate bounds alone.
+    """
+    min_lat, min_lng, max_lat, max_lng = bbox
+    bounds = and_(
+        Property.latitude.between(min_lat, max_lat),
+        Property.longitude.between(min_lng, max_lng)
+    )
+
+    prefixes = cover_bbox(bbox, settings.GEO_MAX_COVER_CELLS)
+    if prefixes is None:
+        return bounds
+    return and_(or_(*[Property.geohash.like(f"{prefix}%") for prefix in prefixes]), bounds)
+
+
+def distance_sq_expr(lat: float, lng: float):
+    """
+    SQL expression ordering properties by distance from a point
+
+    Equirectangular projection in squared degrees of latitude: plain
+    arithmetic, so it runs on any database, and accurate to well under
+    1% at city scale.
+    """
+    scale = math.cos(math.radians(lat))
+    dlat = Property.latitude - lat
+    dlng = (Property.longitude - lng) * scale
+    return dlat * dlat + dlng * dlng
+
+
+def near_clause(lat: float, lng: float, radius_km: float):
+    """Filter clause for properties within radius_km of a point"""
+    radius_deg = radius_km / KM_PER_DEGREE
+    return and_(
+        bbox_clause(radius_bbox(lat, lng, radius_km)),
+        distance_sq_expr(lat, lng) <= radius_deg * radius_deg
+    )
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def annotate_distances(properties: List[Any], lat: float, lng: float) -> None:
+    """Set `distance_km` on each property (exact, computed in-process for the page)"""
+    for property_obj in properties:
+        if property_obj.latitude is None or property_obj.longitude is None:
+            property_obj.distance_km = None
+        else:
+            property_obj.distance_km = round(
+                haversine_km(lat, lng, float(property_obj.latitude), float(property_obj.longitude)), 3
+            )
+
+
+# ============================================
+# GEOHASH MAINTENANCE
+# ============================================
+
+@event.listens_for(Property, "before_insert")
+@event.listens_for(Property, "before_update")
+def _set_geohash(mapper, connection, target):
+    """Keep Property.geohash in step with latitude/longitude"""
+    if target.latitude is None or target.longitude is None:
+        target.geohash = None
+    else:
+        target.geohash = encode_geohash(float(target.latitude), float(target.longitude))
+
+
+def backfill_geohashes(db: Session, batch_size: int = 500) -> int:
+    """
+    Compute geohashes for rows written before the column existed
+    (or by scripts that bypass the ORM)
+
+    Returns:
+        Number of rows updated
+    """
+    updated = 0
+    while True:
+        rows = db.query(Property.id, Property.latitude, Property.longitude)\
+            .filter(Property.geohash.is_(None))\
+            .filter(Property.latitude.isnot(None), Property.longitude.isnot(None))\
+            .limit(batch_size)\
+            .all()
+        if not rows:
+            return updated
+
+        db.bulk_update_mappings(Property, [
+            {"id": row.id, "geohash": encode_geohash(float(row.latitude), float(row.longitude))}
+            for row in rows
+        ])
+        db.commit()
+        updated += len(rows)
+
+
+# ============================================
+# MAP CLUSTERS
+# ============================================
+
+# Map zoom level -> geohash prefix length used as the cluster cell key.
+# Prefixes of the stored geohash give every zoom level's cell key, so
+# clustering is a GROUP BY over the geohash index with no extra columns.
+ZOOM_PRECISION = [1, 1, 1, 2, 2, 3, 3, 3, 4, 4, 5, 5, 5, 6, 6, 7, 7, 7, 8, 8, 9, 9, 9]
+MAX_ZOOM = len(ZOOM_PRECISION) - 1
+
+
+def compute_clusters(
+    db: Session,
+    clauses: List,
+    zoom: int,
+    matches: Optional[Set[int]] = None
+) -> Tuple[int, List[dict]]:
+    """
+    Aggregate matching properties into geohash cells for a map zoom level
+
+    Args:
+        db: Database session
+        clauses: Filter clauses (must include a bbox or near clause)
+        zoom: Map zoom level (0-MAX_ZOOM)
+        matches: IDs a BM25 search matched; rows in the area are then
+            aggregated in-process instead of with GROUP BY
+
+    Returns:
+        Tuple of (geohash precision, list of cluster dictionaries)
+    """
+    precision = ZOOM_PRECISION[min(zoom, MAX_ZOOM)]
+    cell = func.substr(Property.geohash, 1, precision)
+
+    if matches is None:
+        rows = db.query(
+            cell,
+            func.count(Property.id),
+            func.avg(Property.latitude),
+            func.avg(Property.longitude),
+            func.min(Property.price),
+            func.max(Property.price),
+            func.min(Property.id)
+        )\
+            .filter(Property.geohash.isnot(None), *clauses)\
+            .group_by(cell)\
+            .all()
+    else:
+        cells: Dict[str, list] = {}
+        points = db.query(cell, Property.id, Property.latitude, Property.longitude, Property.price)\
+            .filter(Property.geohash.isnot(None), *clauses)\
+            .yield_per(1000)
+        for key, property_id, lat, lng, price in points:
+            if property_id not in matches:
+                continue
+            if key not in cells:
+                cells[key] = [key, 0, 0.0, 0.0, price, price, property_id]
+            entry = cells[key]
+            entry[1] += 1
+            entry[2] += float(lat)
+            entry[3] += float(lng)
+            entry[4] = min(entry[4], price)
+            entry[5] = max(entry[5], price)
+            entry[6] = min(entry[6], property_id)
+        rows = [
+            (key, count, lat_sum / count, lng_sum / count, min_price, max_price, first_id)
+            for key, count, lat_sum, lng_sum, min_price, max_price, first_id in cells.values()
+        ]
+
+    clusters = [
+        {
+            "cell": key,
+            "count": count,
+            "latitude": round(float(lat), 6),
+            "longitude": round(float(lng), 6),
+            "min_price": min_price,
+            "max_price": max_price,
+            "property_id": first_id if count == 1 else None,
+        }
+        for key, count, lat, lng, min_price, max_price, first_id in rows
+    ]
+    return precision, clusters
@@ -3,14 +3,37 @@ Image Upload & Processing Utilities
 Handle file uploads, image resizing, and optimization
 """
 
+import asyncio
+import io
 import os
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 from PIL import Image
 from fastapi import UploadFile, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
 
 from app.config import settings
+from app.image_pool import image_pool, optimize_image, process_upload, ImagePoolBusy
+
+try:
+    import magic  # python-magic; needs the libmagic system library
+except ImportError:
+    magic = None
+
+# MIME type and Pillow format of each allowed extension
+IMAGE_TYPES: Dict[str, Tuple[str, str]] = {
+    ".jpg": ("image/jpeg", "JPEG"),
+    ".jpeg": ("image/jpeg", "JPEG"),
+    ".png": ("image/png", "PNG"),
+    ".webp": ("image/webp", "WEBP"),
+    ".gif": ("image/gif", "GIF"),
+    ".avif": ("image/avif", "AVIF"),
+}
+
+# Multipart framing and form fields allowed on top of the file bytes
+UPLOAD_FORM_OVERHEAD = 64 * 1024
 
 
 def ensure_upload_dir() -> Path:
@@ -26,9 +49,34 @@ def ensure_upload_dir() -> Path:
     return upload_path
 
 
+def too_large_error() -> HTTPException:
+    """413 for an upload over MAX_UPLOAD_SIZE"""
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / (1024*1024):.1f}MB"
+    )
+
+
+def validate_image_name(filename: Optional[str]) -> None:
+    """
+    Check an upload's file extension against ALLOWED_EXTENSIONS
+    
+    Raises:
+        HTTPException: If the extension is not allowed
+    """
+    file_ext = os.path.splitext(filename or "")[1].lower()
+    if file_ext not in settings.allowed_extensions_list:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file type. Allowed: {', '.join(settings.allowed_extensions_list)}"
+        )
+
+
 def validate_image_file(file: UploadFile) -> None:
     """
-    Validate uploaded image file
+    Validate uploaded image file name (and size, when the parser recorded it)
+    
+    Content is checked while streaming, see sniff_image().
     
     Args:
         file: Uploaded file object
@@ -36,45 +84,162 @@ def validate_image_file(file: UploadFile) -> None:
     Raises:
         HTTPException: If file is invalid
     """
-    # Check file extension
-    file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in settings.allowed_extensions_list:
+    validate_image_name(file.filename)
+    
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise too_large_error()
+
+
+def sniff_image(header: bytes) -> Tuple[int, int]:
+    """
+    Check an upload's leading bytes before accepting the rest of it
+    
+    The MIME type is sniffed from the magic bytes (python-magic, when
+    libmagic is installed) and the format and dimensions are read from
+    the image header without decoding any pixels.
+    
+    Args:
+        header: First UPLOAD_HEADER_BYTES of the upload (or all of it)
+        
+    Returns:
+        (width, height)
+        
+    Raises:
+        HTTPException: If the content is not an allowed image type or
+            exceeds IMAGE_MAX_PIXELS
+    """
+    allowed = {IMAGE_TYPES[ext] for ext in settings.allowed_extensions_list if ext in IMAGE_TYPES}
+    
+    if magic is not None:
+        mime_type = magic.from_buffer(bytes(header[:2048]), mime=True)
+        if mime_type not in {mime for mime, _ in allowed}:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid file content ({mime_type}). Allowed: {', '.join(settings.allowed_extensions_list)}"
+            )
+    
+    try:
+        with Image.open(io.BytesIO(header)) as img:
+            image_format, (width, height) = img.format, img.size
+    except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed: {', '.join(settings.allowed_extensions_list)}"
+            detail="File is not a readable image"
         )
     
-    # Check file size (read first chunk)
-    file.file.seek(0, 2)  # Seek to end
-    file_size = file.file.tell()
-    file.file.seek(0)  # Reset to beginning
-    
-    if file_size > settings.MAX_UPLOAD_SIZE:
+    if image_format not in {pil_format for _, pil_format in allowed}:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / (1024*1024):.1f}MB"
+            detail=f"Invalid file content ({image_format}). Allowed: {', '.join(settings.allowed_extensions_list)}"
         )
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Image dimensions too large ({width}x{height}). Maximum: {settings.IMAGE_MAX_PIXELS} pixels"
+        )
+    return width, height
 
 
-async def save_uploaded_file(file: UploadFile, subfolder: str = "") -> str:
+async def stream_to_disk(file: UploadFile, path: Path) -> int:
     """
-    Save uploaded file to disk
+    Copy an upload to `path` in UPLOAD_CHUNK_SIZE chunks
+    
+    The form parser has already spooled the upload (bounded by
+    UploadSizeLimitMiddleware); this copy holds only the header
+    (UPLOAD_HEADER_BYTES) and one chunk in memory. The header is sniffed
+    before the rest is written, and copying stops as soon as
+    MAX_UPLOAD_SIZE is exceeded.
+    
+    Args:
+        file: Uploaded file object
+        path: Destination (a temporary name; the caller renames or removes it)
+        
+    Returns:
+        Bytes written
+        
+    Raises:
+        HTTPException: If the content is rejected or too large
+    """
+    size = 0
+    header: Optional[bytearray] = bytearray()
+    with open(path, "wb") as out:
+        while True:
+            chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > settings.MAX_UPLOAD_SIZE:
+                raise too_large_error()
+            if header is not None:
+                header += chunk
+                if len(header) >= settings.UPLOAD_HEADER_BYTES:
+                    sniff_image(header)
+                    header = None
+            await run_in_threadpool(out.write, chunk)
+    
+    # Uploads smaller than the header window
+    if header is not None:
+        sniff_image(header)
+    return size
+
+
+async def save_uploaded_image(file: UploadFile, subfolder: str = "") -> Dict[str, Any]:
+    """
+    Save uploaded image to disk with its responsive variants
+    
+    The upload is streamed to a temporary file under UPLOAD_SESSION_DIR
+    (not served), checked, and processed into place by the image pool;
+    the temporary file is always removed.
     
     Args:
         file: Uploaded file object
         subfolder: Optional subfolder within upload directory
         
     Returns:
-        Relative path to saved file
+        {"url": relative path to saved file, "variants": variant records
+        for PropertyImage.variants}
         
     Raises:
-        HTTPException: If file save fails
+        HTTPException: If the file is rejected (400/413), cannot be saved
+            (500) or the image pool is saturated (503)
     """
     # Validate file
     validate_image_file(file)
     
+    file_path = allocate_upload_path(file.filename, subfolder)
+    # Received bytes stay outside the served UPLOAD_DIR until processed
+    staging = Path(settings.UPLOAD_SESSION_DIR)
+    staging.mkdir(parents=True, exist_ok=True)
+    temp_path = staging / f"{file_path.stem}.upload"
+    
+    try:
+        await stream_to_disk(file, temp_path)
+        return await store_image(temp_path, file_path, subfolder)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error saving file: {str(e)}"
+        )
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def allocate_upload_path(filename: str, subfolder: str = "") -> Path:
+    """
+    Unique path for a new upload, keeping the file's extension
+    
+    Args:
+        filename: Original file name
+        subfolder: Optional subfolder within upload directory (created if missing)
+        
+    Returns:
+        Path within the upload directory
+    """
     # Generate unique filename
-    file_ext = os.path.splitext(file.filename)[1].lower()
+    file_ext = os.path.splitext(filename)[1].lower()
     unique_filename = f"{uuid.uuid4()}{file_ext}"
     
     # Create full path
@@ -83,59 +248,124 @@ async def save_uploaded_file(file: UploadFile, subfolder: str = "") -> str:
         upload_dir = upload_dir / subfolder
         upload_dir.mkdir(parents=True, exist_ok=True)
     
-    file_path = upload_dir / unique_filename
+    return upload_dir / unique_filename
+
+
+def remove_stored_image(file_path: Path) -> None:
+    """Delete a stored image and every variant written beside it"""
+    for path in [file_path, *file_path.parent.glob(f"{file_path.stem}_*")]:
+        if path.exists():
+            path.unlink()
+
+
+async def store_image(source: Path, file_path: Path, subfolder: str = "") -> Dict[str, Any]:
+    """
+    Process a received, header-checked image file into `file_path` and its variants
     
-    try:
-        # Save file
-        contents = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(contents)
+    Args:
+        source: Received file (left in place for the caller to remove)
+        file_path: Final path of the stored image
+        subfolder: Subfolder of file_path within the upload directory
         
-        # Optimize image
-        resize_image(str(file_path))
+    Returns:
+        {"url": relative path to saved file, "variants": variant records}
         
-        # Return relative path
-        if subfolder:
-            return f"{settings.UPLOAD_DIR}/{subfolder}/{unique_filename}"
-        return f"{settings.UPLOAD_DIR}/{unique_filename}"
+    Raises:
+        HTTPException: If the image cannot be decoded (400) or the image
+            pool is saturated (503)
+    """
+    # Relative path
+    if subfolder:
+        url = f"{settings.UPLOAD_DIR}/{subfolder}/{file_path.name}"
+    else:
+        url = f"{settings.UPLOAD_DIR}/{file_path.name}"
+    
+    # Decode, resize and encode (once for every variant) in a worker process, off the event loop
+    job = asyncio.ensure_future(image_pool.run(process_upload, str(source), str(file_path)))
+    try:
+        result = await asyncio.shield(job)
+    except asyncio.CancelledError:
+        # A worker that has started keeps writing after the request is
+        # cancelled (e.g. the client disconnected); nothing will record
+        # its output, so remove it once the job ends
+        def discard(finished: asyncio.Future) -> None:
+            if not finished.cancelled():
+                finished.exception()
+            remove_stored_image(file_path)
         
-    except Exception as e:
-        # Clean up on error
-        if file_path.exists():
-            file_path.unlink()
+        job.add_done_callback(discard)
+        raise
+    except ImagePoolBusy as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error saving file: {str(e)}"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{e}; retry shortly"
+        )
+    except Exception:
+        # Clean up anything a failed worker left behind
+        remove_stored_image(file_path)
+        raise
+    
+    if result["error"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not process image: {result['error']}"
         )
+    
+    return {"url": url, "variants": variant_records(url, result["variants"])}
+
+
+async def save_uploaded_file(file: UploadFile, subfolder: str = "") -> str:
+    """
+    Save uploaded file to disk
+    
+    Args:
+        file: Uploaded file object
+        subfolder: Optional subfolder within upload directory
+        
+    Returns:
+        Relative path to saved file
+        
+    Raises:
+        HTTPException: If file save fails
+    """
+    return (await save_uploaded_image(file, subfolder))["url"]
+
+
+def variant_records(image_url: str, variants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Variant records as stored on PropertyImage.variants
+    
+    Args:
+        image_url: Relative path of the stored image (variants sit beside it)
+        variants: Variants written by the image pool ({"path", "width", "height", "format"})
+        
+    Returns:
+        [{"url", "width", "height", "format"}]
+    """
+    base_url = image_url.rsplit("/", 1)[0]
+    return [
+        {
+            "url": f"{base_url}/{os.path.basename(variant['path'])}",
+            "width": variant["width"],
+            "height": variant["height"],
+            "format": variant["format"],
+        }
+        for variant in variants
+    ]
 
 
 def resize_image(image_path: str) -> None:
     """
-    Resize and optimize image
+    Resize and optimize image in place
+    
+    Blocks on PIL; async code uses save_uploaded_file, which runs this
+    work in the image processing pool.
     
     Args:
         image_path: Path to image file
     """
     try:
-        with Image.open(image_path) as img:
-            # Convert RGBA to RGB if necessary
-            if img.mode == 'RGBA':
-                img = img.convert('RGB')
-            
-            # Resize if larger than max dimensions
-            if img.width > settings.IMAGE_MAX_WIDTH or img.height > settings.IMAGE_MAX_HEIGHT:
-                img.thumbnail(
-                    (settings.IMAGE_MAX_WIDTH, settings.IMAGE_MAX_HEIGHT),
-                    Image.Resampling.LANCZOS
-                )
-            
-            # Save with optimization
-            img.save(
-                image_path,
-                format='JPEG',
-                quality=settings.IMAGE_QUALITY,
-                optimize=True
-            )
+        optimize_image(Path(image_path).read_bytes(), image_path)
     except Exception as e:
         print(f"Error resizing image {image_path}: {e}")
 
@@ -188,3 +418,73 @@ def delete_file(file_path: str) -> bool:
         print(f"Error deleting file {file_path}: {e}")
         return False
 
+
+def delete_image_files(image_url: str, variants: Optional[List[Dict[str, Any]]] = None) -> None:
+    """
+    Delete a stored image and its variants from disk
+    
+    Args:
+        image_url: Relative path of the stored image
+        variants: Its PropertyImage.variants records
+    """
+    delete_file(image_url)
+    for variant in variants or []:
+        if variant["url"] != image_url:
+            delete_file(variant["url"])
+
+
+
+def upload_body_limit(path: str) -> Optional[int]:
+    """Largest request body accepted on an upload route (None for other routes)"""
+    if path.startswith("/api/admin/upload/property-images/"):
+        return settings.MAX_UPLOAD_SIZE * settings.UPLOAD_MAX_FILES + UPLOAD_FORM_OVERHEAD
+    if path.startswith("/api/admin/upload/"):
+        return settings.MAX_UPLOAD_SIZE + UPLOAD_FORM_OVERHEAD
+    return None
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Pure ASGI middleware capping the request body on upload routes
+
+    A declared Content-Length over the limit is rejected before anything
+    is read. Otherwise the body is counted as it is received, so a
+    chunked request (which has no Content-Length) or one that lies about
+    its length is cut off at the limit instead of being spooled whole.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        limit = None
+        if scope["type"] == "http" and scope["method"] in ("POST", "PUT", "PATCH"):
+            limit = upload_body_limit(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": too_large_error().detail}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised while the form is being parsed, so the route
+                    # never runs and the 413 goes out through the app's
+                    # HTTPException handler
+                    raise too_large_error()
+            return message
+
+        await self.app(scope, limited_receive, send)
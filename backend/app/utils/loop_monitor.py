@@ -0,0 +1,222 @@
+"""
+Event Loop Monitor
+Opt-in loop-lag measurement and stack capture for handlers that block the event loop
+"""
+
+import asyncio
+import collections.abc
+import contextvars
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope of the request a task is serving (set by LoopMonitorMiddleware and ProfilingMiddleware)
+request_scope: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_scope", default=None)
+
+
+class Running:
+    """Scope of the task step currently holding the loop (read by the watchdog thread)"""
+    scope: Optional[dict] = None
+
+
+class TrackedCoroutine(collections.abc.Coroutine):
+    """
+    Coroutine wrapper that publishes the running task's request scope
+    for the duration of each step
+    """
+
+    __slots__ = ("_coro",)
+
+    def __init__(self, coro):
+        self._coro = coro
+
+    def send(self, value):
+        previous, Running.scope = Running.scope, request_scope.get()
+        try:
+            return self._coro.send(value)
+        finally:
+            Running.scope = previous
+
+    def throw(self, *args):
+        previous, Running.scope = Running.scope, request_scope.get()
+        try:
+            return self._coro.throw(*args)
+        finally:
+            Running.scope = previous
+
+    def close(self):
+        return self._coro.close()
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+    def __getattr__(self, name):
+        return getattr(self._coro, name)
+
+
+def _task_factory(loop, coro, **kwargs):
+    return asyncio.Task(TrackedCoroutine(coro), loop=loop, **kwargs)
+
+
+class LoopMonitorMiddleware:
+    """
+    ASGI middleware tagging each request's tasks with its scope
+    so stalls can be attributed to a route
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        token = request_scope.set(scope)
+        try:
+            await TrackedCoroutine(self.app(scope, receive, send))
+        finally:
+            request_scope.reset(token)
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag and captures the stack of long blocking stretches
+
+    A heartbeat coroutine sleeps for a fixed interval and records how late
+    it wakes up (the loop lag). A watchdog thread notices when the heartbeat
+    has been silent for longer than the threshold and, while the loop is
+    still blocked, snapshots the loop thread's stack and the route of the
+    task step holding it.
+    """
+
+    def __init__(self, interval_ms: int, threshold_ms: int, history: int):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.lags: Deque[float] = deque(maxlen=1200)
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.routes: Dict[str, Dict[str, float]] = {}
+        self.running = False
+        self._app = None
+        self._route_names: Optional[Dict[Any, str]] = None
+        self._heartbeat = time.monotonic()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, app) -> None:
+        """Install the task factory and start the heartbeat and watchdog"""
+        loop = asyncio.get_running_loop()
+        loop.set_task_factory(_task_factory)
+        self._app = app
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self.running = True
+        self._task = loop.create_task(self._heartbeat_loop())
+        self._thread = threading.Thread(target=self._watchdog, name="loop-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"✅ Event loop monitor running (threshold {self.threshold * 1000:.0f}ms)")
+
+    def stop(self) -> None:
+        """Stop the heartbeat and watchdog"""
+        self.running = False
+        if self._task:
+            self._task.cancel()
+        asyncio.get_running_loop().set_task_factory(None)
+
+    async def _heartbeat_loop(self) -> None:
+        while self.running:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - started - self.interval, 0.0)
+            self._heartbeat = now
+            self.lags.append(lag)
+
+            # Close out a stall the watchdog captured while the loop was blocked
+            stall, self._pending = self._pending, None
+            if stall is not None:
+                stall["duration_ms"] = round(lag * 1000, 1)
+                route = self.routes.setdefault(stall["route"], {"stalls": 0, "total_ms": 0.0, "max_ms": 0.0})
+                route["stalls"] += 1
+                route["total_ms"] = round(route["total_ms"] + stall["duration_ms"], 1)
+                route["max_ms"] = max(route["max_ms"], stall["duration_ms"])
+                logger.warning(f"⚠️  Event loop blocked {stall['duration_ms']}ms in {stall['route']}")
+
+    def _watchdog(self) -> None:
+        while self.running:
+            time.sleep(self.interval / 2)
+            heartbeat = self._heartbeat
+            if self._pending is not None or time.monotonic() - heartbeat < self.interval + self.threshold:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stall = {
+                "route": self._route_name(Running.scope),
+                "at": time.time(),
+                "duration_ms": None,
+                "stack": traceback.format_stack(frame) if frame is not None else [],
+            }
+            self.stalls.append(stall)
+            self._pending = stall
+
+    def _route_name(self, scope: Optional[dict]) -> str:
+        """Route template for a request scope (e.g. GET /api/properties/{property_id})"""
+        if scope is None:
+            return "(no request)"
+        if self._route_names is None and self._app is not None:
+            self._route_names = {
+                route.endpoint: route.path
+                for route in self._app.routes
+                if hasattr(route, "endpoint")
+            }
+        path = (self._route_names or {}).get(scope.get("endpoint"), scope.get("path", "?"))
+        return f"{scope.get('method', '')} {path}".strip()
+
+    def summary(self, include_stacks: bool = False) -> Dict[str, Any]:
+        """
+        Loop-lag statistics and stalls per route
+
+        Args:
+            include_stacks: Include recent stalls with their captured stacks
+        """
+        lags = sorted(self.lags)
+
+        def percentile(fraction: float) -> float:
+            if not lags:
+                return 0.0
+            return round(lags[min(int(len(lags) * fraction), len(lags) - 1)] * 1000, 2)
+
+        summary = {
+            "enabled": self.running,
+            "threshold_ms": self.threshold * 1000,
+            "lag_ms": {
+                "p50": percentile(0.5),
+                "p99": percentile(0.99),
+                "max": round(lags[-1] * 1000, 2) if lags else 0.0,
+            },
+            "stalls": len(self.stalls),
+            "routes": dict(sorted(self.routes.items(), key=lambda item: -item[1]["total_ms"])),
+        }
+        if include_stacks:
+            summary["recent_stalls"] = list(self.stalls)
+        return summary
+
+
+# Global loop monitor instance
+loop_monitor = LoopMonitor(
+    interval_ms=settings.LOOP_MONITOR_INTERVAL_MS,
+    threshold_ms=settings.LOOP_MONITOR_THRESHOLD_MS,
+    history=settings.LOOP_MONITOR_HISTORY
+)
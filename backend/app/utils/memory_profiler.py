@@ -0,0 +1,248 @@
+"""
+Memory Profiling Utilities
+Admin-triggered tracemalloc snapshots, diffs by route and source line, and sampled per-request peaks
+"""
+
+import bisect
+import inspect
+import itertools
+import random
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.metrics import known_routes, route_template
+
+UNATTRIBUTED = "(no route)"
+
+# Traces of the tracer itself and of imports are noise in every diff
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _kb(size: int) -> float:
+    return round(size / 1024, 1)
+
+
+class _RouteLocator:
+    """
+    Maps (filename, line) to the route whose endpoint source contains it
+
+    Closures defined inside a handler (e.g. the `build` functions run on
+    the async session) fall inside its line range, so their allocations are
+    attributed to the route too.
+    """
+
+    def __init__(self, app):
+        labels = dict(known_routes())
+        for route in getattr(app, "routes", ()):
+            if hasattr(route, "endpoint"):
+                labels[route.endpoint] = f"{','.join(sorted(route.methods or ()))} {route.path}".strip()
+
+        self._ranges: Dict[str, List[Tuple[int, int, str]]] = {}
+        for endpoint, label in labels.items():
+            try:
+                function = inspect.unwrap(endpoint)
+                lines, start = inspect.getsourcelines(function)
+                filename = function.__code__.co_filename
+            except (TypeError, OSError, AttributeError):
+                continue
+            self._ranges.setdefault(filename, []).append((start, start + len(lines) - 1, label))
+        for ranges in self._ranges.values():
+            ranges.sort()
+
+    def locate(self, traceback: tracemalloc.Traceback) -> str:
+        """Route of the innermost frame inside an endpoint, or UNATTRIBUTED"""
+        for frame in reversed(traceback):
+            ranges = self._ranges.get(frame.filename)
+            if not ranges:
+                continue
+            index = bisect.bisect_right(ranges, (frame.lineno, float("inf"), "")) - 1
+            if index >= 0 and ranges[index][0] <= frame.lineno <= ranges[index][1]:
+                return ranges[index][2]
+        return UNATTRIBUTED
+
+
+class MemoryProfiler:
+    """
+    tracemalloc control for one worker: snapshots, diffs and request peaks
+
+    Tracing is off until an admin starts it (it slows allocation-heavy
+    code noticeably). While tracing, a sampled fraction of requests has
+    its peak and retained allocation recorded per route; only one sampled
+    request runs at a time because tracemalloc's peak is process-wide.
+    """
+
+    def __init__(self, max_snapshots: int):
+        self.max_snapshots = max_snapshots
+        self.snapshots: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self.sample_rate = 0.0
+        self.requests: Dict[str, Dict[str, float]] = {}
+        self._ids = itertools.count(1)
+        self._sampling = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int, sample_rate: float) -> None:
+        """Start tracing with `frames` frames per traceback"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.sample_rate = sample_rate
+
+    def stop(self) -> None:
+        """Stop tracing and drop snapshots and request statistics"""
+        tracemalloc.stop()
+        self.sample_rate = 0.0
+        self.snapshots.clear()
+        self.requests.clear()
+
+    def take_snapshot(self, label: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Capture the current traces
+
+        Raises:
+            RuntimeError: If tracing is not started
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("Memory tracing is not started")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        current, peak = tracemalloc.get_traced_memory()
+        entry = {
+            "id": next(self._ids),
+            "label": label,
+            "at": time.time(),
+            "traced_kb": _kb(current),
+            "peak_kb": _kb(peak),
+            "snapshot": snapshot,
+        }
+        self.snapshots[entry["id"]] = entry
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+        return entry
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        return [
+            {key: value for key, value in entry.items() if key != "snapshot"}
+            for entry in self.snapshots.values()
+        ]
+
+    def diff(self, app, base_id: int, current_id: int, group_by: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Allocation growth between two snapshots
+
+        Args:
+            app: Application (its routes attribute tracebacks in route mode)
+            base_id: Earlier snapshot
+            current_id: Later snapshot
+            group_by: "lineno", "filename" or "route"
+            limit: Entries returned, largest growth first
+
+        Raises:
+            KeyError: If a snapshot ID is unknown
+        """
+        base = self.snapshots[base_id]["snapshot"]
+        current = self.snapshots[current_id]["snapshot"]
+
+        if group_by != "route":
+            return [
+                {
+                    "location": str(stat.traceback[-1]) if group_by == "lineno" else stat.traceback[-1].filename,
+                    "size_diff_kb": _kb(stat.size_diff),
+                    "count_diff": stat.count_diff,
+                    "size_kb": _kb(stat.size),
+                }
+                for stat in current.compare_to(base, group_by)[:limit]
+            ]
+
+        locator = _RouteLocator(app)
+        routes: Dict[str, Dict[str, Any]] = {}
+        for stat in current.compare_to(base, "traceback"):
+            if not stat.size_diff:
+                continue
+            route = routes.setdefault(locator.locate(stat.traceback), {"size_diff": 0, "count_diff": 0, "lines": {}})
+            route["size_diff"] += stat.size_diff
+            route["count_diff"] += stat.count_diff
+            line = str(stat.traceback[-1])
+            route["lines"][line] = route["lines"].get(line, 0) + stat.size_diff
+
+        ranked = sorted(routes.items(), key=lambda item: -abs(item[1]["size_diff"]))[:limit]
+        return [
+            {
+                "route": name,
+                "size_diff_kb": _kb(route["size_diff"]),
+                "count_diff": route["count_diff"],
+                "top_lines": [
+                    {"location": line, "size_diff_kb": _kb(size)}
+                    for line, size in sorted(route["lines"].items(), key=lambda item: -abs(item[1]))[:5]
+                ],
+            }
+            for name, route in ranked
+        ]
+
+    def begin_request(self) -> Optional[int]:
+        """Start measuring a request if it is sampled; returns traced bytes at start"""
+        if not self.sample_rate or random.random() >= self.sample_rate or not tracemalloc.is_tracing():
+            return None
+        if not self._sampling.acquire(blocking=False):
+            return None
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    def end_request(self, scope: dict, started_bytes: int) -> None:
+        """Record a sampled request's peak and retained allocation"""
+        try:
+            if not tracemalloc.is_tracing():
+                return
+            current, peak = tracemalloc.get_traced_memory()
+            route = f"{scope.get('method', '')} {route_template(scope)}"
+            stats = self.requests.setdefault(route, {"requests": 0, "peak_total": 0, "peak_max": 0, "retained_total": 0})
+            stats["requests"] += 1
+            stats["peak_total"] += peak - started_bytes
+            stats["peak_max"] = max(stats["peak_max"], peak - started_bytes)
+            stats["retained_total"] += current - started_bytes
+        finally:
+            self._sampling.release()
+
+    def request_summary(self) -> List[Dict[str, Any]]:
+        """Sampled requests per route, largest average peak first"""
+        summary = [
+            {
+                "route": route,
+                "requests": stats["requests"],
+                "avg_peak_kb": _kb(stats["peak_total"] / stats["requests"]),
+                "max_peak_kb": _kb(stats["peak_max"]),
+                "avg_retained_kb": _kb(stats["retained_total"] / stats["requests"]),
+            }
+            for route, stats in self.requests.items()
+        ]
+        return sorted(summary, key=lambda item: -item["avg_peak_kb"])
+
+
+# Global memory profiler
+memory_profiler = MemoryProfiler(max_snapshots=settings.MEMORY_MAX_SNAPSHOTS)
+
+
+class MemorySamplingMiddleware:
+    """Pure ASGI middleware measuring sampled requests while tracing is on"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        started_bytes = memory_profiler.begin_request() if scope["type"] == "http" else None
+        if started_bytes is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            memory_profiler.end_request(scope, started_bytes)
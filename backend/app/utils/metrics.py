@@ -0,0 +1,199 @@
+"""
+Request Metrics
+Per-route latency histograms, byte and status counters in Prometheus text format
+"""
+
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Dict, List, Tuple
+
+# Latency histogram bucket upper bounds in seconds (+Inf is implicit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Label for requests no route matched (404s, CORS preflights), so raw paths never become labels
+UNMATCHED = "unmatched"
+
+
+class _RouteStats:
+    """Counters for one (method, route template) pair"""
+
+    __slots__ = ("buckets", "duration_sum", "count", "statuses", "request_bytes", "response_bytes")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.duration_sum = 0.0
+        self.count = 0
+        self.statuses: Dict[int, int] = {}
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics for one worker
+
+    Updated from the event loop thread only, so plain integer updates need
+    no locking. Each worker process keeps its own registry; Prometheus
+    scrapes every worker (or the app runs one worker per container).
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self.in_flight: Dict[str, int] = {}
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        duration: float,
+        request_bytes: int,
+        response_bytes: int
+    ) -> None:
+        """Record one finished request"""
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = _RouteStats()
+        stats.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        stats.duration_sum += duration
+        stats.count += 1
+        stats.statuses[status_code] = stats.statuses.get(status_code, 0) + 1
+        stats.request_bytes += request_bytes
+        stats.response_bytes += response_bytes
+
+    def reset(self) -> None:
+        """Drop all recorded metrics"""
+        self.routes.clear()
+        self.in_flight.clear()
+
+    def render(self) -> str:
+        """Metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        routes = sorted(self.routes.items())
+
+        lines.append("# HELP http_request_duration_seconds Request latency by route template")
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for (method, route), stats in routes:
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.duration_sum:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+
+        lines.append("# HELP http_requests_total Requests by route template and status code")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route), stats in routes:
+            for status_code, count in sorted(stats.statuses.items()):
+                lines.append(
+                    f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status_code}"}} {count}'
+                )
+
+        for name, attribute, description in (
+            ("http_request_size_bytes_total", "request_bytes", "Request body bytes received"),
+            ("http_response_size_bytes_total", "response_bytes", "Response body bytes sent"),
+        ):
+            lines.append(f"# HELP {name} {description} by route template")
+            lines.append(f"# TYPE {name} counter")
+            for (method, route), stats in routes:
+                lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {getattr(stats, attribute)}')
+
+        lines.append("# HELP http_requests_in_flight Requests currently being served")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        for method, count in sorted(self.in_flight.items()):
+            lines.append(f'http_requests_in_flight{{method="{method}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
+
+
+# Endpoint -> route template, filled on first use (endpoints are fixed at startup)
+_templates: Dict[Any, str] = {}
+
+
+def route_template(scope: dict) -> str:
+    """Route template the router matched for a request (e.g. /api/properties/{property_id})"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED
+    template = _templates.get(endpoint)
+    if template is None:
+        template = _templates[endpoint] = _find_template(scope, endpoint)
+    return template
+
+
+def known_routes() -> Dict[Any, str]:
+    """Endpoint -> route template for every endpoint served so far"""
+    return dict(_templates)
+
+
+def _find_template(scope: dict, endpoint: Any) -> str:
+    # The application's route list carries the full path (with router prefixes)
+    for route in getattr(scope.get("app"), "routes", ()):
+        if getattr(route, "endpoint", None) is endpoint or getattr(route, "app", None) is endpoint:
+            return route.path
+    # Routers nested without flattening (newer FastAPI) keep their prefix out
+    # of route.path; recover it from the leading segments of the request path
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        return UNMATCHED
+    extra = scope["path"].count("/") - path.count("/")
+    return "/".join(scope["path"].split("/")[:extra + 1]) + path if extra > 0 else path
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and body sizes per route
+
+    The router stores the matched endpoint in the (shared) scope, so the
+    template is looked up after the request finishes; no extra routing
+    work is done per request.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        in_flight = registry.in_flight
+        method = scope["method"]
+        in_flight[method] = in_flight.get(method, 0) + 1
+        status_code = 500
+        request_bytes = 0
+        response_bytes = 0
+
+        async def receive_counted():
+            nonlocal request_bytes
+            message = await receive()
+            request_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_counted(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            else:
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive_counted, send_counted)
+        finally:
+            duration = perf_counter() - started
+            in_flight[method] -= 1
+            registry.observe(method, route_template(scope), status_code, duration, request_bytes, response_bytes)
@@ -0,0 +1,289 @@
+"""
+Pagination Utilities
+Opaque keyset (cursor) tokens for property listings
+"""
+
+import base64
+import json
+import math
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query
+
+from app.models.property import Property
+from app.schemas.property import PropertySort
+from app.utils.count_cache import get_total
+
+# Sorts ranked by a per-request expression: offset pagination only
+RANKED_SORTS = (PropertySort.RELEVANCE, PropertySort.DISTANCE)
+
+
+def _sort_column(sort: PropertySort, dialect: Optional[str] = None):
+    """
+    Column that drives ordering for a sort key
+
+    SQLite keeps timestamps as text in whatever format inserted them
+    (CURRENT_TIMESTAMP has no fraction, SQLAlchemy writes microseconds),
+    so there created_at is compared as datetime(created_at): whole seconds,
+    the precision of the MySQL TIMESTAMP column.
+    """
+    if sort == PropertySort.NEWEST:
+        if dialect == "sqlite":
+            return func.datetime(Property.created_at)
+        return Property.created_at
+    return Property.price
+
+
+def get_order_by(
+    sort: PropertySort,
+    relevance: Any = None,
+    distance: Any = None,
+    dialect: Optional[str] = None
+) -> Tuple[Any, Any]:
+    """
+    Get ORDER BY clauses for a sort key
+    The primary key is always used as a tiebreak so ordering is deterministic
+
+    Args:
+        sort: Active sort key
+        relevance: Relevance expression for sort=relevance (newest is used without one)
+        distance: Distance expression for sort=distance (newest is used without one)
+        dialect: Database dialect name (see _sort_column)
+
+    Returns:
+        Tuple of (sort column clause, tiebreak clause)
+    """
+    if sort == PropertySort.RELEVANCE:
+        if relevance is not None:
+            return relevance.desc(), Property.id.desc()
+        sort = PropertySort.NEWEST
+
+    if sort == PropertySort.DISTANCE:
+        if distance is not None:
+            return distance.asc(), Property.id.asc()
+        sort = PropertySort.NEWEST
+
+    column = _sort_column(sort, dialect)
+    if sort == PropertySort.PRICE_ASC:
+        return column.asc(), Property.id.asc()
+    return column.desc(), Property.id.desc()
+
+
+def encode_cursor(sort: PropertySort, property_obj: Any) -> str:
+    """
+    Encode the position after a row into an opaque cursor token
+
+    Args:
+        sort: Active sort key
+        property_obj: Last row of the current page (needs created_at, price and id)
+
+    Returns:
+        URL-safe cursor string
+    """
+    if sort == PropertySort.NEWEST:
+        # Whole seconds, as stored; a finer value would never equal the column
+        value = property_obj.created_at.replace(microsecond=0).isoformat()
+    else:
+        value = str(property_obj.price)
+
+    payload = json.dumps({"s": sort.value, "v": value, "id": property_obj.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: PropertySort) -> Tuple[Any, int]:
+    """
+    Decode a cursor token
+
+    Args:
+        cursor: Token produced by encode_cursor
+        sort: Sort key of the current request
+
+    Returns:
+        Tuple of (last sort value, last id)
+
+    Raises:
+        HTTPException: If the cursor is malformed or was issued for another sort
+    """
+    if sort in RANKED_SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cursor pagination is not supported for {sort.value} sort"
+        )
+
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor_sort = payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise invalid_cursor
+
+    if cursor_sort != sort.value:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor was issued for a different sort order"
+        )
+
+    try:
+        last_id = int(payload["id"])
+        if sort == PropertySort.NEWEST:
+            value = datetime.fromisoformat(payload["v"])
+        else:
+            value = Decimal(payload["v"])
+    except (ValueError, KeyError, TypeError, InvalidOperation):
+        raise invalid_cursor
+
+    return value, last_id
+
+
+def keyset_filter(sort: PropertySort, value: Any, last_id: int, dialect: Optional[str] = None):
+    """
+    Build the WHERE clause that seeks past the cursor position
+
+    Args:
+        sort: Active sort key
+        value: Last sort value from the cursor
+        last_id: Last id from the cursor
+        dialect: Database dialect name (see _sort_column)
+
+    Returns:
+        SQLAlchemy boolean clause
+    """
+    column = _sort_column(sort, dialect)
+    if sort == PropertySort.NEWEST and dialect == "sqlite":
+        value = value.strftime("%Y-%m-%d %H:%M:%S")
+    if sort == PropertySort.PRICE_ASC:
+        return or_(column > value, and_(column == value, Property.id > last_id))
+    return or_(column < value, and_(column == value, Property.id < last_id))
+
+
+def _filtered_ids(query: Query, matches: Set[int]) -> Set[int]:
+    """Search matches that also pass the query's SQL filters"""
+    if query.whereclause is None:
+        return set(matches)
+    ids = query.with_entities(Property.id).order_by(None)
+    return {row.id for row in ids.yield_per(1000) if row.id in matches}
+
+
+def _ordered_ids(query: Query, wanted: Set[int], limit: Optional[int] = None) -> List[int]:
+    """Walk the ordered query's IDs, keeping the wanted ones (the first `limit` of them)"""
+    ordered: List[int] = []
+    for row in query.with_entities(Property.id).yield_per(1000):
+        if row.id in wanted:
+            ordered.append(row.id)
+            if len(ordered) == limit:
+                break
+    return ordered
+
+
+def _load_ids(query: Query, ids: List[int]) -> List[Any]:
+    """Load a page of properties by ID, in the order given"""
+    if not ids:
+        return []
+    position = {property_id: index for index, property_id in enumerate(ids)}
+    rows = query.filter(Property.id.in_(ids)).all()
+    return sorted(rows, key=lambda row: position[row.id])
+
+
+def paginate(
+    query: Query,
+    page: int,
+    page_size: int,
+    sort: PropertySort,
+    cursor: Optional[str] = None,
+    relevance: Any = None,
+    count_key: Optional[Hashable] = None,
+    estimate_total: bool = False,
+    distance: Any = None,
+    matches: Optional[Set[int]] = None,
+    scores: Optional[Callable[[Set[int]], Dict[int, float]]] = None
+) -> Dict[str, Any]:
+    """
+    Apply ordering and pagination to a filtered property query
+
+    With a cursor the query seeks past the cursor position and the total
+    count is skipped; otherwise classic offset pagination is used.
+    Relevance- and distance-sorted results are offset-paginated only and
+    never carry a cursor.
+
+    With `matches` (a BM25 search answered by the in-process index) the
+    SQL filters run first and only the matching IDs are kept, ranked and
+    paged in-process; the database then loads just the page by ID.
+
+    Args:
+        query: Filtered property query
+        page: Page number (offset mode)
+        page_size: Items per page
+        sort: Active sort key
+        cursor: Cursor from a previous response
+        relevance: Relevance expression for sort=relevance
+        count_key: Normalized filter key for the count cache
+        estimate_total: Allow a statistics-based total for large result sets
+        distance: Distance expression for sort=distance
+        matches: IDs the search term matches (see PropertyFilters.search_matches)
+        scores: Scores candidate IDs for sort=relevance with `matches`
+
+    Returns:
+        Dictionary of list response fields
+    """
+    dialect = query.session.get_bind().dialect.name
+    query = query.order_by(*get_order_by(sort, relevance, distance, dialect))
+
+    # Keyset pagination: seek past the cursor, no count and no offset
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, sort)
+        query = query.filter(keyset_filter(sort, last_value, last_id, dialect))
+        if matches is None:
+            rows = query.limit(page_size + 1).all()
+        else:
+            rows = _load_ids(query, _ordered_ids(query, matches, page_size + 1))
+        properties = rows[:page_size]
+
+        return {
+            "page_size": page_size,
+            "next_cursor": encode_cursor(sort, properties[-1]) if len(rows) > page_size else None,
+            "properties": properties
+        }
+
+    offset = (page - 1) * page_size
+    if matches is None:
+        # Get total count (cached, or estimated for large sets when allowed)
+        total, total_is_estimate = get_total(query.session, query, count_key, estimate_total)
+
+        # Get paginated results
+        properties = query.offset(offset).limit(page_size).all()
+    else:
+        if sort == PropertySort.RELEVANCE and scores is not None:
+            candidates = _filtered_ids(query, matches)
+            ranking = scores(candidates)
+            ordered = sorted(candidates, key=lambda property_id: (ranking.get(property_id, 0.0), property_id), reverse=True)
+        else:
+            ordered = _ordered_ids(query, matches)
+        total, total_is_estimate = len(ordered), False
+        properties = _load_ids(query, ordered[offset:offset + page_size])
+
+    # Calculate pagination
+    total_pages = math.ceil(total / page_size)
+
+    # Hand out a cursor so clients can switch to keyset pagination
+    next_cursor = None
+    if properties and page < total_pages and sort not in RANKED_SORTS:
+        next_cursor = encode_cursor(sort, properties[-1])
+
+    return {
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor,
+        "properties": properties
+    }
@@ -0,0 +1,293 @@
+"""
+Profiling Utilities
+On-demand statistical sampling of live requests and per-request cProfile for admins
+"""
+
+import asyncio
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from app.config import settings
+from app.database import SessionLocal
+from app.utils.auth import get_active_admin
+from app.utils.db_routing import request_admin_id
+from app.utils.loop_monitor import Running, TrackedCoroutine, request_scope
+from app.utils.metrics import route_template
+
+# Request header enabling cProfile for one request (admin bearer token required)
+PROFILE_HEADER = b"x-profile"
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_APP_ROOT):
+        filename = os.path.relpath(filename, _APP_ROOT)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[-1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def fold_stack(frame, root: str) -> str:
+    """Collapsed-stack line for a frame: root;outermost;...;innermost"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(root.replace(";", ":"))
+    return ";".join(reversed(labels))
+
+
+class SamplingSession:
+    """
+    One sampling run: the next N requests of a route, or a time window
+
+    A background thread reads the event loop thread's stack every
+    interval. Samples are kept only while a task step of a matching
+    request holds the loop, so concurrent traffic does not pollute the
+    profile; each stack is rooted at its route for flamegraph tools.
+    """
+
+    def __init__(
+        self,
+        route: Optional[str],
+        method: Optional[str],
+        max_requests: Optional[int],
+        duration: float,
+        interval: float
+    ):
+        self.route = route
+        self.method = method.upper() if method else None
+        self.max_requests = max_requests
+        self.duration = duration
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.requests = 0
+        self.started = time.time()
+        self.done = asyncio.Event()
+        self._loop_thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._sample, name="request-sampler", daemon=True)
+
+    def matches(self, scope: dict) -> bool:
+        """Whether a request is profiled by this session"""
+        if self.method and scope.get("method") != self.method:
+            return False
+        return self.route is None or route_template(scope) == self.route
+
+    def request_finished(self, scope: dict) -> None:
+        """Count a finished request (called on the loop thread)"""
+        if self.max_requests is None or not self.matches(scope):
+            return
+        self.requests += 1
+        if self.requests >= self.max_requests:
+            self.done.set()
+
+    def _sample(self) -> None:
+        while not self.done.is_set():
+            time.sleep(self.interval)
+            scope = Running.scope
+            # The router sets "endpoint" before the handler runs; earlier steps are middleware
+            if scope is None or "endpoint" not in scope or not self.matches(scope):
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            route = f"{scope.get('method', '')} {route_template(scope)}"
+            self.stacks[fold_stack(frame, route)] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.done.set()
+        self._thread.join(timeout=1)
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format (flamegraph.pl, speedscope, inferno)"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """Admin profiling state: the active sampling session and recent cProfile results"""
+
+    def __init__(self, history: int):
+        self.session: Optional[SamplingSession] = None
+        self.profiles: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._ids = itertools.count(1)
+        self._cprofile_lock = threading.Lock()
+
+    async def sample(
+        self,
+        route: Optional[str] = None,
+        method: Optional[str] = None,
+        max_requests: Optional[int] = None,
+        duration: float = 10.0,
+        interval_ms: int = 5
+    ) -> SamplingSession:
+        """
+        Sample matching requests until max_requests finish or duration elapses
+
+        Raises:
+            RuntimeError: If another sampling session is running
+        """
+        if self.session is not None:
+            raise RuntimeError("A sampling session is already running")
+
+        session = SamplingSession(route, method, max_requests, duration, interval_ms / 1000)
+        self.session = session
+        session.start()
+        try:
+            await asyncio.wait_for(session.done.wait(), timeout=duration)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            session.stop()
+            self.session = None
+        return session
+
+    def start_cprofile(self) -> Optional[Tuple[cProfile.Profile, int]]:
+        """A profiler and profile ID for one request, or None if another request holds it"""
+        if not self._cprofile_lock.acquire(blocking=False):
+            return None
+        return cProfile.Profile(), next(self._ids)
+
+    def finish_cprofile(self, profile: cProfile.Profile, profile_id: int, scope: dict, elapsed: float) -> None:
+        """Store a finished request profile and release the profiler"""
+        try:
+            output = io.StringIO()
+            stats = pstats.Stats(profile, stream=output)
+            stats.sort_stats("cumulative").print_stats(settings.PROFILER_CPROFILE_LINES)
+            self.profiles.append({
+                "id": profile_id,
+                "route": f"{scope.get('method', '')} {route_template(scope)}",
+                "path": scope.get("path"),
+                "at": time.time(),
+                "elapsed_ms": round(elapsed * 1000, 2),
+                "stats": output.getvalue(),
+            })
+        finally:
+            self._cprofile_lock.release()
+
+    def get_profile(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        return next((profile for profile in self.profiles if profile["id"] == profile_id), None)
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        return [
+            {key: value for key, value in profile.items() if key != "stats"}
+            for profile in reversed(self.profiles)
+        ]
+
+
+# Global profiler
+profiler = Profiler(history=settings.PROFILER_HISTORY)
+
+
+class _ProfiledCoroutine(TrackedCoroutine):
+    """Coroutine wrapper that runs cProfile only during its own task steps"""
+
+    __slots__ = ("_profile",)
+
+    def __init__(self, coro, profile: cProfile.Profile):
+        super().__init__(coro)
+        self._profile = profile
+
+    def send(self, value):
+        self._profile.enable()
+        try:
+            return super().send(value)
+        finally:
+            self._profile.disable()
+
+    def throw(self, *args):
+        self._profile.enable()
+        try:
+            return super().throw(*args)
+        finally:
+            self._profile.disable()
+
+
+def _admin_active(admin_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        return get_active_admin(db, admin_id) is not None
+    finally:
+        db.close()
+
+
+async def _is_active_admin(scope) -> bool:
+    """Whether the request carries the bearer token of an existing, active admin (as get_current_admin checks)"""
+    admin_id = request_admin_id(Request(scope))
+    if admin_id is None:
+        return False
+    return await run_in_threadpool(_admin_active, admin_id)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware behind the admin profiling surface
+
+    While a sampling session runs, requests are tagged with their scope so
+    samples can be attributed. An `X-Profile: cprofile` header with an admin
+    bearer token profiles that request (only its own task steps on the
+    event loop); the response carries `X-Profile-Id` for
+    GET /api/admin/profiling/requests/{id}, or `X-Profile: busy` while
+    another request is being profiled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = None
+        extra_headers = []
+        if any(name == PROFILE_HEADER and value == b"cprofile" for name, value in scope["headers"]) \
+                and await _is_active_admin(scope):
+            started_profile = profiler.start_cprofile()
+            if started_profile is None:
+                extra_headers.append((b"x-profile", b"busy"))
+            else:
+                profile, profile_id = started_profile
+                extra_headers.append((b"x-profile-id", str(profile_id).encode()))
+
+        session = profiler.session
+        if not extra_headers and session is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and extra_headers:
+                message = {**message, "headers": [*message.get("headers", []), *extra_headers]}
+            await send(message)
+
+        started = time.perf_counter()
+        token = request_scope.set(scope)
+        try:
+            coro = self.app(scope, receive, send_with_headers)
+            await (_ProfiledCoroutine(coro, profile) if profile is not None else TrackedCoroutine(coro))
+        finally:
+            request_scope.reset(token)
+            if profile is not None:
+                profiler.finish_cprofile(profile, profile_id, scope, time.perf_counter() - started)
+            if session is not None:
+                session.request_finished(scope)
@@ -0,0 +1,69 @@
+"""
+Query Shape Utilities
+Named relationship-loading strategies for property queries
+"""
+
+import enum
+from typing import Dict, List
+
+from sqlalchemy.orm import Session, Query, selectinload, joinedload, load_only, undefer, raiseload
+
+from app.models.property import Property, PropertyAmenity
+
+
+class PropertyShape(str, enum.Enum):
+    """Named query shapes for property reads"""
+    LIST = "list"        # Listing grids: images + amenities for every row
+    DETAIL = "detail"    # Single property page: images + amenities
+    CARD = "card"        # Listing cards: summary columns + primary image URL only
+    BARE = "bare"        # Columns only, relationships stay lazy
+
+
+# Each shape batch-loads its relationships so a page costs a fixed number of
+# round trips: one for the properties, one SELECT ... WHERE property_id IN (...)
+# for images and one for amenities joined through to the amenity row.
+# The card shape is a single query: description is never read and the
+# primary image URL and variants come from correlated subqueries.
+_SHAPE_OPTIONS: Dict[PropertyShape, List] = {
+    PropertyShape.LIST: [
+        selectinload(Property.images),
+        selectinload(Property.amenities).joinedload(PropertyAmenity.amenity),
+    ],
+    PropertyShape.DETAIL: [
+        selectinload(Property.images),
+        selectinload(Property.amenities).joinedload(PropertyAmenity.amenity),
+    ],
+    PropertyShape.CARD: [
+        load_only(
+            Property.id,
+            Property.title,
+            Property.property_type,
+            Property.listing_type,
+            Property.price,
+            Property.location,
+            Property.bedrooms,
+            Property.bathrooms,
+            Property.availability,
+            Property.featured,
+            Property.created_at,
+        ),
+        undefer(Property.primary_image_url),
+        undefer(Property.primary_image_variants),
+        raiseload("*"),
+    ],
+    PropertyShape.BARE: [],
+}
+
+
+def property_query(db: Session, shape: PropertyShape = PropertyShape.LIST) -> Query:
+    """
+    Start a Property query with the loader options for a shape
+
+    Args:
+        db: Database session
+        shape: Named query shape
+
+    Returns:
+        SQLAlchemy query over Property
+    """
+    return db.query(Property).options(*_SHAPE_OPTIONS[shape])
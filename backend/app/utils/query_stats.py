@@ -0,0 +1,203 @@
+"""
+Query Accounting Utilities
+Per-request SQL query counts and DB time, slow-query logging and N+1 detection
+"""
+
+import contextvars
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.utils.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+# Query budgets per route, asserted by assert_query_budget() in tests.
+# Counts include authentication (admin lookup, last_login update and reload).
+QUERY_BUDGETS: Dict[str, int] = {
+    "GET /api/properties": 4,
+    "GET /api/properties/{property_id}": 3,
+    "GET /api/admin/dashboard/stats": 10,
+}
+
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+|%\(\w+\)s)(?:\s*,\s*(?:\?|%s|:\w+|%\(\w+\)s))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a statement so repeats of one query compare equal
+
+    Bound parameters are already placeholders; expanded IN lists are
+    collapsed so `IN (?, ?)` and `IN (?, ?, ?)` share a shape.
+    """
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestQueryStats:
+    """Queries executed while serving one request"""
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Dict[str, List[float]] = {}  # shape -> [executions, seconds]
+
+    @property
+    def route(self) -> str:
+        """METHOD /route/template of the request"""
+        return f"{self.scope.get('method', '')} {route_template(self.scope)}"
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        shape = self.shapes.setdefault(statement_shape(statement), [0, 0.0])
+        shape[0] += 1
+        shape[1] += duration
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        """Statement shapes executed at least `threshold` times (likely N+1)"""
+        return [
+            {"statement": shape, "executions": int(executions), "ms": round(seconds * 1000, 2)}
+            for shape, (executions, seconds) in sorted(self.shapes.items(), key=lambda item: -item[1][0])
+            if executions >= threshold
+        ]
+
+    def summary(self) -> str:
+        """Statements by execution count, for assertion messages"""
+        return "\n".join(
+            f"  {int(executions):>4}x {seconds * 1000:8.2f}ms  {shape[:200]}"
+            for shape, (executions, seconds) in sorted(self.shapes.items(), key=lambda item: -item[1][0])
+        )
+
+
+# Stats of the request being served (set by begin(); the object is shared
+# with the threadpool and greenlet contexts the request's queries run in)
+_current: contextvars.ContextVar[Optional[RequestQueryStats]] = contextvars.ContextVar("query_stats", default=None)
+
+# Collectors opened by record_requests() (tests)
+_recorders: List[List[RequestQueryStats]] = []
+_recorders_lock = threading.Lock()
+
+
+def begin(scope: dict) -> contextvars.Token:
+    """Start counting queries for a request"""
+    return _current.set(RequestQueryStats(scope))
+
+
+def current() -> Optional[RequestQueryStats]:
+    """Query stats of the request being served, if any"""
+    return _current.get()
+
+
+def finish(token: contextvars.Token) -> RequestQueryStats:
+    """
+    Stop counting for a request and report likely N+1 patterns
+
+    Returns:
+        The request's query stats
+    """
+    stats = _current.get()
+    _current.reset(token)
+
+    for repeat in stats.repeated(settings.QUERY_N_PLUS_ONE_THRESHOLD):
+        logger.warning(
+            f"⚠️  Possible N+1 in {stats.route}: {repeat['executions']}x "
+            f"({repeat['ms']}ms) {repeat['statement'][:300]}"
+        )
+
+    with _recorders_lock:
+        for recorded in _recorders:
+            recorded.append(stats)
+    return stats
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration * 1000 >= settings.SLOW_QUERY_MS:
+        route = stats.route if stats is not None else "(no request)"
+        logger.warning(f"🐢 Slow query ({duration * 1000:.0f}ms) in {route}: {_WHITESPACE.sub(' ', statement)[:500]}")
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # Failed statements never reach after_cursor_execute
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+# ============================================
+# TEST HELPERS
+# ============================================
+
+@contextmanager
+def record_requests() -> Iterator[List[RequestQueryStats]]:
+    """
+    Collect the query stats of every request finished inside the block
+
+    Works with TestClient and httpx clients alike (the app may serve the
+    request on another thread).
+    """
+    recorded: List[RequestQueryStats] = []
+    with _recorders_lock:
+        _recorders.append(recorded)
+    try:
+        yield recorded
+    finally:
+        with _recorders_lock:
+            _recorders.remove(recorded)
+
+
+def assert_query_budget(client: Any, method: str, url: str, max_queries: Optional[int] = None, **kwargs: Any):
+    """
+    Make a request and fail if it ran more queries than its budget
+
+    Usage in tests:
+        response = assert_query_budget(client, "GET", "/api/properties?page_size=50")
+
+    Args:
+        client: fastapi.testclient.TestClient (or any client with .request)
+        method: HTTP method
+        url: Request URL
+        max_queries: Budget; defaults to QUERY_BUDGETS for the matched route
+        **kwargs: Passed to client.request (headers, json, ...)
+
+    Returns:
+        The response
+
+    Raises:
+        AssertionError: If the budget is exceeded, a repeated statement
+            reaches QUERY_N_PLUS_ONE_THRESHOLD, or no budget is known
+    """
+    with record_requests() as recorded:
+        response = client.request(method, url, **kwargs)
+    assert recorded, f"{method} {url} was not served by the app (QUERY_STATS_ENABLED?)"
+
+    stats = recorded[-1]
+    budget = max_queries if max_queries is not None else QUERY_BUDGETS.get(stats.route)
+    assert budget is not None, f"No query budget for {stats.route}; add it to QUERY_BUDGETS"
+    assert stats.count <= budget, (
+        f"{stats.route} ran {stats.count} queries (budget {budget}):\n{stats.summary()}"
+    )
+
+    repeated = stats.repeated(settings.QUERY_N_PLUS_ONE_THRESHOLD)
+    assert not repeated, f"{stats.route} repeats a statement (likely N+1):\n{stats.summary()}"
+    return response
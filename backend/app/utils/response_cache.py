@@ -0,0 +1,226 @@
+"""
+Response Cache Utilities
+Bounded LRU + TTL cache of serialized public responses with tag-based invalidation
+"""
+
+import enum
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.single_flight import reads_own_writes, single_flight, to_json
+
+# Tag families used by the public routes and the admin writes that affect them:
+#   property:<id>   a response contains this property
+#   location:<name> a response counts properties in this location
+#   amenity:<id>    a response contains this amenity
+#   featured / trending   membership of the featured / trending lists
+# An entry tagged "<family>:*" is dropped by any tag of that family.
+WILDCARD = "*"
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache with per-entry TTL and invalidation tags
+
+    Admin writes call invalidate() with the tags they affect; the TTL
+    bounds staleness for writes handled by other worker processes.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, bytes, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0  # Bumped by invalidate() so in-flight builds are not stored stale
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable):
+        """Get a cached body, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, body: bytes, tags: Iterable[str] = (), generation: int = None) -> None:
+        """
+        Store a body under its invalidation tags
+
+        Args:
+            key: Cache key
+            body: Serialized response
+            tags: Invalidation tags
+            generation: Value of `generation` when the body was built; the
+                body is discarded if an invalidation happened since
+        """
+        tags = tuple(set(tags))
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, body, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+    def invalidate(self, *tags: str) -> int:
+        """
+        Drop every entry carrying one of the tags (or its family wildcard)
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            self.generation += 1
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+                family = tag.split(":", 1)[0]
+                keys |= self._tags.get(f"{family}:{WILDCARD}", set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count and hit/miss counters"""
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES
+)
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    return value
+
+
+def make_key(route: str, **params: Any) -> Tuple:
+    """Cache key from a route name and its normalized query parameters"""
+    return (route,) + tuple(sorted(
+        (name, _normalize(value)) for name, value in params.items() if value is not None
+    ))
+
+
+async def cached_json(
+    key: Hashable,
+    db: AsyncSession,
+    build: Callable[[Session], Any],
+    response_type: Any,
+    tags: Callable[[Any], Iterable[str]]
+) -> Response:
+    """
+    Serve a public response from the cache, building and storing it on a miss
+
+    Concurrent misses for a key (e.g. right after the entry expires) share
+    one build through the single-flight group. An admin reading their own
+    write (valid X-Read-Your-Writes token) bypasses both and is not cached.
+
+    Admin writes invalidate only this worker's cache: other workers keep
+    serving their copy for up to RESPONSE_CACHE_TTL_SECONDS.
+
+    Args:
+        key: Key from make_key()
+        db: Async database session
+        build: Runs the query on a (sync-facade) session and returns the route's result
+        response_type: Type the result is serialized as (the route's response model)
+        tags: Invalidation tags for a built result
+
+    Returns:
+        JSON response (X-Cache: HIT, MISS or BYPASS)
+    """
+    def render(session: Session):
+        result = build(session)
+        return to_json(response_type, result), list(tags(result))
+
+    if reads_own_writes(db):
+        body, _ = await db.run_sync(render)
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "BYPASS"})
+
+    if settings.RESPONSE_CACHE_ENABLED:
+        body = response_cache.get(key)
+        if body is not None:
+            return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    async def fill() -> bytes:
+        generation = response_cache.generation
+        body, result_tags = await db.run_sync(render)
+        if settings.RESPONSE_CACHE_ENABLED:
+            response_cache.set(key, body, result_tags, generation)
+        return body
+
+    body = await single_flight.do(key, fill)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+
+def property_list_tags(collection: str) -> Callable[[List[Any]], List[str]]:
+    """Tags for a property list: its membership tag plus each property and amenity shown"""
+    def tags(properties: List[Any]) -> List[str]:
+        result = [collection]
+        for property_obj in properties:
+            result.append(f"property:{property_obj.id}")
+            if "amenities" in property_obj.__dict__:
+                result.extend(f"amenity:{link.amenity_id}" for link in property_obj.amenities)
+        return result
+    return tags
+
+
+def property_write_tags(
+    property_obj: Any,
+    changed: Iterable[str] = (),
+    created: bool = False,
+    deleted: bool = False
+) -> List[str]:
+    """
+    Tags an admin write to a property invalidates
+
+    Args:
+        property_obj: Property after the write (or before a delete)
+        changed: Names of the updated fields (update only)
+        created: The property was just created
+        deleted: The property was just deleted
+    """
+    changed = set(changed)
+    tags = [f"property:{property_obj.id}"]
+    if created or deleted or "location" in changed:
+        tags.append(f"location:{property_obj.location}")
+    if created or changed & {"featured", "availability"}:
+        tags.extend(["featured", "trending"])
+    return tags
@@ -0,0 +1,125 @@
+"""
+Search Utilities
+Full-text property search backed by the MySQL FULLTEXT index
+"""
+
+import re
+from typing import Dict, Optional, Set
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.mysql import match
+
+from app.database import engine
+from app.models.property import Property
+from app.schemas.property import SearchMode
+from app.utils.search_index import property_index
+
+# Characters with special meaning in MySQL boolean-mode queries
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+
+def fulltext_supported() -> bool:
+    """
+    Check whether the database supports MATCH ... AGAINST
+    The FULLTEXT index `idx_search (title, description)` is defined in schema.sql
+    """
+    return engine.dialect.name in ("mysql", "mariadb")
+
+
+def _has_words(term: str) -> bool:
+    """Check that a term still has words once operator characters are stripped"""
+    return bool(_BOOLEAN_OPERATORS.sub(" ", term).strip())
+
+
+def to_boolean_query(term: str) -> str:
+    """
+    Turn free text into a safe boolean-mode query
+    Every word is required and matched as a prefix: "pioneer apart" -> "+pioneer* +apart*"
+
+    Args:
+        term: Raw search text
+
+    Returns:
+        Boolean-mode query string
+    """
+    words = _BOOLEAN_OPERATORS.sub(" ", term).split()
+    return " ".join(f"+{word}*" for word in words)
+
+
+def index_matches(term: Optional[str], mode: SearchMode) -> Optional[Set[int]]:
+    """
+    Every property the in-process BM25 index matches for a term
+
+    Args:
+        term: Raw search text
+        mode: Requested search mode
+
+    Returns:
+        IDs matching every word of the term, or None when the index is not used
+    """
+    if not term or mode != SearchMode.BM25 or not property_index.ready:
+        return None
+    return property_index.matches(term)
+
+
+def index_scores(term: str, candidates: Set[int]) -> Dict[int, float]:
+    """
+    BM25 scores for the candidate properties of a search
+
+    Args:
+        term: Raw search text
+        candidates: IDs to rank (matches that passed the SQL filters)
+
+    Returns:
+        Mapping of property ID to score
+    """
+    return property_index.search(term, within=candidates)
+
+
+def _match(term: str, mode: SearchMode):
+    """Build the MATCH ... AGAINST expression for a mode"""
+    if mode == SearchMode.BOOLEAN:
+        return match(Property.title, Property.description, against=to_boolean_query(term)).in_boolean_mode()
+    return match(Property.title, Property.description, against=term).in_natural_language_mode()
+
+
+def search_clause(term: str, mode: SearchMode):
+    """
+    Build the WHERE clause for a search term
+
+    Falls back to the LIKE scan when the mode is `like`, the database has
+    no FULLTEXT support, or the term has no searchable words. BM25
+    searches served by the in-process index add no clause: their matches
+    are applied after the SQL filters (see PropertyFilters.search_matches).
+
+    Args:
+        term: Raw search text
+        mode: Requested search mode
+
+    Returns:
+        SQLAlchemy boolean clause
+    """
+    if mode not in (SearchMode.LIKE, SearchMode.BM25) and fulltext_supported() and _has_words(term):
+        return _match(term, mode)
+
+    return or_(
+        Property.title.ilike(f"%{term}%"),
+        Property.description.ilike(f"%{term}%")
+    )
+
+
+def relevance_score(term: Optional[str], mode: SearchMode):
+    """
+    Build the relevance expression used for sort=relevance
+
+    Args:
+        term: Raw search text
+        mode: Requested search mode
+
+    Returns:
+        MATCH score expression, or None when the database cannot rank
+        (BM25 results are ranked in-process by index_scores)
+    """
+    if not term or mode in (SearchMode.LIKE, SearchMode.BM25) or not fulltext_supported() or not _has_words(term):
+        return None
+    return _match(term, mode)
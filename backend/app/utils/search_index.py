@@ -0,0 +1,499 @@
+"""
+In-Process Search Index
+BM25 inverted index over property title, description and location
+"""
+
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import re
+import sys
+import threading
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.property import Property
+
+logger = logging.getLogger(__name__)
+
+# Indexed fields and their term-frequency weights (a title hit counts 3x)
+FIELD_WEIGHTS: Dict[str, float] = {
+    "title": 3.0,
+    "location": 2.0,
+    "description": 1.0,
+}
+
+# Common English and Swahili words that carry no ranking signal
+STOPWORDS: Set[str] = {
+    "a", "an", "and", "are", "at", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "the", "to", "with",
+    "na", "ya", "wa", "za", "la", "kwa", "katika", "ni", "cha", "vya",
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Maximum number of vocabulary terms a prefix may expand to
+MAX_PREFIX_EXPANSION = 50
+
+# Score multiplier for terms matched only through prefix expansion
+PREFIX_WEIGHT = 0.5
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Session.info key for changes waiting on commit
+_PENDING_KEY = "search_index_pending"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lowercase index terms
+
+    Args:
+        text: Raw field text
+
+    Returns:
+        List of terms with stopwords removed
+    """
+    if not text:
+        return []
+    return [
+        token for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+class _Postings:
+    """
+    Posting list for one term, ordered by BM25 impact (highest first)
+
+    Impacts and IDs are kept in parallel compact arrays; `keys` holds the
+    negated impact so the arrays stay ascending for bisect.
+    """
+
+    __slots__ = ("keys", "ids")
+
+    def __init__(self):
+        self.keys = array("d")
+        self.ids = array("q")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, property_id: int, impact: float) -> None:
+        position = bisect.bisect_right(self.keys, -impact)
+        self.keys.insert(position, -impact)
+        self.ids.insert(position, property_id)
+
+    def discard(self, property_id: int, impact: float) -> None:
+        position = bisect.bisect_left(self.keys, -impact)
+        while position < len(self.keys) and self.keys[position] == -impact:
+            if self.ids[position] == property_id:
+                del self.keys[position]
+                del self.ids[position]
+                return
+            position += 1
+
+
+class PropertySearchIndex:
+    """
+    Inverted index with BM25 scoring and prefix matching
+
+    Each posting stores the document's precomputed BM25 term impact
+    (tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))), so a query only
+    multiplies by idf and sums. Postings are impact-ordered, which lets a
+    top-k query stop after the best `limit` postings of each term.
+
+    Impacts use a snapshot of the average document length; sync() refreshes
+    the snapshot in memory if the corpus drifts. Documents are stored per
+    field so an update only re-tokenizes the fields that changed.
+    All public methods are thread-safe.
+    """
+
+    # Re-snapshot avgdl when the live average drifts this far from it
+    AVG_LEN_DRIFT = 0.25
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, _Postings] = {}
+        self._doc_fields: Dict[int, Dict[str, Tuple[str, ...]]] = {}
+        self._doc_len: Dict[int, float] = {}
+        self._total_len = 0.0
+        self._avg_len = 1.0
+        self._vocabulary: List[str] = []
+        self.ready = False
+        self.synced_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    # ---------- updates ----------
+
+    def upsert(self, property_id: int, fields: Dict[str, Optional[str]]) -> None:
+        """
+        Add or update a document
+
+        Args:
+            property_id: Property ID
+            fields: Indexed field values; fields left out keep their current terms
+        """
+        with self._lock:
+            doc = dict(self._doc_fields.get(property_id, {}))
+            self._remove_postings(property_id)
+            doc.update(self._tokenize_fields(fields))
+            self._doc_fields[property_id] = doc
+            self._add_postings(property_id)
+
+    @staticmethod
+    def _tokenize_fields(fields: Dict[str, Optional[str]]) -> Dict[str, Tuple[str, ...]]:
+        return {
+            field: tuple(sys.intern(token) for token in tokenize(fields[field]))
+            for field in FIELD_WEIGHTS if field in fields
+        }
+
+    def remove(self, property_id: int) -> None:
+        """Remove a document from the index"""
+        with self._lock:
+            self._remove_postings(property_id)
+            self._doc_fields.pop(property_id, None)
+
+    def _weighted_terms(self, property_id: int) -> Dict[str, float]:
+        """Weighted term frequencies for a stored document"""
+        terms: Dict[str, float] = {}
+        for field, tokens in self._doc_fields.get(property_id, {}).items():
+            weight = FIELD_WEIGHTS[field]
+            for term in tokens:
+                terms[term] = terms.get(term, 0.0) + weight
+        return terms
+
+    def _impact(self, tf: float, length: float) -> float:
+        return tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / self._avg_len))
+
+    def _add_postings(self, property_id: int) -> None:
+        terms = self._weighted_terms(property_id)
+        length = sum(terms.values())
+        self._doc_len[property_id] = length
+        self._total_len += length
+
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+                bisect.insort(self._vocabulary, term)
+            postings.add(property_id, self._impact(tf, length))
+
+    def _remove_postings(self, property_id: int) -> None:
+        if property_id not in self._doc_len:
+            return
+
+        length = self._doc_len.pop(property_id)
+        self._total_len -= length
+
+        for term, tf in self._weighted_terms(property_id).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.discard(property_id, self._impact(tf, length))
+            if not postings:
+                del self._postings[term]
+                position = bisect.bisect_left(self._vocabulary, term)
+                if position < len(self._vocabulary) and self._vocabulary[position] == term:
+                    del self._vocabulary[position]
+
+    def _rebuild_postings(self) -> None:
+        """Recompute every posting impact from stored documents (in memory, no DB access)"""
+        with self._lock:
+            self._avg_len = (self._total_len / len(self._doc_len)) if self._doc_len else 1.0
+            self._avg_len = self._avg_len or 1.0
+
+            collected: Dict[str, List[Tuple[float, int]]] = {}
+            for property_id, length in self._doc_len.items():
+                for term, tf in self._weighted_terms(property_id).items():
+                    collected.setdefault(term, []).append((-self._impact(tf, length), property_id))
+
+            self._postings = {}
+            for term, entries in collected.items():
+                entries.sort()
+                postings = _Postings()
+                postings.keys = array("d", (key for key, _ in entries))
+                postings.ids = array("q", (property_id for _, property_id in entries))
+                self._postings[term] = postings
+            self._vocabulary = sorted(self._postings)
+
+    def _avg_len_drifted(self) -> bool:
+        if not self._doc_len:
+            return False
+        live_avg = self._total_len / len(self._doc_len)
+        return abs(live_avg - self._avg_len) > self.AVG_LEN_DRIFT * self._avg_len
+
+    # ---------- queries ----------
+
+    def _expand(self, token: str, prefix: bool) -> List[str]:
+        """Vocabulary terms matched by a query token"""
+        if not prefix:
+            return [token] if token in self._postings else []
+
+        start = bisect.bisect_left(self._vocabulary, token)
+        matches = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSION]:
+            if not term.startswith(token):
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, text: str, limit: Optional[int] = None, within: Optional[Set[int]] = None) -> Dict[int, float]:
+        """
+        Rank documents for a query with BM25
+
+        Every token is matched exactly except the last one, which is also
+        matched as a prefix so partially typed words find results.
+        With a limit only the `limit` highest-impact postings of each term
+        are read, so cost is bounded by query terms x limit rather than by
+        corpus size (single-term results are exact).
+
+        Args:
+            text: Query text
+            limit: Maximum number of results (highest scores kept)
+            within: Only score these documents (e.g. matches() that pass the SQL filters)
+
+        Returns:
+            Mapping of property ID to score, highest score first
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return {}
+
+        with self._lock:
+            total_docs = len(self._doc_len)
+            if not total_docs:
+                return {}
+
+            scores: Dict[int, float] = {}
+            for position, token in enumerate(tokens):
+                for term in self._expand(token, prefix=position == len(tokens) - 1):
+                    postings = self._postings[term]
+                    df = len(postings)
+                    idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                    if term != token:
+                        idf *= PREFIX_WEIGHT
+
+                    depth = df if limit is None else min(df, limit)
+                    keys = postings.keys[:depth]
+                    ids = postings.ids[:depth]
+                    get = scores.get
+                    for property_id, key in zip(ids, keys):
+                        if within is None or property_id in within:
+                            scores[property_id] = get(property_id, 0.0) - idf * key
+
+        if limit is not None and len(scores) > limit:
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        else:
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return dict(ranked)
+
+    def matches(self, text: str) -> Set[int]:
+        """
+        IDs of every document matching all query tokens, unranked
+
+        Tokens are expanded as in search() (the last one also as a
+        prefix) and a document must match each of them. Whole posting
+        lists are read, so the set is complete however many documents
+        match.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Set of matching property IDs
+        """
+        tokens = tokenize(text)
+        matched: Optional[Set[int]] = None
+        with self._lock:
+            for position, token in enumerate(tokens):
+                token_ids: Set[int] = set()
+                for term in self._expand(token, prefix=position == len(tokens) - 1):
+                    token_ids.update(self._postings[term].ids)
+                matched = token_ids if matched is None else matched & token_ids
+                if not matched:
+                    break
+        return matched or set()
+
+    # ---------- loading ----------
+
+    def sync(self, db: Session) -> int:
+        """
+        Bring the index up to date with the database
+
+        Only rows changed since the last sync are re-tokenized. Rows deleted
+        by this process leave the index on commit; deletions made by other
+        worker processes are found by _drop_deleted(), which reads the ID
+        list only when a COUNT shows the index holds extra documents.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of documents added, updated or removed
+        """
+        # Use the database clock so the watermark matches updated_at
+        started_at = db.query(func.now()).scalar()
+        query = db.query(Property.id, Property.title, Property.description, Property.location)
+        initial_load = self.synced_at is None
+        if not initial_load:
+            query = query.filter(Property.updated_at >= self.synced_at)
+
+        changed = 0
+        for row in query.yield_per(1000):
+            fields = {"title": row.title, "description": row.description, "location": row.location}
+            if initial_load:
+                # Store documents only; postings are built in one pass below
+                with self._lock:
+                    self._doc_fields[row.id] = self._tokenize_fields(fields)
+                    length = sum(self._weighted_terms(row.id).values())
+                    self._doc_len[row.id] = length
+                    self._total_len += length
+            else:
+                self.upsert(row.id, fields)
+            changed += 1
+
+        if not initial_load:
+            changed += self._drop_deleted(db)
+
+        if initial_load or self._avg_len_drifted():
+            self._rebuild_postings()
+
+        self.synced_at = started_at
+        self.ready = True
+        return changed
+
+    def _drop_deleted(self, db: Session) -> int:
+        """
+        Remove documents whose rows were deleted by another worker
+
+        After the incremental pass the index holds every live row, so it
+        can only outnumber the table by rows deleted elsewhere. The IDs are
+        compared only when the counts differ; a deletion hidden by a
+        concurrent insert shows up in the next sync, once that insert has
+        been indexed.
+
+        Returns:
+            Number of documents removed
+        """
+        live_count = db.query(func.count(Property.id)).scalar()
+        if len(self) == live_count:
+            return 0
+
+        live_ids = {row.id for row in db.query(Property.id).yield_per(10000)}
+        with self._lock:
+            stale_ids = [property_id for property_id in self._doc_len if property_id not in live_ids]
+        for property_id in stale_ids:
+            self.remove(property_id)
+        return len(stale_ids)
+
+
+# Global index instance
+property_index = PropertySearchIndex()
+
+
+# ============================================
+# SQLALCHEMY EVENT HOOKS
+# ============================================
+
+def _queue_change(target: Property, inserted: bool = False, deleted: bool = False) -> None:
+    """Record a Property change on its session; applied after commit"""
+    session = Session.object_session(target)
+    if session is None or target.id is None:
+        return
+
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    if deleted:
+        pending[target.id] = None
+        return
+
+    state = inspect(target)
+    fields = pending.get(target.id) or {}
+    for field in FIELD_WEIGHTS:
+        # Inserts index every field; updates only the fields that changed
+        if inserted or state.attrs[field].history.has_changes():
+            fields[field] = state.dict.get(field)
+    pending[target.id] = fields
+
+
+def _after_insert(mapper, connection, target):
+    _queue_change(target, inserted=True)
+
+
+def _after_update(mapper, connection, target):
+    _queue_change(target)
+
+
+def _after_delete(mapper, connection, target):
+    _queue_change(target, deleted=True)
+
+
+def _after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for property_id, fields in pending.items():
+        if fields is None:
+            property_index.remove(property_id)
+        elif fields:
+            property_index.upsert(property_id, fields)
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_search_index() -> None:
+    """
+    Start listening for Property changes and build the index from the database
+    """
+    if not event.contains(Property, "after_insert", _after_insert):
+        event.listen(Property, "after_insert", _after_insert)
+        event.listen(Property, "after_update", _after_update)
+        event.listen(Property, "after_delete", _after_delete)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
+
+    count = _sync_once()
+    logger.info(f"✅ Search index built: {count} properties")
+
+
+def _sync_once() -> int:
+    """Run one incremental sync with its own session"""
+    db = SessionLocal()
+    try:
+        return property_index.sync(db)
+    finally:
+        db.close()
+
+
+async def run_search_index() -> None:
+    """
+    Background task that builds the index, then keeps it in step with
+    writes handled by other workers every SEARCH_INDEX_SYNC_SECONDS.
+    bm25 searches fall back to like until the first build completes.
+    """
+    try:
+        await asyncio.to_thread(init_search_index)
+    except Exception as e:
+        logger.error(f"❌ Search index build failed: {e} - bm25 search will fall back to like")
+        return
+
+    while settings.SEARCH_INDEX_SYNC_SECONDS > 0:
+        await asyncio.sleep(settings.SEARCH_INDEX_SYNC_SECONDS)
+        try:
+            await asyncio.to_thread(_sync_once)
+        except Exception as e:
+            logger.error(f"❌ Search index sync failed: {e}")
@@ -0,0 +1,161 @@
+"""
+Single-Flight Utilities
+Coalesces identical concurrent queries into one in-flight database execution
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def to_json(response_type: Any, result: Any) -> bytes:
+    """Serialize a route result (ORM objects or dicts) as its response type"""
+    adapter = _adapters.get(response_type)
+    if adapter is None:
+        adapter = _adapters[response_type] = TypeAdapter(response_type)
+    return adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+
+
+def reads_own_writes(db: AsyncSession) -> bool:
+    """
+    Whether a request must see its admin's latest write (see db_routing)
+
+    Such requests skip the response cache and single-flight: a cached or
+    in-flight result may have been built before the write.
+    """
+    return bool(db.info.get("read_your_writes"))
+
+
+class SingleFlight:
+    """
+    Run at most one execution per key at a time
+
+    The first caller for a key (the leader) runs the work; callers
+    arriving while it is in flight (followers) await the same result
+    instead of querying again. Keys are tuples whose first
+    element names the route, which is used to break down the counters.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, key: Hashable, field: str) -> None:
+        route = key[0] if isinstance(key, tuple) else str(key)
+        counts = self._counts.setdefault(route, {"executions": 0, "coalesced": 0})
+        counts[field] += 1
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn for key, or wait for the identical call already in flight
+
+        Args:
+            key: Hashable identity of the query (route name first)
+            fn: Coroutine function producing an immutable result
+
+        Returns:
+            The result of fn (shared with concurrent callers)
+        """
+        while key in self._calls:
+            future = self._calls[key]
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader's request was cancelled: retry (and possibly lead)
+                if future.cancelled():
+                    continue
+                raise
+            except BaseException:
+                # Followers share the leader's error (e.g. a 404) too
+                self._count(key, "coalesced")
+                raise
+            self._count(key, "coalesced")
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self._count(key, "executions")
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when no follower is waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Execution and coalescing counters
+
+        Returns:
+            Totals, coalescing ratio (share of calls served by another
+            call's execution) and the same per route
+        """
+        def summary(executions: int, coalesced: int) -> Dict[str, Any]:
+            calls = executions + coalesced
+            return {
+                "executions": executions,
+                "coalesced": coalesced,
+                "coalescing_ratio": round(coalesced / calls, 4) if calls else 0.0
+            }
+
+        executions = sum(counts["executions"] for counts in self._counts.values())
+        coalesced = sum(counts["coalesced"] for counts in self._counts.values())
+        return {
+            **summary(executions, coalesced),
+            "in_flight": len(self._calls),
+            "routes": {
+                route: summary(counts["executions"], counts["coalesced"])
+                for route, counts in self._counts.items()
+            }
+        }
+
+
+# Global single-flight group
+single_flight = SingleFlight()
+
+
+async def coalesced_json(
+    key: Tuple,
+    db: AsyncSession,
+    build: Callable[[Session], Any],
+    response_type: Any
+) -> Response:
+    """
+    Serve a JSON response through the single-flight group
+
+    The leader builds and serializes the result on its session, so
+    followers share immutable bytes rather than session-bound ORM objects.
+    Requests reading their own writes always run their own query.
+
+    Args:
+        key: Query identity (route name first, then normalized parameters)
+        db: Async database session
+        build: Runs the query on a (sync-facade) session and returns the route's result
+        response_type: Type the result is serialized as (the route's response model)
+
+    Returns:
+        JSON response
+    """
+    async def render() -> bytes:
+        return await db.run_sync(lambda session: to_json(response_type, build(session)))
+
+    if reads_own_writes(db):
+        body = await render()
+    else:
+        body = await single_flight.do(key, render)
+    return Response(content=body, media_type="application/json")
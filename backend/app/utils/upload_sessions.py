@@ -0,0 +1,286 @@
+"""
+Resumable Upload Sessions
+Chunked image uploads persisted on disk so dropped connections resume from the received offset
+"""
+
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from app.config import settings
+from app.utils.image import sniff_image, too_large_error
+
+_SESSION_ID = re.compile(r"[0-9a-f]{32}")
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+# A chunk lock older than this is left over from a crashed worker
+LOCK_STALE_SECONDS = 600
+
+
+def parse_chunk_start(content_range: Optional[str], upload_offset: Optional[str], size: int) -> Tuple[int, Optional[int]]:
+    """
+    Where a chunk starts, from `Content-Range: bytes start-end/total` or tus `Upload-Offset`
+
+    Returns:
+        (start, expected chunk length or None)
+
+    Raises:
+        HTTPException: If neither header is usable or the range does not fit the session
+    """
+    if content_range:
+        match = _CONTENT_RANGE.fullmatch(content_range.strip())
+        if not match:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Content-Range must be 'bytes start-end/total'"
+            )
+        start, end, total = (int(value) for value in match.groups())
+        if total != size or end < start or end >= size:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail=f"Content-Range does not fit the {size} byte upload"
+            )
+        return start, end - start + 1
+    if upload_offset is not None and upload_offset.isdigit():
+        return int(upload_offset), None
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Send Content-Range or Upload-Offset with each chunk"
+    )
+
+
+class UploadSessionStore:
+    """
+    Upload sessions kept under UPLOAD_SESSION_DIR, one directory each
+
+    A session holds its metadata (meta.json) and the bytes received so
+    far (data). The received offset is the size of the data file, so it
+    survives restarts and is shared by every worker process; a lock file
+    keeps two chunks of one session from being written at once. Sessions
+    idle for UPLOAD_SESSION_TTL_HOURS are removed.
+    """
+
+    def __init__(self, root: str, ttl_seconds: int):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+
+    def _dir(self, session_id: str) -> Path:
+        if not _SESSION_ID.fullmatch(session_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload session not found"
+            )
+        return self.root / session_id
+
+    def data_path(self, session_id: str) -> Path:
+        """File holding the bytes received for a session"""
+        return self._dir(session_id) / "data"
+
+    def _write_meta(self, session: Dict[str, Any]) -> None:
+        directory = self._dir(session["session_id"])
+        partial = directory / "meta.json.part"
+        partial.write_text(json.dumps(session))
+        os.replace(partial, directory / "meta.json")
+
+    def create(self, property_id: int, admin_id: int, filename: str, size: int, is_primary: bool) -> Dict[str, Any]:
+        """
+        Start a session for one file
+
+        Raises:
+            HTTPException: If the declared size exceeds MAX_UPLOAD_SIZE
+        """
+        if size > settings.MAX_UPLOAD_SIZE:
+            raise too_large_error()
+
+        self.cleanup_expired()
+        session = {
+            "session_id": uuid.uuid4().hex,
+            "property_id": property_id,
+            "admin_id": admin_id,
+            "filename": filename,
+            "size": size,
+            "is_primary": is_primary,
+            "checked": False,
+        }
+        directory = self._dir(session["session_id"])
+        directory.mkdir(parents=True)
+        (directory / "data").touch()
+        self._write_meta(session)
+        return self.describe(session)
+
+    def get(self, session_id: str, admin_id: int) -> Dict[str, Any]:
+        """
+        Session metadata with its current offset
+
+        Raises:
+            HTTPException: If the session does not exist, has expired or
+                belongs to another admin
+        """
+        directory = self._dir(session_id)
+        try:
+            session = json.loads((directory / "meta.json").read_text())
+            modified = (directory / "data").stat().st_mtime
+        except (OSError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload session not found"
+            )
+        if session["admin_id"] != admin_id or modified + self.ttl_seconds < time.time():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload session not found"
+            )
+        return self.describe(session)
+
+    def describe(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Session metadata plus its offset, completion and expiry"""
+        data = self.data_path(session["session_id"])
+        stat = data.stat()
+        return {
+            **session,
+            "offset": stat.st_size,
+            "complete": stat.st_size == session["size"],
+            "expires_at": datetime.fromtimestamp(stat.st_mtime + self.ttl_seconds, tz=timezone.utc),
+        }
+
+    @asynccontextmanager
+    async def locked(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Hold a session's chunk lock (across worker processes)
+
+        Raises:
+            HTTPException: 409 if another request is writing to the session
+        """
+        lock = self._dir(session_id) / "lock"
+        try:
+            if lock.exists() and lock.stat().st_mtime + LOCK_STALE_SECONDS < time.time():
+                lock.unlink()
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Another chunk of this upload is in progress"
+            )
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload session not found"
+            )
+        try:
+            yield
+        finally:
+            if lock.exists():
+                lock.unlink()
+
+    async def append(
+        self,
+        session: Dict[str, Any],
+        start: int,
+        length: Optional[int],
+        chunks: AsyncIterator[bytes]
+    ) -> Dict[str, Any]:
+        """
+        Append a chunk at `start` (call while holding the session lock)
+
+        Bytes received before a dropped connection are kept, so the client
+        resumes from the new offset. Once the image header has arrived it
+        is sniffed, and a rejected upload is deleted.
+
+        Args:
+            session: Session from get()
+            start: Offset the chunk starts at; must equal the received offset
+            length: Declared chunk length (Content-Range), if any
+            chunks: Request body stream
+
+        Returns:
+            Updated session
+
+        Raises:
+            HTTPException: 409 if `start` is not the received offset, 413 if
+                the chunk runs past the declared size, 400 if the header is
+                rejected
+        """
+        offset = session["offset"]
+        if start != offset:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload is at offset {offset}; resume from there"
+            )
+
+        data = self.data_path(session["session_id"])
+        limit = session["size"] if length is None else min(session["size"], offset + length)
+        written = offset
+        with open(data, "ab") as out:
+            try:
+                async for chunk in chunks:
+                    if written + len(chunk) > limit:
+                        out.truncate(offset)
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Chunk runs past byte {limit}"
+                        )
+                    await run_in_threadpool(out.write, chunk)
+                    written += len(chunk)
+            except ClientDisconnect:
+                pass
+
+        session = self.describe(session)
+        header_size = min(settings.UPLOAD_HEADER_BYTES, session["size"])
+        if not session["checked"] and session["offset"] >= header_size:
+            with open(data, "rb") as f:
+                header = f.read(header_size)
+            try:
+                sniff_image(header)
+            except HTTPException:
+                self.delete(session["session_id"])
+                raise
+            session["checked"] = True
+            self._write_meta({key: session[key] for key in (
+                "session_id", "property_id", "admin_id", "filename", "size", "is_primary", "checked"
+            )})
+        return session
+
+    def delete(self, session_id: str) -> None:
+        """Remove a session and its received bytes"""
+        shutil.rmtree(self._dir(session_id), ignore_errors=True)
+
+    def cleanup_expired(self) -> int:
+        """Remove sessions (and staged uploads) idle for longer than the TTL; returns the number removed"""
+        if not self.root.exists():
+            return 0
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+        for directory in self.root.iterdir():
+            if directory.is_file():
+                # Staged single-request upload left by a crashed worker (see save_uploaded_image)
+                if directory.stat().st_mtime < cutoff:
+                    directory.unlink(missing_ok=True)
+                    removed += 1
+                continue
+            data = directory / "data"
+            try:
+                expired = data.stat().st_mtime < cutoff
+            except OSError:
+                expired = directory.stat().st_mtime < cutoff
+            if expired:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+        return removed
+
+
+# Global upload session store
+upload_sessions = UploadSessionStore(
+    root=settings.UPLOAD_SESSION_DIR,
+    ttl_seconds=settings.UPLOAD_SESSION_TTL_HOURS * 3600
+)
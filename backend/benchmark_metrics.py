@@ -0,0 +1,110 @@
+"""
+Metrics Overhead Benchmark
+Measures the per-request cost of MetricsMiddleware against a bare ASGI app
+
+Usage:
+    python benchmark_metrics.py [requests]
+"""
+
+import sys
+import os
+import asyncio
+import time
+from statistics import median
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.metrics import MetricsMiddleware, MetricsRegistry
+
+DEFAULT_REQUESTS = 100000
+RUNS = 5
+BUDGET_US = 5.0
+
+
+async def get_property(scope, receive, send):
+    pass
+
+
+class _Route:
+    path = "/api/properties/{property_id}"
+    endpoint = get_property
+
+
+class _App:
+    routes = [_Route]
+
+
+async def bare_app(scope, receive, send):
+    """Minimal endpoint: routes, reads the body and sends a small JSON response"""
+    scope["app"] = _App
+    scope["endpoint"] = get_property
+    await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"id": 1}'})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def time_app(app, requests: int) -> float:
+    """Median microseconds per request over RUNS batches"""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        for i in range(requests):
+            await app({"type": "http", "method": "GET", "path": f"/api/properties/{i % 500}"}, receive, send)
+        timings.append((time.perf_counter() - start) / requests * 1e6)
+    return median(timings)
+
+
+def run_benchmark(requests: int) -> bool:
+    """
+    Compare the bare app with the same app wrapped in MetricsMiddleware
+
+    Returns:
+        True if the overhead is within BUDGET_US
+    """
+    print("=" * 60)
+    print("📈 Eldoret House Hunters - Metrics Overhead Benchmark")
+    print("=" * 60)
+    print(f"Requests per run: {requests}  Runs: {RUNS}")
+    print()
+
+    registry = MetricsRegistry()
+    wrapped = MetricsMiddleware(bare_app, registry)
+
+    bare = asyncio.run(time_app(bare_app, requests))
+    instrumented = asyncio.run(time_app(wrapped, requests))
+    overhead = instrumented - bare
+
+    start = time.perf_counter()
+    for i in range(requests):
+        registry.observe("GET", "/api/properties/{property_id}", 200, 0.012, 0, 9)
+    observe = (time.perf_counter() - start) / requests * 1e6
+
+    print(f"  bare app          {bare:8.3f} µs/request")
+    print(f"  with metrics      {instrumented:8.3f} µs/request")
+    print(f"  overhead          {overhead:8.3f} µs/request (budget {BUDGET_US} µs)")
+    print(f"  observe() alone   {observe:8.3f} µs/call")
+    print(f"  series            {len(registry.routes)} (raw paths collapse to one route template)")
+    print()
+
+    within = overhead <= BUDGET_US
+    print("✅ Within budget" if within else "❌ Over budget")
+    return within
+
+
+if __name__ == "__main__":
+    try:
+        ok = run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS)
+        sys.exit(0 if ok else 1)
+    except KeyboardInterrupt:
+        print("\n\n❌ Benchmark cancelled")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
@@ -0,0 +1,92 @@
+"""
+Search Benchmark Script
+Compares the LIKE scan with FULLTEXT MATCH ... AGAINST on the configured database
+
+Usage:
+    python benchmark_search.py [term ...]
+"""
+
+import sys
+import os
+import time
+from statistics import median
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.models.property import Property
+from app.schemas.property import SearchMode
+from app.utils.search import search_clause, fulltext_supported
+
+DEFAULT_TERMS = ["apartment", "pioneer", "garden", "modern kitchen"]
+RUNS = 20
+
+
+def compile_query(db, term: str, mode: SearchMode) -> str:
+    """Compile the id query used by /properties for a term and mode"""
+    query = db.query(Property.id).filter(search_clause(term, mode))
+    return str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+
+
+def explain(db, sql: str) -> str:
+    """Summarise MySQL's EXPLAIN output (access type, key, rows examined)"""
+    row = db.execute(text(f"EXPLAIN {sql}")).mappings().first()
+    return f"type={row['type']} key={row['key']} rows={row['rows']}"
+
+
+def time_query(db, sql: str) -> float:
+    """Median wall time over RUNS executions in milliseconds"""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        db.execute(text(sql)).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return median(timings)
+
+
+def run_benchmark(terms):
+    """
+    Run EXPLAIN and timings for each term in every search mode
+    """
+    print("=" * 60)
+    print("🔎 Eldoret House Hunters - Search Benchmark")
+    print("=" * 60)
+
+    if not fulltext_supported():
+        print("❌ FULLTEXT search requires MySQL/MariaDB (see DATABASE_URL)")
+        return
+
+    db = SessionLocal()
+
+    try:
+        total = db.query(Property).count()
+        print(f"Properties: {total}  Runs per query: {RUNS}")
+        print()
+
+        for term in terms:
+            print(f"Term: {term!r}")
+            for mode in SearchMode:
+                sql = compile_query(db, term, mode)
+                hits = len(db.execute(text(sql)).fetchall())
+                print(
+                    f"  {mode.value:<8} {time_query(db, sql):8.2f} ms  "
+                    f"hits={hits:<6} {explain(db, sql)}"
+                )
+            print()
+
+        print("LIKE plans show type=ALL (full table scan);")
+        print("FULLTEXT plans show type=fulltext key=idx_search.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        run_benchmark(sys.argv[1:] or DEFAULT_TERMS)
+    except KeyboardInterrupt:
+        print("\n\n❌ Benchmark cancelled")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
@@ -0,0 +1,51 @@
+-- ============================================
+-- MIGRATION: Composite Listing Indexes
+-- Version: 1.2.0
+-- ============================================
+-- Replaces single-column indexes on low-cardinality columns with
+-- composite indexes matched to the listing queries (filter + sort).
+-- Verify with: python index_advisor.py
+-- ============================================
+
+USE eldoret_house_hunters;
+
+-- ============================================
+-- 1. PROPERTIES
+-- ============================================
+
+ALTER TABLE `properties`
+ADD INDEX IF NOT EXISTS `idx_featured_availability_created` (`featured`, `availability`, `created_at`),
+ADD INDEX IF NOT EXISTS `idx_availability_created` (`availability`, `created_at`),
+ADD INDEX IF NOT EXISTS `idx_created_at` (`created_at`),
+ADD INDEX IF NOT EXISTS `idx_listing_created` (`listing_type`, `created_at`),
+ADD INDEX IF NOT EXISTS `idx_listing_price` (`listing_type`, `price`),
+ADD INDEX IF NOT EXISTS `idx_listing_type_price` (`listing_type`, `property_type`, `price`);
+
+-- Now covered as left prefixes of the composite indexes above
+ALTER TABLE `properties`
+DROP INDEX IF EXISTS `idx_featured`,
+DROP INDEX IF EXISTS `idx_availability`,
+DROP INDEX IF EXISTS `idx_listing_type`;
+
+-- ============================================
+-- 2. PROPERTY IMAGES
+-- ============================================
+
+-- Serves the primary-image lookup and ordered gallery loads;
+-- also backs the property_id foreign key, so add it before dropping idx_property_id
+ALTER TABLE `property_images`
+ADD INDEX IF NOT EXISTS `idx_property_primary_order` (`property_id`, `is_primary`, `display_order`);
+
+ALTER TABLE `property_images`
+DROP INDEX IF EXISTS `idx_property_id`,
+DROP INDEX IF EXISTS `idx_is_primary`;
+
+-- ============================================
+-- 3. REFRESH STATISTICS
+-- ============================================
+
+ANALYZE TABLE `properties`, `property_images`;
+
+-- ============================================
+-- MIGRATION COMPLETE
+-- ============================================
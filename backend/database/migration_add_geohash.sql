@@ -0,0 +1,47 @@
+-- ============================================
+-- MIGRATION: Geohash Column for Geo Search
+-- Version: 1.3.0
+-- ============================================
+-- Adds the indexed geohash column behind the near/radius_km and bbox
+-- filters. Runs unchanged on MySQL and MariaDB: each change is checked
+-- against information_schema instead of using ADD ... IF NOT EXISTS
+-- (MariaDB only), so the script can be re-run safely.
+--
+-- Existing rows are backfilled by the API on startup
+-- (backfill_geohashes, in batches of 500), using the same geohash
+-- encoding the near/bbox filters search with.
+-- ============================================
+
+USE eldoret_house_hunters;
+
+-- ============================================
+-- 1. ADD COLUMN
+-- ============================================
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.COLUMNS
+     WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'properties' AND COLUMN_NAME = 'geohash') = 0,
+    'ALTER TABLE `properties` ADD COLUMN `geohash` VARCHAR(12) NULL COMMENT ''Geohash of latitude/longitude for geo search'' AFTER `longitude`',
+    'SELECT ''geohash column already exists'''
+);
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- 2. ADD INDEX
+-- ============================================
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.STATISTICS
+     WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'properties' AND INDEX_NAME = 'idx_geohash') = 0,
+    'ALTER TABLE `properties` ADD INDEX `idx_geohash` (`geohash`)',
+    'SELECT ''idx_geohash already exists'''
+);
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ============================================
+-- MIGRATION COMPLETE
+-- ============================================
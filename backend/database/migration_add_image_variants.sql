@@ -0,0 +1,22 @@
+-- ============================================
+-- MIGRATION: Responsive Image Variants
+-- Version: 1.4.0
+-- ============================================
+-- Adds the variants column holding the resized WebP/JPEG (and AVIF,
+-- where Pillow supports it) copies written at upload, exposed to
+-- clients as srcset. Images uploaded before this migration get their
+-- variants from: python generate_image_variants.py
+-- ============================================
+
+USE eldoret_house_hunters;
+
+-- ============================================
+-- 1. ADD COLUMN
+-- ============================================
+
+ALTER TABLE `property_images`
+ADD COLUMN IF NOT EXISTS `variants` JSON NULL COMMENT 'Resized/re-encoded copies: url, width, height, format' AFTER `image_url`;
+
+-- ============================================
+-- MIGRATION COMPLETE
+-- ============================================
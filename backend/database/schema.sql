@@ -49,6 +49,7 @@ CREATE TABLE IF NOT EXISTS `properties` (
     `location` VARCHAR(255) NOT NULL,
     `latitude` DECIMAL(10, 8) NULL,
     `longitude` DECIMAL(11, 8) NULL,
+    `geohash` VARCHAR(12) NULL COMMENT 'Geohash of latitude/longitude for geo search',
     `bedrooms` INT NOT NULL DEFAULT 1,
     `bathrooms` INT NOT NULL DEFAULT 1,
     `area_sqm` DECIMAL(10, 2) NULL,
@@ -58,11 +59,15 @@ CREATE TABLE IF NOT EXISTS `properties` (
     `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX `idx_title` (`title`),
     INDEX `idx_property_type` (`property_type`),
-    INDEX `idx_listing_type` (`listing_type`),
     INDEX `idx_price` (`price`),
     INDEX `idx_location` (`location`),
-    INDEX `idx_availability` (`availability`),
-    INDEX `idx_featured` (`featured`),
+    INDEX `idx_geohash` (`geohash`),
+    INDEX `idx_featured_availability_created` (`featured`, `availability`, `created_at`),
+    INDEX `idx_availability_created` (`availability`, `created_at`),
+    INDEX `idx_created_at` (`created_at`),
+    INDEX `idx_listing_created` (`listing_type`, `created_at`),
+    INDEX `idx_listing_price` (`listing_type`, `price`),
+    INDEX `idx_listing_type_price` (`listing_type`, `property_type`, `price`),
     FULLTEXT `idx_search` (`title`, `description`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -75,11 +80,11 @@ CREATE TABLE IF NOT EXISTS `property_images` (
     `id` INT AUTO_INCREMENT PRIMARY KEY,
     `property_id` INT NOT NULL,
     `image_url` VARCHAR(500) NOT NULL,
+    `variants` JSON NULL COMMENT 'Resized/re-encoded copies: url, width, height, format',
     `is_primary` BOOLEAN DEFAULT FALSE,
     `display_order` INT DEFAULT 0,
     FOREIGN KEY (`property_id`) REFERENCES `properties`(`id`) ON DELETE CASCADE,
-    INDEX `idx_property_id` (`property_id`),
-    INDEX `idx_is_primary` (`is_primary`)
+    INDEX `idx_property_primary_order` (`property_id`, `is_primary`, `display_order`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 
@@ -0,0 +1,79 @@
+"""
+Image Variant Backfill Script
+Writes responsive variants for property images uploaded before they existed
+
+Usage:
+    python generate_image_variants.py [--all]
+
+    --all  Regenerate every image's variants (e.g. after changing
+           IMAGE_VARIANT_WIDTHS or IMAGE_VARIANT_FORMATS)
+"""
+
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import settings
+from app.database import SessionLocal
+from app.image_pool import generate_variants, variant_formats
+from app.models.property import PropertyImage
+from app.utils.image import variant_records
+
+BATCH_SIZE = 50
+
+
+def backfill(regenerate: bool = False):
+    """
+    Generate variants for stored images, committing per batch
+    """
+    print("=" * 60)
+    print("🖼️  Eldoret House Hunters - Image Variant Backfill")
+    print("=" * 60)
+    print(f"Widths: {settings.IMAGE_VARIANT_WIDTHS}  Formats: {', '.join(variant_formats())}")
+    print()
+
+    db = SessionLocal()
+    generated = failed = 0
+    try:
+        query = db.query(PropertyImage).order_by(PropertyImage.id)
+        if not regenerate:
+            query = query.filter(PropertyImage.variants.is_(None))
+        images = query.all()
+        print(f"Images to process: {len(images)}")
+
+        with ProcessPoolExecutor(max_workers=max(settings.IMAGE_WORKERS, 1)) as executor:
+            for start in range(0, len(images), BATCH_SIZE):
+                batch = [image for image in images[start:start + BATCH_SIZE] if os.path.exists(image.image_url)]
+                failed += len(images[start:start + BATCH_SIZE]) - len(batch)
+                futures = [(image, executor.submit(generate_variants, image.image_url)) for image in batch]
+
+                for image, future in futures:
+                    try:
+                        image.variants = variant_records(image.image_url, future.result())
+                        generated += 1
+                    except Exception as e:
+                        failed += 1
+                        print(f"⚠️  Image {image.id} ({image.image_url}): {e}")
+
+                db.commit()
+                print(f"  {min(start + BATCH_SIZE, len(images))}/{len(images)}")
+    finally:
+        db.close()
+
+    print()
+    print(f"✅ Generated variants for {generated} images")
+    if failed:
+        print(f"⚠️  {failed} images skipped (missing or unreadable files)")
+    print("Cached card listings pick up the variants within RESPONSE_CACHE_TTL_SECONDS.")
+
+
+if __name__ == "__main__":
+    try:
+        backfill(regenerate="--all" in sys.argv[1:])
+    except KeyboardInterrupt:
+        print("\n\n❌ Backfill cancelled")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
@@ -0,0 +1,190 @@
+"""
+Index Advisor Script
+Replays the listing filter/sort combinations through EXPLAIN and reports full scans and filesorts
+
+Usage:
+    python index_advisor.py [--all]
+"""
+
+import sys
+import os
+from itertools import combinations
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.models.property import Property, PropertyType, ListingType, AvailabilityStatus
+from app.schemas.property import PropertySort, SearchMode
+from app.utils.filters import PropertyFilters
+from app.utils.pagination import get_order_by
+
+# Representative value per filter parameter (min/max price replay together)
+SAMPLE_FILTERS = {
+    "listing_type": {"listing_type": ListingType.RENT},
+    "property_type": {"property_type": PropertyType.APARTMENT},
+    "price": {"min_price": 10000, "max_price": 50000},
+    "bedrooms": {"bedrooms": 2},
+    "availability": {"availability": AvailabilityStatus.AVAILABLE},
+    "featured": {"featured": True},
+    "location": {"location": "eldoret"},
+}
+
+# Filters compared by equality (lead a composite index); the rest are ranges
+EQUALITY_FILTERS = ["featured", "listing_type", "property_type", "availability"]
+
+SORTS = [PropertySort.NEWEST, PropertySort.PRICE_ASC, PropertySort.PRICE_DESC]
+SORT_COLUMNS = {
+    PropertySort.NEWEST: "created_at",
+    PropertySort.PRICE_ASC: "price",
+    PropertySort.PRICE_DESC: "price",
+}
+PAGE_SIZE = 12
+
+
+def build_filters(names) -> PropertyFilters:
+    """Build a PropertyFilters with the sample values for the given parameters"""
+    params = dict(
+        location=None, property_type=None, listing_type=None,
+        min_price=None, max_price=None, bedrooms=None, bathrooms=None,
+        featured=None, availability=None, search=None, search_mode=SearchMode.LIKE,
+        near=None, radius_km=5.0, bbox=None,
+    )
+    for name in names:
+        params.update(SAMPLE_FILTERS[name])
+    return PropertyFilters(**params)
+
+
+def listing_query(filters: PropertyFilters, sort: PropertySort):
+    """Listing query as issued by GET /properties (first page)"""
+    return lambda db: db.query(Property)\
+        .filter(*filters.clauses())\
+        .order_by(*get_order_by(sort))\
+        .limit(PAGE_SIZE)
+
+
+def workload():
+    """
+    Yield (label, filter names, sort, query factory) for every replayed listing query
+    """
+    names = list(SAMPLE_FILTERS)
+    for size in range(len(names) + 1):
+        for combo in combinations(names, size):
+            filters = build_filters(combo)
+            for sort in SORTS:
+                label = f"{'+'.join(combo) or '(none)'} sort={sort.value}"
+                yield label, combo, sort, listing_query(filters, sort)
+
+    # Featured and trending lists (fixed filters, newest first)
+    yield "featured list", ("featured", "availability"), PropertySort.NEWEST, \
+        listing_query(build_filters(("featured", "availability")), PropertySort.NEWEST)
+    yield "trending list", ("availability",), PropertySort.NEWEST, \
+        listing_query(build_filters(("availability",)), PropertySort.NEWEST)
+
+
+def compile_sql(db, query) -> str:
+    """Render a query with literal values for EXPLAIN"""
+    return str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+
+
+def explain(db, sql: str):
+    """
+    Run EXPLAIN for the configured dialect
+
+    Returns:
+        Tuple of (plan summary, list of problems)
+    """
+    dialect = db.get_bind().dialect.name
+    problems = []
+
+    if dialect in ("mysql", "mariadb"):
+        rows = db.execute(text(f"EXPLAIN {sql}")).mappings().all()
+        parts = []
+        for row in rows:
+            extra = row.get("Extra") or ""
+            parts.append(f"{row['table']}:type={row['type']} key={row['key']} rows={row['rows']}")
+            if row["type"] == "ALL":
+                problems.append(f"full scan of {row['table']}")
+            if "Using filesort" in extra:
+                problems.append("filesort")
+            if "Using temporary" in extra:
+                problems.append("temporary table")
+        return "; ".join(parts), problems
+
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    details = [row[-1] for row in rows]
+    for detail in details:
+        if detail.startswith("SCAN") and "USING" not in detail:
+            problems.append(f"full scan ({detail})")
+        if "USE TEMP B-TREE" in detail:
+            problems.append("filesort")
+    return "; ".join(details), problems
+
+
+def suggest_index(combo, sort: PropertySort) -> str:
+    """Candidate composite index: equality columns first, then the sort column"""
+    columns = [name for name in EQUALITY_FILTERS if name in combo]
+    columns.append(SORT_COLUMNS[sort])
+    return f"({', '.join(columns)})"
+
+
+def run_advisor(show_all: bool = False):
+    """
+    EXPLAIN every listing query in the workload and report problem plans
+    """
+    print("=" * 60)
+    print("📇 Eldoret House Hunters - Index Advisor")
+    print("=" * 60)
+
+    db = SessionLocal()
+
+    try:
+        print(f"Database: {db.get_bind().dialect.name}  Properties: {db.query(Property).count()}")
+        print()
+
+        checked = 0
+        flagged = 0
+        suggestions = {}
+
+        for label, combo, sort, make_query in workload():
+            plan, problems = explain(db, compile_sql(db, make_query(db)))
+            checked += 1
+
+            if problems:
+                flagged += 1
+                # A leading-wildcard location filter can never use a B-tree index
+                if set(combo) - {"location", "bedrooms"}:
+                    candidate = suggest_index(combo, sort)
+                    suggestions[candidate] = suggestions.get(candidate, 0) + 1
+
+            if problems or show_all:
+                marker = "⚠️ " if problems else "✅"
+                print(f"{marker} {label}")
+                print(f"     {plan}")
+                if problems:
+                    print(f"     problems: {', '.join(sorted(set(problems)))}")
+
+        print()
+        print(f"Queries checked: {checked}  Flagged: {flagged}")
+
+        if suggestions:
+            print()
+            print("Candidate composite indexes (queries helped):")
+            for candidate, count in sorted(suggestions.items(), key=lambda item: -item[1]):
+                print(f"  {candidate:<55} {count}")
+            print()
+            print("Candidates are starting points - prefer extending an existing")
+            print("index over adding one per query shape.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        run_advisor(show_all="--all" in sys.argv[1:])
+    except KeyboardInterrupt:
+        print("\n\n❌ Index advisor cancelled")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
@@ -0,0 +1,112 @@
+"""
+Test Configuration
+Runs the API against a throwaway SQLite database seeded with sample listings
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Settings are read at import time, so point them at a scratch database first
+_TEST_DIR = tempfile.mkdtemp(prefix="ehh-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_TEST_DIR}/test.db",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "SECRET_KEY": "test-secret-key",
+    "DEBUG": "false",
+    "UPLOAD_DIR": f"{_TEST_DIR}/uploads",
+    "UPLOAD_SESSION_DIR": f"{_TEST_DIR}/uploads/sessions",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models.admin import Admin, AdminRole
+from app.models.amenity import Amenity
+from app.models.property import (
+    Property, PropertyImage, PropertyAmenity, PropertyType, ListingType, AvailabilityStatus
+)
+from app.utils.auth import create_access_token, get_password_hash
+
+PROPERTY_COUNT = 30
+
+
+@pytest.fixture(scope="session")
+def client():
+    """API client; entering it runs startup, which creates the tables"""
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def properties(client):
+    """
+    Seed listings with images and amenities
+
+    Most rows take created_at from the server default, so many share one
+    second (and SQLite stores them without a fraction); the rest carry
+    microseconds, as rows written through the ORM do.
+    """
+    db = SessionLocal()
+    try:
+        amenities = [Amenity(name=name) for name in ("WiFi", "Parking", "Gym", "Pool")]
+        db.add_all(amenities)
+        db.flush()
+
+        for i in range(PROPERTY_COUNT):
+            property_obj = Property(
+                title=f"Family house {i} with garden",
+                description="Spacious home near schools and shopping",
+                property_type=list(PropertyType)[i % len(PropertyType)],
+                listing_type=list(ListingType)[i % len(ListingType)],
+                price=Decimal(10000 + 5000 * (i % 4)),
+                location=("Pioneer, Eldoret", "Annex, Eldoret", "Langas, Eldoret")[i % 3],
+                latitude=Decimal("0.51") + Decimal(i) / 1000,
+                longitude=Decimal("35.26") + Decimal(i) / 1000,
+                bedrooms=1 + i % 4,
+                bathrooms=1 + i % 2,
+                availability=AvailabilityStatus.AVAILABLE,
+                featured=i % 5 == 0,
+            )
+            if i >= 20:
+                property_obj.created_at = datetime(2025, 1, 1, 12, 0, 0, 250000) + timedelta(seconds=i // 3)
+            db.add(property_obj)
+            db.flush()
+
+            for order in range(2):
+                db.add(PropertyImage(
+                    property_id=property_obj.id,
+                    image_url=f"uploads/{property_obj.id}/{order}.jpg",
+                    is_primary=order == 0,
+                    display_order=order
+                ))
+            for amenity in amenities[i % 2::2]:
+                db.add(PropertyAmenity(property_id=property_obj.id, amenity_id=amenity.id))
+
+        db.commit()
+        return [row.id for row in db.query(Property.id)]
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    """Authorization header for a seeded super admin"""
+    db = SessionLocal()
+    try:
+        admin = Admin(
+            username="testadmin",
+            email="testadmin@eldorethousehunters.co.ke",
+            password_hash=get_password_hash("Test@1234"),
+            role=AdminRole.SUPER_ADMIN
+        )
+        db.add(admin)
+        db.commit()
+        token = create_access_token({"sub": str(admin.id), "username": admin.username})
+    finally:
+        db.close()
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,25 @@
+"""
+Count Estimate Tests
+EXPLAIN estimates keep user input as bound parameters
+"""
+
+from sqlalchemy.dialects import mysql
+
+from app.database import SessionLocal
+from app.models.property import Property
+from app.utils.count_cache import Explain
+
+
+def test_explain_binds_search_text():
+    db = SessionLocal()
+    try:
+        search = "%a:b 'quoted'%"
+        query = db.query(Property).filter(Property.title.ilike(search))
+
+        compiled = Explain(query.statement).compile(dialect=mysql.pymysql.dialect())
+    finally:
+        db.close()
+
+    assert str(compiled).startswith("EXPLAIN SELECT")
+    assert "a:b" not in str(compiled)
+    assert search in compiled.params.values()
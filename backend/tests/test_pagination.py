@@ -0,0 +1,49 @@
+"""
+Pagination Tests
+Cursor pagination must visit every listing exactly once
+"""
+
+import pytest
+
+from app.schemas.property import PropertySort
+
+
+def walk_cursor_pages(client, sort: PropertySort, page_size: int = 4, max_pages: int = 50):
+    """Follow next_cursor from the first page to the last; returns ids in page order"""
+    response = client.get("/api/properties", params={"sort": sort.value, "page_size": page_size})
+    assert response.status_code == 200
+    body = response.json()
+    ids = [item["id"] for item in body["properties"]]
+
+    cursor = body["next_cursor"]
+    pages = 1
+    while cursor:
+        pages += 1
+        assert pages <= max_pages, "cursor pagination is repeating pages"
+        response = client.get(
+            "/api/properties",
+            params={"sort": sort.value, "page_size": page_size, "cursor": cursor}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        ids += [item["id"] for item in body["properties"]]
+        cursor = body["next_cursor"]
+    return ids
+
+
+@pytest.mark.parametrize("sort", [PropertySort.NEWEST, PropertySort.PRICE_ASC, PropertySort.PRICE_DESC])
+def test_cursor_pages_cover_every_listing_once(client, properties, sort):
+    ids = walk_cursor_pages(client, sort)
+
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == sorted(properties)
+
+
+def test_cursor_for_another_sort_is_rejected(client, properties):
+    first = client.get("/api/properties", params={"sort": "newest", "page_size": 4}).json()
+
+    response = client.get(
+        "/api/properties",
+        params={"sort": "price_asc", "page_size": 4, "cursor": first["next_cursor"]}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,53 @@
+"""
+Query Budget Tests
+Fail when an endpoint runs more SQL queries than QUERY_BUDGETS allows
+"""
+
+import pytest
+
+from app.utils.count_cache import count_cache
+from app.utils.query_stats import assert_query_budget
+from app.utils.response_cache import response_cache
+
+
+@pytest.fixture(autouse=True)
+def cold_caches():
+    """Budgets are for uncached requests: a cache hit would run no queries at all"""
+    response_cache.clear()
+    count_cache.invalidate()
+    yield
+
+
+@pytest.mark.parametrize("page_size", [5, 30])
+def test_property_list_budget(client, properties, page_size):
+    # Images and amenities are batch-loaded, so the count does not grow with the page
+    response = assert_query_budget(client, "GET", f"/api/properties?page_size={page_size}")
+
+    assert response.status_code == 200
+    assert len(response.json()["properties"]) == min(page_size, len(properties))
+
+
+def test_property_list_with_filters_budget(client, properties):
+    response = assert_query_budget(
+        client, "GET", "/api/properties?page_size=30&bedrooms=2&search=garden&sort=price_asc"
+    )
+
+    assert response.status_code == 200
+
+
+def test_property_detail_budget(client, properties):
+    response = assert_query_budget(client, "GET", f"/api/properties/{properties[0]}")
+
+    assert response.status_code == 200
+    assert response.json()["images"]
+
+
+def test_dashboard_stats_budget(client, properties, admin_headers):
+    response = assert_query_budget(client, "GET", "/api/admin/dashboard/stats", headers=admin_headers)
+
+    assert response.status_code == 200
+
+
+def test_budget_overrun_fails(client, properties):
+    with pytest.raises(AssertionError, match="budget 1"):
+        assert_query_budget(client, "GET", "/api/properties?page_size=5", max_queries=1)
@@ -0,0 +1,39 @@
+"""
+Read-Your-Writes Tests
+Admins echoing a read-your-writes token never get shared (cached) results
+"""
+
+from app.database import SessionLocal
+from app.models.admin import Admin
+from app.utils.db_routing import READ_YOUR_WRITES_HEADER, issue_read_your_writes_token
+from app.utils.response_cache import response_cache
+
+
+def admin_id():
+    db = SessionLocal()
+    try:
+        return db.query(Admin.id).filter(Admin.username == "testadmin").scalar()
+    finally:
+        db.close()
+
+
+def test_token_bypasses_response_cache(client, properties, admin_headers):
+    response_cache.clear()
+    client.get("/api/properties/featured/list")
+    assert client.get("/api/properties/featured/list").headers["X-Cache"] == "HIT"
+
+    headers = {**admin_headers, READ_YOUR_WRITES_HEADER: issue_read_your_writes_token(admin_id())}
+    response = client.get("/api/properties/featured/list", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "BYPASS"
+
+
+def test_token_needs_its_admin(client, properties):
+    # Without the issuing admin's bearer token the header is ignored
+    headers = {READ_YOUR_WRITES_HEADER: issue_read_your_writes_token(admin_id() or 1)}
+    client.get("/api/properties/featured/list")
+
+    response = client.get("/api/properties/featured/list", headers=headers)
+
+    assert response.headers["X-Cache"] == "HIT"
@@ -0,0 +1,106 @@
+"""
+Search Tests
+BM25 searches answered by the in-process index
+"""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.count_cache import count_cache
+from app.utils.query_stats import assert_query_budget
+from app.utils.response_cache import response_cache
+from app.utils.search_index import init_search_index, property_index
+
+
+@pytest.fixture(scope="module")
+def search_index(properties):
+    init_search_index()
+    assert property_index.ready
+    return property_index
+
+
+@pytest.fixture(autouse=True)
+def cold_caches():
+    response_cache.clear()
+    count_cache.invalidate()
+    yield
+
+
+@pytest.fixture
+def statement_params():
+    """Number of bound parameters of every statement run during a test"""
+    sizes = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sizes.append(len(parameters or ()))
+
+    event.listen(Engine, "before_cursor_execute", record)
+    yield sizes
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+def all_ids(client, url, page_size=7):
+    ids, page = [], 1
+    while True:
+        data = client.get(f"{url}&page={page}&page_size={page_size}").json()
+        ids += [item["id"] for item in data["properties"]]
+        if page >= data["total_pages"]:
+            return data["total"], ids
+        page += 1
+
+
+@pytest.mark.parametrize("sort", ["newest", "price_asc", "relevance"])
+def test_bm25_matches_like_with_filters(client, search_index, sort):
+    like_total, like_ids = all_ids(client, f"/api/properties?search=garden&bedrooms=2&sort={sort}")
+    bm25_total, bm25_ids = all_ids(client, f"/api/properties?search=garden&search_mode=bm25&bedrooms=2&sort={sort}")
+
+    assert bm25_total == like_total == len(bm25_ids)
+    assert len(set(bm25_ids)) == len(bm25_ids)
+    assert set(bm25_ids) == set(like_ids)
+    if sort != "relevance":
+        assert bm25_ids == like_ids
+
+
+def test_bm25_requires_every_word(client, properties, search_index):
+    data = client.get("/api/properties?search=house 7&search_mode=bm25").json()
+
+    assert data["total"] == 1
+    assert "house 7 " in data["properties"][0]["title"]
+
+
+def test_bm25_cursor_pages(client, properties, search_index):
+    url = "/api/properties?search=garden&search_mode=bm25&sort=price_desc&page_size=4"
+    data = client.get(url).json()
+    ids = [item["id"] for item in data["properties"]]
+    while data["next_cursor"]:
+        data = client.get(f"{url}&cursor={data['next_cursor']}").json()
+        ids += [item["id"] for item in data["properties"]]
+
+    assert sorted(ids) == sorted(properties)
+
+
+def test_bm25_sends_no_match_list_to_the_database(client, properties, search_index, statement_params):
+    response = client.get("/api/properties?search=garden&search_mode=bm25&sort=relevance&page_size=5")
+
+    assert response.json()["total"] == len(properties)
+    assert max(statement_params) <= 10
+
+
+def test_bm25_facets_and_clusters(client, properties, search_index):
+    facets = client.get("/api/properties/facets?search=house 7&search_mode=bm25").json()
+    clusters = client.get(
+        "/api/properties/clusters?zoom=3&bbox=35,0,36,1&search=house 7&search_mode=bm25"
+    ).json()
+
+    assert facets["total"] == 1
+    assert clusters["total"] == 1
+
+
+@pytest.mark.parametrize("sort", ["newest", "relevance"])
+def test_bm25_listing_budget(client, properties, search_index, sort):
+    response = assert_query_budget(
+        client, "GET", f"/api/properties?search=garden&search_mode=bm25&bedrooms=2&sort={sort}&page_size=30"
+    )
+
+    assert response.status_code == 200
@@ -0,0 +1,33 @@
+"""
+Single-Flight Tests
+Concurrent identical requests share one database execution
+"""
+
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.utils.response_cache import response_cache
+from app.utils.single_flight import single_flight
+
+
+def route_counts(route):
+    return single_flight.stats()["routes"].get(route, {"executions": 0, "coalesced": 0})
+
+
+def test_cache_misses_are_coalesced(client, properties):
+    response_cache.clear()
+    before = route_counts("amenities")
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as http:
+            return await asyncio.gather(*(http.get("/api/amenities") for _ in range(10)))
+
+    responses = asyncio.run(burst())
+    after = route_counts("amenities")
+
+    assert all(response.status_code == 200 for response in responses)
+    assert after["executions"] - before["executions"] == 1
+    assert after["coalesced"] - before["coalesced"] == 9
@@ -0,0 +1,67 @@
+"""
+Upload Cleanup Tests
+A cancelled upload leaves no image files behind
+"""
+
+import asyncio
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+from app.image_pool import image_pool
+from app.utils.image import store_image
+
+
+def test_cancelled_store_removes_worker_output():
+    directory = Path(tempfile.mkdtemp())
+    try:
+        source = directory / "source.png"
+        Image.new("RGB", (2400, 1600), "teal").save(source)
+        destination = directory / "stored.jpg"
+
+        async def cancel_mid_job():
+            task = asyncio.create_task(store_image(source, destination))
+            while not image_pool.running:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            # The worker finishes on its own; its output is removed when it does
+            while image_pool.running:
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(cancel_mid_job())
+
+        assert sorted(path.name for path in directory.iterdir()) == ["source.png"]
+    finally:
+        image_pool.shutdown()
+        shutil.rmtree(directory)
+
+
+def test_upload_is_staged_outside_served_dir(client, properties, admin_headers, monkeypatch):
+    import app.utils.image as image_utils
+    from app.config import settings
+
+    staged = []
+    original = image_utils.store_image
+
+    async def spy(source, file_path, subfolder=""):
+        staged.append(Path(source))
+        return await original(source, file_path, subfolder)
+
+    monkeypatch.setattr(image_utils, "store_image", spy)
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), "teal").save(buffer, format="JPEG")
+
+    response = client.post(
+        f"/api/admin/upload/property-image/{properties[0]}",
+        files={"file": ("photo.jpg", buffer.getvalue(), "image/jpeg")},
+        headers=admin_headers
+    )
+
+    assert response.status_code == 200, response.text
+    assert staged[0].parent.resolve() == Path(settings.UPLOAD_SESSION_DIR).resolve()
+    assert not staged[0].exists()
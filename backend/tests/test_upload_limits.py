@@ -0,0 +1,85 @@
+"""
+Upload Limit Tests
+Oversized upload bodies are refused with 413, with or without a Content-Length
+"""
+
+import asyncio
+
+from app.config import settings
+from app.main import app
+from app.utils.image import UPLOAD_FORM_OVERHEAD
+
+BOUNDARY = "ehh-test-boundary"
+
+
+def multipart_chunks(size: int, chunk_size: int = 256 * 1024):
+    """A one-file multipart body of `size` file bytes, yielded in pieces"""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="big.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode()
+    while size > 0:
+        piece = min(chunk_size, size)
+        yield b"\xff" * piece
+        size -= piece
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def upload(client, properties, admin_headers, body):
+    return client.post(
+        f"/api/admin/upload/property-image/{properties[0]}",
+        content=body,
+        headers={**admin_headers, "Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+    )
+
+
+def test_oversized_content_length_is_rejected(client, properties, admin_headers):
+    body = b"".join(multipart_chunks(settings.MAX_UPLOAD_SIZE + UPLOAD_FORM_OVERHEAD + 1))
+
+    response = upload(client, properties, admin_headers, body)
+
+    assert response.status_code == 413
+
+
+def test_oversized_chunked_body_is_cut_off(client, properties, admin_headers):
+    # Driven over raw ASGI: TestClient reads a streamed body whole before the app sees it
+    limit = settings.MAX_UPLOAD_SIZE + UPLOAD_FORM_OVERHEAD
+    chunks = multipart_chunks(limit * 3)
+    received = 0
+    sent = []
+
+    async def receive():
+        nonlocal received
+        chunk = next(chunks, None)
+        if chunk is None:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        received += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": True}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": f"/api/admin/upload/property-image/{properties[0]}",
+        "raw_path": f"/api/admin/upload/property-image/{properties[0]}".encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"transfer-encoding", b"chunked"),
+            (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+            (b"authorization", admin_headers["Authorization"].encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    assert received < limit + 512 * 1024
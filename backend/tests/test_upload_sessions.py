@@ -0,0 +1,33 @@
+"""
+Upload Session Tests
+Resumable upload sessions and their chunk lock
+"""
+
+from pathlib import Path
+
+from app.config import settings
+
+
+def create_session(client, property_id, admin_headers):
+    response = client.post(
+        f"/api/admin/upload/property-image/{property_id}/sessions",
+        json={"filename": "photo.jpg", "size": 1024},
+        headers=admin_headers
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["session_id"]
+
+
+def test_cancel_waits_for_the_chunk_lock(client, properties, admin_headers):
+    session_id = create_session(client, properties[0], admin_headers)
+    lock = Path(settings.UPLOAD_SESSION_DIR) / session_id / "lock"
+    lock.touch()  # A chunk is being written by another request
+
+    busy = client.delete(f"/api/admin/upload/sessions/{session_id}", headers=admin_headers)
+    assert busy.status_code == 409
+    assert client.get(f"/api/admin/upload/sessions/{session_id}", headers=admin_headers).status_code == 200
+
+    lock.unlink()
+    cancelled = client.delete(f"/api/admin/upload/sessions/{session_id}", headers=admin_headers)
+    assert cancelled.status_code == 204
+    assert client.get(f"/api/admin/upload/sessions/{session_id}", headers=admin_headers).status_code == 404
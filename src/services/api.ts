@@ -27,6 +27,12 @@ async function fetchAPI<T>(
     defaultHeaders['Authorization'] = `Bearer ${token}`;
   }
   
+  // Keep reads on the primary database just after our own writes
+  const readYourWrites = getReadYourWritesToken();
+  if (readYourWrites) {
+    defaultHeaders['X-Read-Your-Writes'] = readYourWrites;
+  }
+  
   const config: RequestInit = {
     ...options,
     headers: {
@@ -37,6 +43,7 @@ async function fetchAPI<T>(
   
   try {
     const response = await fetch(url, config);
+    rememberReadYourWrites(response);
     
     // Handle 204 No Content
     if (response.status === 204) {
@@ -75,7 +82,27 @@ export function getAuthToken(): string | null {
 export function removeAuthToken(): void {
   if (typeof window !== 'undefined') {
     localStorage.removeItem('admin_token');
+    sessionStorage.removeItem('read_your_writes');
+  }
+}
+
+/**
+ * Read-Your-Writes Token
+ * Responses to admin writes carry a short-lived token; sending it back
+ * routes the following reads to the primary database (not a lagging replica)
+ */
+function rememberReadYourWrites(response: Response): void {
+  const token = response.headers.get('X-Read-Your-Writes');
+  if (token && typeof window !== 'undefined') {
+    sessionStorage.setItem('read_your_writes', token);
+  }
+}
+
+function getReadYourWritesToken(): string | null {
+  if (typeof window !== 'undefined') {
+    return sessionStorage.getItem('read_your_writes');
   }
+  return null;
 }
 
 export function isAuthenticated(): boolean {
@@ -234,6 +261,7 @@ export async function uploadPropertyImage(
       body: formData,
     }
   );
+  rememberReadYourWrites(response);
   
   if (!response.ok) {
     const error = await response.json();
@@ -264,6 +292,7 @@ export async function uploadPropertyImages(
       body: formData,
     }
   );
+  rememberReadYourWrites(response);
   
   if (!response.ok) {
     const error = await response.json();